@@ -1,12 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException
 from auth.jwt.jwt_auth import require_admin
 from database.db import get_db_connection
+from Admin.dashboard_stats import read_stats, reconcile_stats
 
 admin_dashboard_router = APIRouter(
     prefix="/admin-dashboard",
     tags=["Admin Dashboard"]
 )
 
+RECENT_WORKSHOPS_SQL = """
+    SELECT name, category_name, duration_days, start_date, status
+    FROM workshops
+    ORDER BY created_at DESC
+    LIMIT 3
+"""
+UPCOMING_BATCHES_SQL = """
+    SELECT b.batch_name, b.start_date, b.status, w.name AS workshop_name,
+    b.enrolled_count AS students
+    FROM batches b
+    JOIN workshops w ON b.workshop_id = w.workshop_id
+    ORDER BY b.id DESC
+    LIMIT 3
+"""
+
 
 @admin_dashboard_router.get("/")
 def admin_dashboard(user=Depends(require_admin), conn=Depends(get_db_connection)):
@@ -14,43 +30,18 @@ def admin_dashboard(user=Depends(require_admin), conn=Depends(get_db_connection)
     Admin Dashboard API.
     Returns total revenue, workshops, active batches,
     recent workshops, and upcoming batches.
+    Totals come from the precomputed admin_dashboard_stats table.
     """
     if not user:
         raise HTTPException(status_code=401, detail="Unauthorized access")
 
-    dashboard_data = {}
+    # Total Revenue, Total Workshops, Active Batches
+    dashboard_data = read_stats(conn)
 
     with conn.cursor() as cursor:
 
-        # Total Revenue (fix here)
-        cursor.execute("""
-            SELECT COALESCE(SUM(w.fee), 0) AS total_revenue
-            FROM student_enrollments se
-            JOIN workshops w ON se.workshop_id = w.workshop_id
-        """)
-        revenue = cursor.fetchone()
-        dashboard_data["total_revenue"] = revenue["total_revenue"]
-
-
-        # Total Workshops
-        cursor.execute("SELECT COUNT(*) AS total_workshops FROM workshops")
-        workshops_count = cursor.fetchone()
-        dashboard_data["total_workshops"] = workshops_count["total_workshops"]
-
-
-        # Active Batches
-        cursor.execute("SELECT COUNT(*) AS active_batches FROM batches WHERE status='Ongoing'")
-        batches_count = cursor.fetchone()
-        dashboard_data["active_batches"] = batches_count["active_batches"]
-
-
         # Recent Workshops (latest 5)
-        cursor.execute("""
-            SELECT name, category_name, duration_days, start_date, status
-            FROM workshops
-            ORDER BY created_at DESC
-            LIMIT 3
-        """)
+        cursor.execute(RECENT_WORKSHOPS_SQL)
         recent_workshops = cursor.fetchall()
         
         dashboard_data["recent_workshops"] = [
@@ -65,14 +56,7 @@ def admin_dashboard(user=Depends(require_admin), conn=Depends(get_db_connection)
         ]
 
         # Upcoming Batches (future start_date)
-        cursor.execute("""
-            SELECT b.batch_name, b.start_date, b.status, w.name AS workshop_name,
-            (SELECT COUNT(*) FROM student_enrollments se WHERE se.batch_id = b.id) AS students
-            FROM batches b
-            JOIN workshops w ON b.workshop_id = w.workshop_id
-            ORDER BY b.id DESC
-            LIMIT 3
-        """)
+        cursor.execute(UPCOMING_BATCHES_SQL)
         upcoming_batches = cursor.fetchall()
         dashboard_data["upcoming_batches"] = [
             {
@@ -91,3 +75,11 @@ def admin_dashboard(user=Depends(require_admin), conn=Depends(get_db_connection)
         "admin_id": user["admin_id"],
         "dashboard": dashboard_data
     }
+
+
+# Rebuild the precomputed figures from the source tables
+@admin_dashboard_router.post("/reconcile")
+def reconcile_dashboard(user=Depends(require_admin), conn=Depends(get_db_connection)):
+    reconcile_stats(conn)
+    conn.commit()
+    return {"message": "Dashboard statistics rebuilt", "dashboard": read_stats(conn)}
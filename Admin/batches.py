@@ -1,8 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
-from database.db import get_db_connection
+from database.async_db import get_async_db
+from Admin.dashboard_stats import record_batch_status
+from Admin.catalog_cache import catalog_cache, ALL
+from Students.student_dashboard import clear_student_dashboards
 from auth.jwt.jwt_auth import require_admin
+from fast_json import StrDatetimeJSONResponse
 
 batches_router = APIRouter(prefix="/batches", tags=["Batches"])
 
@@ -20,6 +24,7 @@ class BatchUpdate(BaseModel):
     zoom_link: Optional[str] = None
     zoom_meeting_id: Optional[str] = None
     zoom_password: Optional[str] = None
+    capacity: Optional[int] = Field(None, ge=0)   # seats; None = unlimited
 
 
 # ADMIN ROUTES
@@ -28,36 +33,37 @@ class BatchUpdate(BaseModel):
 @batches_router.post("/add")
 async def add_batch(
     batch: BatchUpdate,
-    conn=Depends(get_db_connection),
+    db=Depends(get_async_db),
     user=Depends(require_admin)
 ):
     if not batch.workshop_id:
         raise HTTPException(status_code=400, detail="No workshop_id provided")
 
-    with conn.cursor() as cursor:
-        cursor.execute(
-            "SELECT name, category_id FROM workshops WHERE workshop_id=%s",
-            (batch.workshop_id,)
-        )
-        workshop = cursor.fetchone()
-        if not workshop:
-            raise HTTPException(status_code=404, detail="Invalid workshop_id")
-
-        try:
-            query = """INSERT INTO batches 
-                (workshop_id, category_id, workshop_name, batch_name, instructor, 
-                start_date, start_time, end_time, location, status, zoom_link, 
-                zoom_meeting_id, zoom_password)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)"""
-            cursor.execute(query, (
-                batch.workshop_id, workshop["category_id"], workshop["name"],
-                batch.batch_name, batch.instructor, batch.start_date, batch.start_time,
-                batch.end_time, batch.location, batch.status, batch.zoom_link,
-                batch.zoom_meeting_id, batch.zoom_password
-            ))
-            conn.commit()
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    workshop = await db.fetchone(
+        "SELECT name, category_id FROM workshops WHERE workshop_id=%s",
+        (batch.workshop_id,)
+    )
+    if not workshop:
+        raise HTTPException(status_code=404, detail="Invalid workshop_id")
+
+    try:
+        query = """INSERT INTO batches 
+            (workshop_id, category_id, workshop_name, batch_name, instructor, 
+            start_date, start_time, end_time, location, status, zoom_link, 
+            zoom_meeting_id, zoom_password, capacity)
+            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)"""
+        await db.execute(query, (
+            batch.workshop_id, workshop["category_id"], workshop["name"],
+            batch.batch_name, batch.instructor, batch.start_date, batch.start_time,
+            batch.end_time, batch.location, batch.status, batch.zoom_link,
+            batch.zoom_meeting_id, batch.zoom_password, batch.capacity
+        ))
+        await db.run(record_batch_status, None, batch.status)
+        await db.commit()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    catalog_cache.invalidate("batches")
 
     return {"message": f"Batch added successfully by Admin {user['admin_id']}"}
 
@@ -67,7 +73,7 @@ async def add_batch(
 async def update_batch(
     batch_id: int,
     batch: BatchUpdate,
-    conn=Depends(get_db_connection),
+    db=Depends(get_async_db),
     user=Depends(require_admin)
 ):
     data = batch.dict(exclude_unset=True)
@@ -76,7 +82,8 @@ async def update_batch(
 
     allowed_fields = [
         "batch_name", "instructor", "status", "start_date", "start_time",
-        "end_time", "location", "zoom_link", "zoom_meeting_id", "zoom_password"
+        "end_time", "location", "zoom_link", "zoom_meeting_id", "zoom_password",
+        "capacity"
     ]
 
     fields = []
@@ -91,12 +98,17 @@ async def update_batch(
     values.append(batch_id)
 
     try:
-        with conn.cursor() as cursor:
-            cursor.execute(query, tuple(values))
-            conn.commit()
+        old = await db.fetchone("SELECT status FROM batches WHERE id=%s", (batch_id,)) if "status" in data else None
+        await db.execute(query, tuple(values))
+        if old:
+            await db.run(record_batch_status, old["status"], data["status"])
+        await db.commit()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    catalog_cache.invalidate("batches")
+    clear_student_dashboards()
+
     return {"message": f"Batch updated successfully by Admin {user['admin_id']}"}
 
 
@@ -104,15 +116,20 @@ async def update_batch(
 @batches_router.delete("/delete/{batch_id}")
 async def delete_batch(
     batch_id: int,
-    conn=Depends(get_db_connection),
+    db=Depends(get_async_db),
     user=Depends(require_admin)
 ):
-    with conn.cursor() as cursor:
-        try:
-            cursor.execute("DELETE FROM batches WHERE id=%s", (batch_id,))
-            conn.commit()
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    try:
+        old = await db.fetchone("SELECT status FROM batches WHERE id=%s FOR UPDATE", (batch_id,))
+        if old:
+            await db.execute("DELETE FROM batches WHERE id=%s", (batch_id,))
+            await db.run(record_batch_status, old["status"], None)
+        await db.commit()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    catalog_cache.invalidate("batches")
+    clear_student_dashboards()
 
     return {"message": f"Batch deleted successfully by Admin {user['admin_id']}"}
 
@@ -121,31 +138,32 @@ async def delete_batch(
 
 # Get all batches (Public)
 @batches_router.get("/")
-async def get_batches(conn=Depends(get_db_connection)):
-    with conn.cursor() as cursor:
-        cursor.execute("SELECT * FROM batches")
-        rows = cursor.fetchall()
-
-    for row in rows:
-        for key in ["start_time", "end_time", "created_at", "updated_at"]:
-            if key in row and row[key] is not None:
-                row[key] = str(row[key])
+async def get_batches(db=Depends(get_async_db)):
+    version = catalog_cache.version("batches")
+    rows = catalog_cache.get("batches", ALL)
+    if rows is None:
+        rows = await db.fetchall("SELECT * FROM batches")
+        catalog_cache.set("batches", ALL, rows, version)
 
-    return rows if rows else {"message": "No batches found"}
+    if not rows:
+        return {"message": "No batches found"}
+    # TIME / TIMESTAMP columns are sent as str() of the value, as they always were
+    return StrDatetimeJSONResponse(rows)
 
 
 # Get batch by ID (Public)
 @batches_router.get("/{batch_id}")
-async def get_batch(batch_id: int, conn=Depends(get_db_connection)):
-    with conn.cursor() as cursor:
-        cursor.execute("SELECT * FROM batches WHERE id=%s", (batch_id,))
-        batch = cursor.fetchone()
+async def get_batch(batch_id: int, db=Depends(get_async_db)):
+    version = catalog_cache.version("batches")
+    cached = catalog_cache.get("batches", batch_id)
+    if cached is not None:
+        return StrDatetimeJSONResponse(cached)
+
+    batch = await db.fetchone("SELECT * FROM batches WHERE id=%s", (batch_id,))
 
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
 
-    for key in ["start_time", "end_time", "created_at", "updated_at"]:
-        if key in batch and batch[key] is not None:
-            batch[key] = str(batch[key])
+    catalog_cache.set("batches", batch_id, batch, version)
 
-    return batch
+    return StrDatetimeJSONResponse(batch)
@@ -0,0 +1,13 @@
+import os
+
+from database.cache import VersionedCache
+
+# Public catalog lists (workshops, categories, batches, quotes) and their
+# by-id lookups. Admin writes invalidate their namespace explicitly; the TTL
+# bounds how long another worker can serve a stale copy.
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "60"))
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "2048"))
+
+catalog_cache = VersionedCache(max_size=CATALOG_CACHE_SIZE, ttl=CATALOG_CACHE_TTL)
+
+ALL = "all"
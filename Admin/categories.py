@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from database.db import get_db_connection
 from auth.jwt.jwt_auth import require_admin   # Only admins can modify categories
+from Admin.catalog_cache import catalog_cache, ALL
+from Students.student_dashboard import clear_student_dashboards
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
@@ -21,6 +23,7 @@ def add_category(category: Category,
     try:
         cursor.execute("INSERT INTO categories (name) VALUES (%s)", (category.name,))
         conn.commit()
+        catalog_cache.invalidate("categories")
         return {"message": f"Category added successfully by Admin {user['admin_id']}"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -38,6 +41,7 @@ def update_category(category_id: int,
     cursor.execute("UPDATE categories SET name=%s WHERE category_id=%s", (category.name, category_id))
     conn.commit()
     cursor.close()
+    catalog_cache.invalidate("categories")
     return {"message": f"Category updated successfully by Admin {user['admin_id']}"}
 
 
@@ -50,6 +54,8 @@ def delete_category(category_id: int,
     cursor.execute("DELETE FROM categories WHERE category_id=%s", (category_id,))
     conn.commit()
     cursor.close()
+    catalog_cache.invalidate("categories", "workshops", "batches")
+    clear_student_dashboards()
     return {"message": f"Category deleted successfully by Admin {user['admin_id']}"}
 
 
@@ -58,10 +64,14 @@ def delete_category(category_id: int,
 # Get All Categories (Public)
 @router.get("/")
 def get_categories(conn=Depends(get_db_connection)):
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM categories")
-    result = cursor.fetchall()
-    cursor.close()
+    version = catalog_cache.version("categories")
+    result = catalog_cache.get("categories", ALL)
+    if result is None:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM categories")
+        result = cursor.fetchall()
+        cursor.close()
+        catalog_cache.set("categories", ALL, result, version)
 
     if not result:
         return {"message": "No categories found"}
@@ -72,10 +82,15 @@ def get_categories(conn=Depends(get_db_connection)):
 @router.get("/{category_id}")
 def get_category(category_id: int,
                  conn=Depends(get_db_connection)):
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM categories WHERE category_id = %s", (category_id,))
-    result = cursor.fetchone()
-    cursor.close()
+    version = catalog_cache.version("categories")
+    result = catalog_cache.get("categories", category_id)
+    if result is None:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM categories WHERE category_id = %s", (category_id,))
+        result = cursor.fetchone()
+        cursor.close()
+        if result:
+            catalog_cache.set("categories", category_id, result, version)
 
     if not result:
         raise HTTPException(status_code=404, detail="Category not found")
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from database.db import get_db_connection
-from auth.jwt.jwt_auth import require_admin   
+from auth.jwt.jwt_auth import require_admin, require_admin_claims
+from Students.student_dashboard import invalidate_student_dashboard
+from fast_json import FastJSONResponse
 
 students_router_admin = APIRouter(
     prefix="/admin/clarity_call",
@@ -42,6 +44,8 @@ def create_clarity_call(data: dict, admin=Depends(require_admin), conn=Depends(g
         """, (student_id, mentor_name, call_status, scheduled_date, note))
         conn.commit()
 
+    invalidate_student_dashboard(student["student_id"])
+
     return {
         "message": "Clarity call scheduled",
         "student": {
@@ -73,7 +77,7 @@ def update_clarity_call(
         raise HTTPException(status_code=400, detail="No valid fields provided to update")
 
     with conn.cursor() as cursor:
-        cursor.execute("SELECT id FROM clarity_calls WHERE id=%s", (call_id,))
+        cursor.execute("SELECT id, student_id FROM clarity_calls WHERE id=%s", (call_id,))
         record = cursor.fetchone()
 
     if not record:
@@ -89,6 +93,8 @@ def update_clarity_call(
         cursor.execute(query, values)
         conn.commit()
 
+    invalidate_student_dashboard(record["student_id"])
+
     return {
         "message": "Clarity call updated successfully",
         "call_id": call_id,
@@ -100,7 +106,7 @@ def update_clarity_call(
 # GET → All Clarity Calls (Admin)
 @students_router_admin.get("/")
 def get_all_clarity_calls(
-    admin=Depends(require_admin),
+    admin=Depends(require_admin_claims),
     conn=Depends(get_db_connection)
 ):
     
@@ -117,7 +123,7 @@ def get_all_clarity_calls(
     if not rows:
         return {"message": "No clarity call records found", "data": []}
 
-    return {"data": rows}
+    return FastJSONResponse({"data": rows})
 
 
 
@@ -131,6 +137,8 @@ def delete_clarity_call(
     conn=Depends(get_db_connection)
 ):
     with conn.cursor() as cursor:
+        cursor.execute("SELECT student_id FROM clarity_calls WHERE id=%s", (call_id,))
+        record = cursor.fetchone()
         cursor.execute("DELETE FROM clarity_calls WHERE id=%s", (call_id,))
         affected = cursor.rowcount
         conn.commit()
@@ -141,4 +149,6 @@ def delete_clarity_call(
             detail=f"Clarity Call {call_id} not found"
         )
 
+    invalidate_student_dashboard(record["student_id"])
+
     return {"message": f"Clarity Call {call_id} deleted successfully"}
@@ -0,0 +1,170 @@
+import os
+from decimal import Decimal
+
+from database.db import pooled_connection
+from database.jobs import run_periodically
+
+DASHBOARD_RECONCILE_INTERVAL = float(os.getenv("DASHBOARD_RECONCILE_INTERVAL", "900"))  # seconds
+DASHBOARD_REVENUE_SHARDS = int(os.getenv("DASHBOARD_REVENUE_SHARDS", "16"))
+
+STAT_KEYS = ["total_workshops", "active_batches"]
+REVENUE_PREFIX = "total_revenue:"
+
+
+# Precomputed admin dashboard figures
+# -----------------------------------------
+# admin_dashboard_stats holds one row per figure and batches.enrolled_count
+# holds the per-batch enrollment count. Writes (enrollments, new workshops /
+# batches, status changes, deletes) adjust them incrementally inside the
+# caller's transaction; the periodic job rebuilds everything with
+# reconcile_stats() to repair any drift.
+#
+# Revenue is the sum of the current workshop fee over all enrollments, as
+# it always was. It is kept in DASHBOARD_REVENUE_SHARDS rows
+# ("total_revenue:<n>") rather than one, so enrollments in different batches
+# do not all queue on the same row lock; the dashboard adds the shards up.
+# Any shard may take any delta, only their sum is meaningful.
+#
+# All helpers take the caller's connection and leave committing to it.
+
+
+def revenue_key(n):
+    return f"{REVENUE_PREFIX}{n % DASHBOARD_REVENUE_SHARDS}"
+
+
+def bump_stat(conn, key, delta):
+    if not delta:
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO admin_dashboard_stats (stat_key, stat_value) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE stat_value = stat_value + VALUES(stat_value)
+            """,
+            (key, delta)
+        )
+
+
+WORKSHOP_ENROLLMENTS_SQL = "SELECT COUNT(*) AS enrollments FROM student_enrollments WHERE workshop_id=%s"
+
+TAKE_SEATS_SQL = """
+    UPDATE batches SET enrolled_count = enrolled_count + %s
+    WHERE id=%s AND (capacity IS NULL OR enrolled_count + %s <= capacity)
+"""
+
+
+# Takes `count` seats atomically and books their fees; a NULL capacity means
+# unlimited. Returns False, changing nothing, when the batch does not have
+# that many free seats.
+def record_enrollment(conn, batch_id, fee, count=1):
+    with conn.cursor() as cursor:
+        cursor.execute(TAKE_SEATS_SQL, (count, batch_id, count))
+        if cursor.rowcount == 0:
+            return False
+    bump_stat(conn, revenue_key(batch_id), Decimal(str(fee or 0)) * count)
+    return True
+
+
+# Enrollments of the workshop were booked at the old fee. Deleting a workshop
+# is a change to no fee: its enrollments stay but no longer count.
+def record_fee_change(conn, workshop_id, old_fee, new_fee):
+    delta = Decimal(str(new_fee or 0)) - Decimal(str(old_fee or 0))
+    if not delta:
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(WORKSHOP_ENROLLMENTS_SQL, (workshop_id,))
+        enrollments = cursor.fetchone()["enrollments"]
+    bump_stat(conn, revenue_key(workshop_id), delta * enrollments)
+
+
+# Deletes a student's enrollments, gives their seats back and their fees
+def remove_student_enrollments(conn, student_id):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT COALESCE(SUM(w.fee), 0) AS fees
+            FROM student_enrollments se
+            JOIN workshops w ON se.workshop_id = w.workshop_id
+            WHERE se.student_id=%s
+            """,
+            (student_id,)
+        )
+        bump_stat(conn, revenue_key(student_id), -cursor.fetchone()["fees"])
+        cursor.execute(
+            """
+            UPDATE batches b
+            JOIN (
+                SELECT batch_id, COUNT(*) AS enrolled
+                FROM student_enrollments
+                WHERE student_id=%s
+                GROUP BY batch_id
+            ) c ON c.batch_id = b.id
+            SET b.enrolled_count = GREATEST(b.enrolled_count - c.enrolled, 0)
+            """,
+            (student_id,)
+        )
+        cursor.execute("DELETE FROM student_enrollments WHERE student_id=%s", (student_id,))
+
+
+def record_batch_status(conn, old_status, new_status):
+    delta = int(new_status == "Ongoing") - int(old_status == "Ongoing")
+    bump_stat(conn, "active_batches", delta)
+
+
+def reconcile_stats(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            UPDATE batches b
+            LEFT JOIN (
+                SELECT batch_id, COUNT(*) AS enrolled
+                FROM student_enrollments
+                GROUP BY batch_id
+            ) c ON c.batch_id = b.id
+            SET b.enrolled_count = COALESCE(c.enrolled, 0)
+        """)
+        cursor.execute("""
+            INSERT INTO admin_dashboard_stats (stat_key, stat_value)
+            SELECT 'total_workshops', COUNT(*) FROM workshops
+            UNION ALL
+            SELECT 'active_batches', COUNT(*) FROM batches WHERE status='Ongoing'
+            ON DUPLICATE KEY UPDATE stat_value = VALUES(stat_value)
+        """)
+        # Rebuilt from scratch: the shard count may have changed
+        cursor.execute("DELETE FROM admin_dashboard_stats WHERE stat_key LIKE %s", (REVENUE_PREFIX + "%",))
+        cursor.execute(
+            """
+            INSERT INTO admin_dashboard_stats (stat_key, stat_value)
+            SELECT CONCAT(%s, se.batch_id %% %s), SUM(w.fee)
+            FROM student_enrollments se
+            JOIN workshops w ON se.workshop_id = w.workshop_id
+            GROUP BY se.batch_id %% %s
+            """,
+            (REVENUE_PREFIX, DASHBOARD_REVENUE_SHARDS, DASHBOARD_REVENUE_SHARDS)
+        )
+
+
+def read_stats(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT stat_key, stat_value FROM admin_dashboard_stats")
+        stats = {row["stat_key"]: row["stat_value"] for row in cursor.fetchall()}
+
+    if any(key not in stats for key in STAT_KEYS):
+        reconcile_stats(conn)
+        conn.commit()
+        return read_stats(conn)
+
+    return {
+        "total_revenue": sum((value for key, value in stats.items() if key.startswith(REVENUE_PREFIX)), Decimal(0)),
+        "total_workshops": int(stats["total_workshops"]),
+        "active_batches": int(stats["active_batches"]),
+    }
+
+
+def _reconcile_job():
+    with pooled_connection() as conn:
+        reconcile_stats(conn)
+        conn.commit()
+
+
+def start_dashboard_reconcile():
+    run_periodically("dashboard-reconcile", DASHBOARD_RECONCILE_INTERVAL, _reconcile_job)
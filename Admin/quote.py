@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional
-from database.db import get_db_connection
+from database.async_db import get_async_db
 from auth.jwt.jwt_auth import require_admin   
+from Admin.catalog_cache import catalog_cache, ALL
 
 quotes_router = APIRouter(prefix="/quotes", tags=["Quotes"])
 
@@ -36,47 +37,52 @@ class QuoteUpdate(BaseModel):
 # Add new quote (Admin only)
 @quotes_router.post("/add")
 async def add_quote(data: QuoteBase,
-                    conn=Depends(get_db_connection),
+                    db=Depends(get_async_db),
                     user=Depends(require_admin)):
     color_hex = COLOR_MAP.get(data.color) if data.color else None
 
     try:
-        with conn.cursor() as cursor:
-            cursor.execute(
-                """
-                INSERT INTO quotes (quote, author, category, color, featured)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (data.quote, data.author, data.category, color_hex, data.featured)
-            )
-            conn.commit()
+        await db.execute(
+            """
+            INSERT INTO quotes (quote, author, category, color, featured)
+            VALUES (%s, %s, %s, %s, %s)
+            """,
+            (data.quote, data.author, data.category, color_hex, data.featured)
+        )
+        await db.commit()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    catalog_cache.invalidate("quotes")
+
     return {"message": f"Quote added successfully by Admin {user['admin_id']}"}
 
 
 # Get all quotes (Public)
 @quotes_router.get("/")
-async def get_quotes(conn=Depends(get_db_connection)):
-    with conn.cursor() as cursor:
-        cursor.execute(
+async def get_quotes(db=Depends(get_async_db)):
+    version = catalog_cache.version("quotes")
+    quotes = catalog_cache.get("quotes", ALL)
+    if quotes is None:
+        quotes = await db.fetchall(
             """
             SELECT id, quote, author, category, color, featured, created_at, updated_at
             FROM quotes
             ORDER BY created_at DESC
             """
         )
-        quotes = cursor.fetchall()
+        catalog_cache.set("quotes", ALL, quotes, version)
 
     return quotes if quotes else {"message": "No quotes found"}
 
 
 # Get specific quote (Public)
 @quotes_router.get("/{quote_id}")
-async def get_quote(quote_id: int, conn=Depends(get_db_connection)):
-    with conn.cursor() as cursor:
-        cursor.execute(
+async def get_quote(quote_id: int, db=Depends(get_async_db)):
+    version = catalog_cache.version("quotes")
+    quote = catalog_cache.get("quotes", quote_id)
+    if quote is None:
+        quote = await db.fetchone(
             """
             SELECT id, quote, author, category, color, featured, created_at, updated_at
             FROM quotes
@@ -84,7 +90,8 @@ async def get_quote(quote_id: int, conn=Depends(get_db_connection)):
             """,
             (quote_id,)
         )
-        quote = cursor.fetchone()
+        if quote:
+            catalog_cache.set("quotes", quote_id, quote, version)
 
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
@@ -96,7 +103,7 @@ async def get_quote(quote_id: int, conn=Depends(get_db_connection)):
 @quotes_router.put("/update/{quote_id}")
 async def update_quote(quote_id: int,
                        data: QuoteUpdate,
-                       conn=Depends(get_db_connection),
+                       db=Depends(get_async_db),
                        user=Depends(require_admin)):
     update_data = data.dict(exclude_unset=True)
     if not update_data:
@@ -117,29 +124,33 @@ async def update_quote(quote_id: int,
     query = f"UPDATE quotes SET {', '.join(fields)}, updated_at=NOW() WHERE id=%s"
 
     try:
-        with conn.cursor() as cursor:
-            cursor.execute(query, tuple(values))
-            if cursor.rowcount == 0:
-                raise HTTPException(status_code=404, detail="Quote not found")
-            conn.commit()
+        affected = await db.execute(query, tuple(values))
+        await db.commit()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if affected == 0:
+        raise HTTPException(status_code=404, detail="Quote not found")
+
+    catalog_cache.invalidate("quotes")
+
     return {"message": f"Quote {quote_id} updated successfully by Admin {user['admin_id']}"}
 
 
 # Delete quote (Admin only)
 @quotes_router.delete("/delete/{quote_id}")
 async def delete_quote(quote_id: int,
-                       conn=Depends(get_db_connection),
+                       db=Depends(get_async_db),
                        user=Depends(require_admin)):
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("DELETE FROM quotes WHERE id=%s", (quote_id,))
-            if cursor.rowcount == 0:
-                raise HTTPException(status_code=404, detail="Quote not found")
-            conn.commit()
+        affected = await db.execute("DELETE FROM quotes WHERE id=%s", (quote_id,))
+        await db.commit()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if affected == 0:
+        raise HTTPException(status_code=404, detail="Quote not found")
+
+    catalog_cache.invalidate("quotes")
+
     return {"message": f"Quote {quote_id} deleted successfully by Admin {user['admin_id']}"}
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Optional
 from database.db import get_db_connection
-from auth.jwt.jwt_auth import require_admin
+from auth.jwt.jwt_auth import require_admin, require_admin_claims
 
 resource_router = APIRouter(prefix="/auth/resources", tags=["Resources"])
 
@@ -95,7 +95,7 @@ def update_resource(
 #  -----------------------------------------
 @resource_router.get("/all_resources")
 def get_resources(
-    user=Depends(require_admin),
+    user=Depends(require_admin_claims),
     conn=Depends(get_db_connection)
 ):
     query = """
@@ -0,0 +1,226 @@
+import codecs
+import csv
+import json
+import os
+
+import pymysql
+
+from Admin.dashboard_stats import record_enrollment
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))     # rows validated, hashed and inserted together
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "20000"))
+
+STUDENT_IMPORT_FIELDS = [
+    "first_name", "last_name", "email", "phone", "address", "password",
+    "email_consent", "profession", "designation", "gender",
+    "profile_missing_mask", "profile_completion_pct", "profile_completed"
+]
+
+
+# Bulk student import
+# -----------------------------------------
+# The request body is parsed while it streams in (CSV, NDJSON or a JSON
+# array) and handed out in chunks, so a file with thousands of rows never
+# has to sit in memory as a whole. Each chunk is inserted in one
+# transaction with executemany.
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+async def _text(body):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    async for chunk in body:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def _lines(body):
+    pending = ""
+    async for text in _text(body):
+        pending += text
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+# Empty cells mean "not given", so the model defaults apply
+def _clean(record):
+    return {k.strip(): v for k, v in record.items() if k and v not in (None, "")}
+
+
+async def _csv_records(body):
+    header = None
+    record = ""
+    async for line in _lines(body):
+        record = f"{record}\n{line}" if record else line
+        # A quoted field may contain newlines; wait until the quotes balance
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]), [])
+        record = ""
+        if not any(v.strip() for v in values):
+            continue
+        if header is None:
+            header = [v.strip() for v in values]
+            continue
+        yield _clean(dict(zip(header, values)))
+    if record:
+        raise ImportFormatError("Unterminated quoted field in CSV")
+
+
+async def _ndjson_records(body):
+    async for line in _lines(body):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ImportFormatError(f"Invalid JSON line: {e}")
+
+
+async def _json_array_records(body):
+    decoder = json.JSONDecoder()
+    buffer = ""
+    state = "start"      # start -> items -> end
+
+    async for text in _text(body):
+        buffer += text
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer) or state == "end":
+                break
+            if state == "start":
+                if buffer[pos] != "[":
+                    raise ImportFormatError("Expected a JSON array of students")
+                state = "items"
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                state = "end"
+                pos += 1
+                continue
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break   # item not complete yet, wait for more data
+            yield record
+        buffer = buffer[pos:]
+
+    if state != "end" or buffer.strip():
+        raise ImportFormatError("Invalid or truncated JSON array")
+
+
+def read_records(body, content_type: str):
+    """Async iterator of row dicts from the request body stream."""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return _csv_records(body)
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        return _ndjson_records(body)
+    return _json_array_records(body)
+
+
+async def chunked(records, size=IMPORT_CHUNK_SIZE):
+    chunk = []
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def find_existing_emails(conn, emails):
+    if not emails:
+        return set()
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"SELECT email FROM students WHERE email IN ({', '.join(['%s'] * len(emails))})",
+            tuple(emails)
+        )
+        return {row["email"].lower() for row in cursor.fetchall()}
+
+
+def insert_students(conn, rows, batch=None):
+    """
+    Insert one chunk of validated rows (dicts with STUDENT_IMPORT_FIELDS) in a
+    single transaction, optionally enrolling them into `batch` while it has
+    free seats. Returns {email: {"student_id", "enrolled"} or error message}.
+    """
+    query = f"""
+        INSERT INTO students ({', '.join(STUDENT_IMPORT_FIELDS)})
+        VALUES ({', '.join(['%s'] * len(STUDENT_IMPORT_FIELDS))})
+    """
+    values = [tuple(row[f] for f in STUDENT_IMPORT_FIELDS) for row in rows]
+    results = {}
+
+    with conn.cursor() as cursor:
+        try:
+            cursor.executemany(query, values)
+            inserted = rows
+        except pymysql.err.IntegrityError:
+            # Someone registered one of these emails meanwhile; redo the chunk
+            # row by row so only the conflicting rows fail
+            conn.rollback()
+            inserted = []
+            for row, row_values in zip(rows, values):
+                try:
+                    cursor.execute(query, row_values)
+                    inserted.append(row)
+                except pymysql.err.IntegrityError as e:
+                    results[row["email"].lower()] = f"Could not insert: {e.args[-1]}"
+
+        if inserted:
+            emails = [row["email"] for row in inserted]
+            cursor.execute(
+                f"SELECT student_id, email FROM students WHERE email IN ({', '.join(['%s'] * len(emails))})",
+                tuple(emails)
+            )
+            ids = {row["email"].lower(): row["student_id"] for row in cursor.fetchall()}
+            created = [ids[row["email"].lower()] for row in inserted if row["email"].lower() in ids]
+            enrolled = set()
+
+            if batch is not None and created:
+                # Lock the batch and enroll, in file order, only as many
+                # students as it has free seats. A batch moved to another
+                # workshop since the lookup gets nobody.
+                cursor.execute(
+                    "SELECT capacity, enrolled_count FROM batches WHERE id=%s AND workshop_id=%s FOR UPDATE",
+                    (batch["batch_id"], batch["workshop_id"])
+                )
+                seats = cursor.fetchone()
+                if seats is None:
+                    free = 0
+                elif seats["capacity"] is None:
+                    free = len(created)
+                else:
+                    free = max(0, seats["capacity"] - seats["enrolled_count"])
+                enrolled = set(created[:free])
+
+                if enrolled:
+                    cursor.executemany(
+                        """
+                        INSERT INTO student_enrollments
+                        (student_id, workshop_id, batch_id, status, enrollment_date)
+                        VALUES (%s, %s, %s, %s, NOW())
+                        """,
+                        [(student_id, batch["workshop_id"], batch["batch_id"], batch["enrollment_status"])
+                         for student_id in created[:free]]
+                    )
+                    record_enrollment(conn, batch["batch_id"], batch["fee"], count=len(enrolled))
+
+            for email, student_id in ids.items():
+                results[email] = {"student_id": student_id, "enrolled": student_id in enrolled}
+
+    conn.commit()
+    return results
@@ -1,8 +1,27 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel, EmailStr
+import base64
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, EmailStr, ValidationError
 from typing import Optional, Literal
-from database.db import get_db_connection
-from auth.jwt.jwt_auth import require_admin   
+from fast_json import FastJSONResponse
+from database.db import get_db_connection, get_pool, PoolTimeout
+from database.query_stats import SS_CURSOR_CLASS
+from database.async_db import get_async_db, run_blocking
+from auth.jwt.jwt_auth import require_admin, require_admin_claims
+from auth.jwt.principal_cache import invalidate_student
+from auth.jwt.password_auth import hash_password, hash_many
+from Admin.dashboard_stats import remove_student_enrollments
+from Admin.student_import import (
+    IMPORT_MAX_ROWS, ImportFormatError, read_records, chunked, find_existing_emails, insert_students
+)
+from Students.enrollments import get_enrollment_status
+from Students.student_dashboard import invalidate_student_dashboard
+from Students.profile_completion import completion_columns, COMPLETION_SET_SQL
 
 
 students_router_admin = APIRouter( prefix="/admin/students", tags=["Students (Admin)"])
@@ -39,63 +58,492 @@ class StudentUpdate(BaseModel):
 # Register student 
 @students_router_admin.post("/register")
 async def register_student(student: StudentBase,
-                           conn=Depends(get_db_connection),
+                           db=Depends(get_async_db),
                            user=Depends(require_admin)):   # Admin required
     if student.password != student.confirm_password:
         raise HTTPException(status_code=400, detail="Password and Confirm Password do not match")
 
+    hashed_password = await run_blocking(hash_password, student.password)
+
     try:
-        with conn.cursor() as cursor:
-            query = """
-                INSERT INTO students 
-                (first_name, last_name, email, phone, address, password, email_consent, profession, designation, gender)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(query, (
-                student.first_name,
-                student.last_name,
-                student.email,
-                student.phone,
-                student.address,
-                student.password,        
-                student.email_consent,
-                student.profession,
-                student.designation,
-                student.gender
-            ))
-            conn.commit()
+        query = """
+            INSERT INTO students 
+            (first_name, last_name, email, phone, address, password, email_consent, profession, designation, gender,
+             profile_missing_mask, profile_completion_pct, profile_completed)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        completion = completion_columns(student.dict())
+        await db.execute(query, (
+            student.first_name,
+            student.last_name,
+            student.email,
+            student.phone,
+            student.address,
+            hashed_password,
+            student.email_consent,
+            student.profession,
+            student.designation,
+            student.gender,
+            completion["profile_missing_mask"],
+            completion["profile_completion_pct"],
+            completion["profile_completed"]
+        ))
+        await db.commit()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
     return {"message": f"Student registered successfully by Admin {user['admin_id']}"}
 
 
-# GET → Get all students with workshop & batch info 
+# Bulk import
 # -----------------------------------------
-@students_router_admin.get("/")
-async def get_students(conn=Depends(get_db_connection),
-                       user=Depends(require_admin)):
-    query = """
-        SELECT 
-            s.student_id, s.first_name, s.last_name, s.email, s.phone, s.address,
-            s.password, s.email_consent, s.profession, s.designation, s.gender,
-            s.created_at, s.updated_at,
-            se.enrollment_id, se.status AS enrollment_status, se.enrollment_date,
-            b.id AS batch_id, b.batch_name, b.status AS batch_status,
-            w.workshop_id, w.name AS workshop_name
+# Body: CSV (Content-Type: text/csv, header row with StudentBase field names),
+# NDJSON (application/x-ndjson) or a JSON array of StudentBase objects.
+# Every chunk of rows is committed on its own; the response reports each row.
+
+def _validate_import_row(record):
+    if not isinstance(record, dict):
+        return None, "Row is not an object"
+    try:
+        student = StudentBase(**record)
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+        )
+    if student.password != student.confirm_password:
+        return None, "Password and Confirm Password do not match"
+    return student, None
+
+
+@students_router_admin.post("/import")
+async def import_students(request: Request,
+                          batch_id: Optional[int] = None,
+                          db=Depends(get_async_db),
+                          user=Depends(require_admin_claims)):
+    batch = None
+    if batch_id is not None:
+        batch = await db.fetchone(
+            """
+            SELECT b.id AS batch_id, b.status AS batch_status, b.workshop_id,
+                   w.status AS workshop_status, w.fee
+            FROM batches b
+            JOIN workshops w ON w.workshop_id = b.workshop_id
+            WHERE b.id=%s
+            """,
+            (batch_id,)
+        )
+        if not batch:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        batch["enrollment_status"] = get_enrollment_status(batch["workshop_status"], batch["batch_status"])
+
+    results = []
+    seen_emails = set()
+    created = 0
+    error = None
+
+    records = read_records(request.stream(), request.headers.get("content-type"))
+    try:
+        async for chunk in chunked(records):
+            valid = []
+            for record in chunk:
+                if len(results) >= IMPORT_MAX_ROWS:
+                    raise ImportFormatError(f"Import stopped after {IMPORT_MAX_ROWS} rows")
+
+                result = {"row": len(results) + 1, "email": record.get("email") if isinstance(record, dict) else None}
+                results.append(result)
+
+                student, row_error = _validate_import_row(record)
+                if student is not None and student.email.lower() in seen_emails:
+                    row_error = "Duplicate email in file"
+                if row_error:
+                    result.update(status="error", error=row_error)
+                    continue
+                seen_emails.add(student.email.lower())
+                valid.append((student, result))
+
+            existing = await db.run(find_existing_emails, [student.email for student, _ in valid])
+            pending = []
+            for student, result in valid:
+                if student.email.lower() in existing:
+                    result.update(status="error", error="Email already registered")
+                else:
+                    pending.append((student, result))
+            if not pending:
+                continue
+
+            hashes = await run_blocking(hash_many, [student.password for student, _ in pending])
+            rows = []
+            for (student, _), hashed_password in zip(pending, hashes):
+                row = student.dict(exclude={"password", "confirm_password"})
+                row["password"] = hashed_password
+                row.update(completion_columns(row))
+                rows.append(row)
+
+            inserted = await db.run(insert_students, rows, batch)
+            for student, result in pending:
+                outcome = inserted.get(student.email.lower(), "Could not insert")
+                if isinstance(outcome, dict):
+                    created += 1
+                    result.update(status="created", **outcome)
+                    if batch is not None and not outcome["enrolled"]:
+                        result["warning"] = "Batch is full, student not enrolled"
+                else:
+                    result.update(status="error", error=outcome)
+    except ImportFormatError as e:
+        if not created:
+            raise HTTPException(status_code=400, detail=str(e))
+        error = str(e)
+        # Rows of the interrupted chunk were never written
+        for result in results:
+            result.setdefault("status", "skipped")
+
+    return {
+        "message": f"Imported {created} of {len(results)} students by Admin {user['admin_id']}",
+        "created": created,
+        "failed": sum(1 for result in results if result["status"] == "error"),
+        "enrolled": sum(1 for result in results if result.get("enrolled")),
+        "batch_id": batch_id,
+        "error": error,
+        "results": results,
+    }
+
+
+# Listing helpers (shared by the list view and the export)
+# -----------------------------------------
+
+STUDENT_LIST_FIELDS = [
+    "student_id", "first_name", "last_name", "email", "phone", "address",
+    "email_consent", "profession", "designation", "gender", "status",
+    "profile_completion_pct", "profile_completed", "created_at", "updated_at"
+]
+STUDENT_LIST_COLUMNS = ", ".join(f"s.{field}" for field in STUDENT_LIST_FIELDS)
+
+ENROLLMENT_FIELDS = [
+    "enrollment_id", "enrollment_status", "enrollment_date",
+    "batch_id", "batch_name", "batch_status", "workshop_id", "workshop_name"
+]
+ENROLLMENT_COLUMNS = """
+    se.enrollment_id, se.status AS enrollment_status, se.enrollment_date,
+    b.id AS batch_id, b.batch_name, b.status AS batch_status,
+    w.workshop_id, w.name AS workshop_name
+"""
+
+# sort option -> indexed column (ties broken by student_id)
+STUDENT_SORT_COLUMNS = {
+    "student_id": "s.student_id",
+    "created_at": "s.created_at",
+    "profile_completion_pct": "s.profile_completion_pct",
+}
+
+
+def student_list_filters(
+    status: Optional[str] = None,
+    profession: Optional[Literal['student', 'employee', 'other']] = None,
+    batch_id: Optional[int] = None,
+    workshop_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    completion_min: Optional[float] = Query(None, ge=0, le=100),
+    completion_max: Optional[float] = Query(None, ge=0, le=100),
+    profile_completed: Optional[bool] = None,
+):
+    return {
+        "status": status,
+        "profession": profession,
+        "batch_id": batch_id,
+        "workshop_id": workshop_id,
+        "created_from": created_from,
+        "created_to": created_to,
+        "completion_min": completion_min,
+        "completion_max": completion_max,
+        "profile_completed": profile_completed,
+    }
+
+
+def build_student_where(filters: dict):
+    conditions = []
+    values = []
+
+    for key in ["status", "profession"]:
+        if filters.get(key) is not None:
+            conditions.append(f"s.{key} = %s")
+            values.append(filters[key])
+
+    for key in ["batch_id", "workshop_id"]:
+        if filters.get(key) is not None:
+            conditions.append(
+                f"EXISTS (SELECT 1 FROM student_enrollments fe "
+                f"WHERE fe.student_id = s.student_id AND fe.{key} = %s)"
+            )
+            values.append(filters[key])
+
+    if filters.get("created_from") is not None:
+        conditions.append("s.created_at >= %s")
+        values.append(filters["created_from"])
+    if filters.get("created_to") is not None:
+        conditions.append("s.created_at < %s")
+        values.append(filters["created_to"])
+
+    if filters.get("completion_min") is not None:
+        conditions.append("s.profile_completion_pct >= %s")
+        values.append(filters["completion_min"])
+    if filters.get("completion_max") is not None:
+        conditions.append("s.profile_completion_pct <= %s")
+        values.append(filters["completion_max"])
+    if filters.get("profile_completed") is not None:
+        conditions.append("s.profile_completed = %s")
+        values.append(filters["profile_completed"])
+
+    return conditions, values
+
+
+def _encode_cursor(sort_value, student_id):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    elif isinstance(sort_value, Decimal):
+        sort_value = str(sort_value)
+    raw = json.dumps([sort_value, student_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str, sort: str):
+    try:
+        sort_value, student_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if sort == "created_at" and sort_value is not None:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(student_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after_cursor(sort_column, op, sort_value, last_id):
+    """
+    Keyset condition for the rows after (sort_value, last_id). MySQL sorts
+    NULLs first ascending and last descending, so a NULL sort value (e.g. a
+    created_at never set) needs its own branch on either side of the cursor.
+    """
+    if sort_value is None:
+        if op == ">":
+            return f"({sort_column} IS NOT NULL OR s.student_id > %s)", [last_id]
+        return f"({sort_column} IS NULL AND s.student_id < %s)", [last_id]
+    condition = f"{sort_column} {op} %s OR ({sort_column} = %s AND s.student_id {op} %s)"
+    if op == "<":
+        condition += f" OR {sort_column} IS NULL"
+    return f"({condition})", [sort_value, sort_value, last_id]
+
+
+def student_list_query(filters, sort="student_id", order="asc", limit=50, cursor=None):
+    """SQL and values for one page of the student list, fetching limit + 1 rows to detect a next page."""
+    sort_column = STUDENT_SORT_COLUMNS[sort]
+    direction = "ASC" if order == "asc" else "DESC"
+    op = ">" if order == "asc" else "<"
+
+    conditions, values = build_student_where(filters)
+
+    if cursor:
+        sort_value, last_id = _decode_cursor(cursor, sort)
+        if sort == "student_id":
+            conditions.append(f"s.student_id {op} %s")
+            values.append(last_id)
+        else:
+            condition, condition_values = _after_cursor(sort_column, op, sort_value, last_id)
+            conditions.append(condition)
+            values.extend(condition_values)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+        SELECT {STUDENT_LIST_COLUMNS}
         FROM students s
-        LEFT JOIN student_enrollments se ON s.student_id = se.student_id
+        {where}
+        ORDER BY {sort_column} {direction}, s.student_id {direction}
+        LIMIT %s
+    """
+    values.append(limit + 1)
+    return query, values
+
+
+def page_enrollments_query(count):
+    """Enrollments of `count` students, for nesting under a list page."""
+    placeholders = ", ".join(["%s"] * count)
+    return f"""
+        SELECT se.student_id, {ENROLLMENT_COLUMNS}
+        FROM student_enrollments se
         LEFT JOIN batches b ON se.batch_id = b.id
         LEFT JOIN workshops w ON se.workshop_id = w.workshop_id
+        WHERE se.student_id IN ({placeholders})
+        ORDER BY se.enrollment_date
     """
+
+
+# GET → Get students (keyset paginated) with their enrollments nested
+# -----------------------------------------
+@students_router_admin.get("/")
+async def get_students(limit: int = Query(50, ge=1, le=200),
+                       cursor: Optional[str] = None,
+                       sort: Literal['student_id', 'created_at', 'profile_completion_pct'] = 'student_id',
+                       order: Literal['asc', 'desc'] = 'asc',
+                       filters: dict = Depends(student_list_filters),
+                       db=Depends(get_async_db),
+                       user=Depends(require_admin_claims)):
+    query, values = student_list_query(filters, sort, order, limit, cursor)
+
     try:
-        with conn.cursor() as cursor:
-            cursor.execute(query)
-            students = cursor.fetchall()
+        students = await db.fetchall(query, tuple(values))
+        students = list(students)
+        has_more = len(students) > limit   # the extra row tells us there is a next page
+        students = students[:limit]
+
+        enrollments = []
+        if students:
+            ids = [row["student_id"] for row in students]
+            enrollments = await db.fetchall(page_enrollments_query(len(ids)), tuple(ids))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    return students if students else {"message": "No students found"}
+    by_student = {row["student_id"]: row for row in students}
+    for row in students:
+        row["enrollments"] = []
+    for enrollment in enrollments:
+        student_id = enrollment.pop("student_id")
+        by_student[student_id]["enrollments"].append(enrollment)
+
+    next_cursor = None
+    if has_more:
+        last = students[-1]
+        next_cursor = _encode_cursor(last[sort], last["student_id"])
+
+    return FastJSONResponse({"students": students, "next_cursor": next_cursor, "limit": limit})
+
+
+# GET → Stream students + enrollments as CSV / NDJSON
+# -----------------------------------------
+# Rows are read through an unbuffered server-side cursor on a dedicated
+# pooled connection and written out as they arrive, so memory stays flat
+# however many students there are. With batch_id the export is that
+# batch's roster (only enrollments in the batch).
+#
+# The connection is borrowed and the query started before the response
+# headers go out, so a busy pool or a failing query is still a 503 / 500.
+# If the client goes away mid-download the connection is closed rather than
+# returned: releasing it would first read every remaining row.
+
+EXPORT_FETCH_SIZE = 500
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _export_rows(filters: dict):
+    conditions, values = build_student_where(filters)
+
+    join_filter = ""
+    join_values = []
+    for key in ["batch_id", "workshop_id"]:
+        if filters.get(key) is not None:
+            join_filter += f" AND se.{key} = %s"
+            join_values.append(filters[key])
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+        SELECT {STUDENT_LIST_COLUMNS}, {ENROLLMENT_COLUMNS}
+        FROM students s
+        LEFT JOIN student_enrollments se ON s.student_id = se.student_id{join_filter}
+        LEFT JOIN batches b ON se.batch_id = b.id
+        LEFT JOIN workshops w ON se.workshop_id = w.workshop_id
+        {where}
+        ORDER BY s.student_id
+    """
+
+    pool = get_pool()
+    try:
+        conn = pool.acquire()
+    except PoolTimeout:
+        raise HTTPException(status_code=503, detail="Database is busy. Please retry shortly.")
+
+    finished = False
+    try:
+        cursor = conn.cursor(SS_CURSOR_CLASS)
+        try:
+            cursor.execute(query, tuple(join_values + values))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        yield None   # primed by export_students before the response starts
+
+        while True:
+            rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+            if not rows:
+                break
+            yield from rows
+        cursor.close()
+        finished = True
+    finally:
+        if finished:
+            pool.release(conn)
+        else:
+            pool.discard(conn)
+
+
+def _csv_stream(rows):
+    columns = STUDENT_LIST_FIELDS + ENROLLMENT_FIELDS
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for row in rows:
+        writer.writerow([row[c] for c in columns])
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+
+# One JSON line per student with enrollments nested. Rows arrive ordered by
+# student_id, so a student is complete as soon as the next one starts.
+def _ndjson_stream(rows):
+    chunk = []
+    size = 0
+    current = None
+
+    def line(student):
+        return json.dumps(student, default=str) + "\n"
+
+    for row in rows:
+        if current is None or row["student_id"] != current["student_id"]:
+            if current is not None:
+                chunk.append(line(current))
+                size += len(chunk[-1])
+                if size >= EXPORT_CHUNK_BYTES:
+                    yield "".join(chunk)
+                    chunk, size = [], 0
+            current = {field: row[field] for field in STUDENT_LIST_FIELDS}
+            current["enrollments"] = []
+        if row["enrollment_id"] is not None:
+            current["enrollments"].append({field: row[field] for field in ENROLLMENT_FIELDS})
+
+    if current is not None:
+        chunk.append(line(current))
+    yield "".join(chunk)
+
+
+@students_router_admin.get("/export")
+def export_students(format: Literal['csv', 'ndjson'] = 'csv',
+                    filters: dict = Depends(student_list_filters),
+                    user=Depends(require_admin_claims)):
+    rows = _export_rows(filters)
+    next(rows)   # borrow + execute now: errors become a 503 / 500, not a cut-off download
+    name = f"batch-{filters['batch_id']}-roster" if filters.get("batch_id") is not None else "students"
+
+    if format == "csv":
+        body, media_type = _csv_stream(rows), "text/csv"
+    else:
+        body, media_type = _ndjson_stream(rows), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'}
+    )
 
 
 # GET → Get specific student by ID 
@@ -103,8 +551,8 @@ async def get_students(conn=Depends(get_db_connection),
 
 @students_router_admin.get("/{student_id}")
 async def get_student(student_id: int,
-                      conn=Depends(get_db_connection),
-                      user=Depends(require_admin)):
+                      db=Depends(get_async_db),
+                      user=Depends(require_admin_claims)):
     query = """
         SELECT 
             s.student_id, s.first_name, s.last_name, s.email, s.phone, s.address,
@@ -120,9 +568,7 @@ async def get_student(student_id: int,
         WHERE s.student_id = %s
     """
     try:
-        with conn.cursor() as cursor:
-            cursor.execute(query, (student_id,))
-            student = cursor.fetchone()
+        student = await db.fetchone(query, (student_id,))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -138,7 +584,7 @@ async def get_student(student_id: int,
 @students_router_admin.put("/update/{student_id}")
 async def update_student(student_id: int,
                          student: StudentUpdate,
-                         conn=Depends(get_db_connection),
+                         db=Depends(get_async_db),
                          user=Depends(require_admin)):
     data = student.dict(exclude_unset=True)
     if not data:
@@ -154,16 +600,17 @@ async def update_student(student_id: int,
             fields.append(f"{key}=%s")
             values.append(data[key])
 
-    query = f"UPDATE students SET {', '.join(fields)} WHERE student_id=%s"
+    query = f"UPDATE students SET {', '.join(fields)}, {COMPLETION_SET_SQL} WHERE student_id=%s"
     values.append(student_id)
 
     try:
-        with conn.cursor() as cursor:
-            cursor.execute(query, tuple(values))
-            conn.commit()
+        await db.execute(query, tuple(values))
+        await db.commit()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    invalidate_student(student_id)
+    invalidate_student_dashboard(student_id)
     return {"message": f"Student {student_id} updated successfully by Admin {user['admin_id']}"}
 
 
@@ -172,15 +619,18 @@ async def update_student(student_id: int,
 
 @students_router_admin.delete("/delete/{student_id}")
 async def delete_student(student_id: int,
-                         conn=Depends(get_db_connection),
+                         db=Depends(get_async_db),
                          user=Depends(require_admin)):
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("DELETE FROM students WHERE student_id=%s", (student_id,))
-            conn.commit()
+        await db.run(remove_student_enrollments, student_id)   # their seats are free again
+        await db.execute("DELETE FROM students WHERE student_id=%s", (student_id,))
+        await db.commit()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    invalidate_student(student_id)
+    invalidate_student_dashboard(student_id)
+
     return {"message": f"Student {student_id} deleted successfully by Admin {user['admin_id']}"}
 
 
@@ -251,7 +701,9 @@ def delete_incomplete_student(
             (student_id,)
         )
         affected = cursor.rowcount
-        conn.commit()
+    if affected:
+        remove_student_enrollments(conn, student_id)
+    conn.commit()
 
     if affected == 0:
         raise HTTPException(
@@ -259,5 +711,8 @@ def delete_incomplete_student(
             detail=f"Student {student_id} not found or profile is completed"
         )
 
+    invalidate_student(student_id)
+    invalidate_student_dashboard(student_id)
+
     return {"message": f"Incomplete profile student {student_id} deleted successfully"}
 
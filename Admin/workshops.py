@@ -1,6 +1,10 @@
 from fastapi import APIRouter, HTTPException, Request, Depends
-from database.db import get_db_connection
+from database.async_db import get_async_db
+from Admin.dashboard_stats import bump_stat, record_fee_change
+from Admin.catalog_cache import catalog_cache, ALL
+from Students.student_dashboard import clear_student_dashboards
 from auth.jwt.jwt_auth import require_admin  
+from fast_json import FastJSONResponse
 
 workshops_router = APIRouter(prefix="/workshops", tags=["Workshops"])
 
@@ -10,20 +14,16 @@ workshops_router = APIRouter(prefix="/workshops", tags=["Workshops"])
 # Add Workshop (Admin only)
 @workshops_router.post("/add")
 async def add_workshop(request: Request,
-                       conn=Depends(get_db_connection),
+                       db=Depends(get_async_db),
                        user=Depends(require_admin)):   
     data = await request.json()
 
     if not data:
         raise HTTPException(status_code=400, detail="No data provided")
 
-    cursor = conn.cursor()
-
     # 1. Fetch category_name from categories table
-    cursor.execute("SELECT name FROM categories WHERE category_id = %s", (data["category_id"],))
-    category = cursor.fetchone()
+    category = await db.fetchone("SELECT name FROM categories WHERE category_id = %s", (data["category_id"],))
     if not category:
-        cursor.close()
         raise HTTPException(status_code=400, detail="Invalid category_id")
 
     category_name = category["name"]
@@ -36,7 +36,7 @@ async def add_workshop(request: Request,
             )
             VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)"""
     
-    cursor.execute(query, (
+    await db.execute(query, (
         data["category_id"], category_name, data["name"], data.get("description"),
         data["duration_days"], data.get("minutes_per_session", 60),
         data.get("sessions_per_day", 1), data.get("capacity", 0),
@@ -44,8 +44,9 @@ async def add_workshop(request: Request,
         data.get("status", "Upcoming"), data.get("workshop_image"),
         data.get("start_date")
     ))
-    conn.commit()
-    cursor.close()
+    await db.run(bump_stat, "total_workshops", 1)
+    await db.commit()
+    catalog_cache.invalidate("workshops")
 
     return {"message": f"Workshop added successfully by Admin {user['admin_id']}"}
 
@@ -54,14 +55,13 @@ async def add_workshop(request: Request,
 @workshops_router.put("/update/{workshop_id}")
 async def update_workshop(workshop_id: int,
                           request: Request,
-                          conn=Depends(get_db_connection),
+                          db=Depends(get_async_db),
                           user=Depends(require_admin)):
     data = await request.json()
 
     if not data:
         raise HTTPException(status_code=400, detail="No data provided")
 
-    cursor = conn.cursor()
     fields = []
     values = []
 
@@ -73,15 +73,22 @@ async def update_workshop(workshop_id: int,
             values.append(data[key])
 
     if not fields:
-        cursor.close()
         raise HTTPException(status_code=400, detail="No valid fields provided to update")
 
     query = f"UPDATE workshops SET {', '.join(fields)} WHERE workshop_id=%s"
     values.append(workshop_id)
 
-    cursor.execute(query, tuple(values))
-    conn.commit()
-    cursor.close()
+    # enrollments were booked at the old fee; lock it so concurrent edits apply in turn
+    old = None
+    if "fee" in data:
+        old = await db.fetchone("SELECT fee FROM workshops WHERE workshop_id=%s FOR UPDATE", (workshop_id,))
+
+    await db.execute(query, tuple(values))
+    if old:
+        await db.run(record_fee_change, workshop_id, old["fee"], data["fee"])
+    await db.commit()
+    catalog_cache.invalidate("workshops")
+    clear_student_dashboards()
 
     return {"message": f"Workshop updated successfully by Admin {user['admin_id']}"}
 
@@ -89,12 +96,16 @@ async def update_workshop(workshop_id: int,
 # Delete workshop (Admin only)
 @workshops_router.delete("/delete/{workshop_id}")
 async def delete_workshop(workshop_id: int,
-                          conn=Depends(get_db_connection),
+                          db=Depends(get_async_db),
                           user=Depends(require_admin)):
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM workshops WHERE workshop_id = %s", (workshop_id,))
-    conn.commit()
-    cursor.close()
+    old = await db.fetchone("SELECT fee FROM workshops WHERE workshop_id=%s FOR UPDATE", (workshop_id,))
+    if old:
+        await db.execute("DELETE FROM workshops WHERE workshop_id = %s", (workshop_id,))
+        await db.run(bump_stat, "total_workshops", -1)
+        await db.run(record_fee_change, workshop_id, old["fee"], 0)
+    await db.commit()
+    catalog_cache.invalidate("workshops", "batches")
+    clear_student_dashboards()
 
     return {"message": f"Workshop deleted successfully by Admin {user['admin_id']}"}
 
@@ -103,25 +114,28 @@ async def delete_workshop(workshop_id: int,
 
 # Get all workshops (Public)
 @workshops_router.get("/")
-async def get_workshops(conn=Depends(get_db_connection)):
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM workshops")
-    result = cursor.fetchall()
-    cursor.close()
+async def get_workshops(db=Depends(get_async_db)):
+    version = catalog_cache.version("workshops")
+    result = catalog_cache.get("workshops", ALL)
+    if result is None:
+        result = await db.fetchall("SELECT * FROM workshops")
+        catalog_cache.set("workshops", ALL, result, version)
 
     if not result:
         return {"message": "No workshops found"}
-    return result
+    return FastJSONResponse(result)
 
 
 # Get specific workshop (Public)
 @workshops_router.get("/{workshop_id}")
 async def get_workshop(workshop_id: int,
-                       conn=Depends(get_db_connection)):
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM workshops WHERE workshop_id = %s", (workshop_id,))
-    result = cursor.fetchone()
-    cursor.close()
+                       db=Depends(get_async_db)):
+    version = catalog_cache.version("workshops")
+    result = catalog_cache.get("workshops", workshop_id)
+    if result is None:
+        result = await db.fetchone("SELECT * FROM workshops WHERE workshop_id = %s", (workshop_id,))
+        if result:
+            catalog_cache.set("workshops", workshop_id, result, version)
 
     if not result:
         raise HTTPException(status_code=404, detail="Workshop not found")
@@ -1,6 +1,8 @@
+import os
 from fastapi import APIRouter, Depends, HTTPException
 from database.db import get_db_connection
-from auth.jwt.jwt_auth import require_student
+from database.cache import TTLCache
+from auth.jwt.jwt_auth import require_student_claims
 from pydantic import BaseModel
 from typing import List
 
@@ -9,24 +11,57 @@ clarity_call_router = APIRouter(
     tags=["Clarity Call"]
 )
 
+# The question set changes rarely (it is edited directly in the DB), so it is
+# cached for the questionnaire page and for validating submissions.
+CLARITY_QUESTIONS_TTL = float(os.getenv("CLARITY_QUESTIONS_TTL", "300"))
+
+_questions_cache = TTLCache(max_size=1, ttl=CLARITY_QUESTIONS_TTL)
+
+CALL_STATUS_SQL = """
+    SELECT call_status
+    FROM clarity_calls
+    WHERE student_id = %s
+    ORDER BY scheduled_date DESC
+    LIMIT 1
+"""
+CALL_HISTORY_SQL = """
+    SELECT id, mentor_name, call_status, scheduled_date, notes
+    FROM clarity_calls
+    WHERE student_id = %s
+    ORDER BY scheduled_date DESC
+"""
+RESPONSES_SQL = """
+    SELECT q.question, r.answer
+    FROM clarity_responses r
+    JOIN clarity_questions q ON r.question_id = q.id
+    WHERE r.student_id = %s
+    ORDER BY r.question_id ASC
+"""
+
+
+def get_clarity_questions(conn, refresh=False):
+    questions = None if refresh else _questions_cache.get("questions")
+    if questions is None:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT id, question, options
+                FROM clarity_questions
+                ORDER BY id ASC
+            """)
+            questions = cursor.fetchall()
+        _questions_cache.set("questions", questions)
+    return questions
+
 # 1) GET → Clarity Call Status
 # ------------------------------
 
 @clarity_call_router.get("/clarity_call_status")
-def get_clarity_call_status(student=Depends(require_student), conn=Depends(get_db_connection)):
+def get_clarity_call_status(student=Depends(require_student_claims), conn=Depends(get_db_connection)):
 
     student_id = student["student_id"]
 
-    query = """
-        SELECT call_status
-        FROM clarity_calls
-        WHERE student_id = %s
-        ORDER BY scheduled_date DESC
-        LIMIT 1
-    """
-
     with conn.cursor() as cursor:
-        cursor.execute(query, (student_id,))
+        cursor.execute(CALL_STATUS_SQL, (student_id,))
         record = cursor.fetchone()
 
     if not record:
@@ -39,19 +74,12 @@ def get_clarity_call_status(student=Depends(require_student), conn=Depends(get_d
 # ----------------------
 
 @clarity_call_router.get("/history")
-def clarity_call_history(student=Depends(require_student), conn=Depends(get_db_connection)):
+def clarity_call_history(student=Depends(require_student_claims), conn=Depends(get_db_connection)):
 
     student_id = student["student_id"]
 
-    query = """
-        SELECT id, mentor_name, call_status, scheduled_date, notes
-        FROM clarity_calls
-        WHERE student_id = %s
-        ORDER BY scheduled_date DESC
-    """
-
     with conn.cursor() as cursor:
-        cursor.execute(query, (student_id,))
+        cursor.execute(CALL_HISTORY_SQL, (student_id,))
         rows = cursor.fetchall()
 
     return {"history": rows or []}
@@ -61,17 +89,9 @@ def clarity_call_history(student=Depends(require_student), conn=Depends(get_db_c
 # -----------------------------
 
 @clarity_call_router.get("/precall_questionnaire")
-def get_pre_call_questions(student=Depends(require_student), conn=Depends(get_db_connection)):
+def get_pre_call_questions(student=Depends(require_student_claims), conn=Depends(get_db_connection)):
 
-    query = """
-        SELECT id, question, options
-        FROM clarity_questions
-        ORDER BY id ASC
-    """
-
-    with conn.cursor() as cursor:
-        cursor.execute(query)
-        rows = cursor.fetchall()
+    rows = get_clarity_questions(conn)
 
     if not rows:
         raise HTTPException(status_code=404, detail="No questions found")
@@ -96,7 +116,7 @@ class SubmitPayload(BaseModel):
 @clarity_call_router.post("/submit_precall_questionnaire")
 def submit_pre_call_responses(
     payload: SubmitPayload,
-    student=Depends(require_student),
+    student=Depends(require_student_claims),
     conn=Depends(get_db_connection)
 ):
 
@@ -105,23 +125,38 @@ def submit_pre_call_responses(
     if not payload.responses:
         raise HTTPException(status_code=400, detail="No responses submitted")
 
+    # A question answered twice in one payload keeps the last answer
+    answers = {r.question_id: r.answer for r in payload.responses}
+
     # validation
-    for r in payload.responses:
-        if r.answer not in ["A", "B", "C", "D"]:
+    for question_id, answer in answers.items():
+        if answer not in ["A", "B", "C", "D"]:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid answer '{r.answer}' for question {r.question_id}"
+                detail=f"Invalid answer '{answer}' for question {question_id}"
             )
 
+    known = {q["id"] for q in get_clarity_questions(conn)}
+    if not known.issuperset(answers):
+        # Maybe a question was added since the cache was filled
+        known = {q["id"] for q in get_clarity_questions(conn, refresh=True)}
+    unknown = sorted(set(answers) - known)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown question id(s): {', '.join(map(str, unknown))}"
+        )
+
+    # One multi-row statement; resubmitting replaces the previous answers
     with conn.cursor() as cursor:
-        for r in payload.responses:
-            cursor.execute(
-                """
-                INSERT INTO clarity_responses (student_id, question_id, answer)
-                VALUES (%s, %s, %s)
-                """,
-                (student_id, r.question_id, r.answer),
-            )
+        cursor.executemany(
+            """
+            INSERT INTO clarity_responses (student_id, question_id, answer)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE answer = VALUES(answer)
+            """,
+            [(student_id, question_id, answer) for question_id, answer in answers.items()]
+        )
         conn.commit()
 
     return {"message": "Responses saved successfully"}
@@ -132,22 +167,14 @@ def submit_pre_call_responses(
 
 @clarity_call_router.get("/precall_questionnaire_responses")
 def get_student_responses(
-    student=Depends(require_student),
+    student=Depends(require_student_claims),
     conn=Depends(get_db_connection)
 ):
 
     student_id = student["student_id"]
 
-    query = """
-        SELECT q.question, r.answer
-        FROM clarity_responses r
-        JOIN clarity_questions q ON r.question_id = q.id
-        WHERE r.student_id = %s
-        ORDER BY r.question_id ASC
-    """
-
     with conn.cursor() as cursor:
-        cursor.execute(query, (student_id,))
+        cursor.execute(RESPONSES_SQL, (student_id,))
         rows = cursor.fetchall()
 
     return {"responses": rows or []}
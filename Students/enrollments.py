@@ -1,84 +1,108 @@
+import pymysql
+from pymysql.constants.ER import DUP_ENTRY as ER_DUP_ENTRY
 from fastapi import APIRouter, Depends, HTTPException
-from database.db import get_db_connection
-from auth.jwt.jwt_auth import require_student  
+from database.async_db import get_async_db
+from Admin.dashboard_stats import record_enrollment
+from auth.jwt.jwt_auth import require_student, require_student_claims
+from Students.student_dashboard import invalidate_student_dashboard
 
 enrollments_router = APIRouter(prefix="/enrollments", tags=["Enrollments"])
 
+# ---------------------------
+# Enrollment rules (shared with the admin bulk import)
+# ---------------------------
+
+def get_enrollment_status(workshop_status, batch_status):
+    if workshop_status in ("Completed", "Cancelled"):
+        raise HTTPException(status_code=400, detail=f"Cannot enroll: Workshop is {workshop_status}")
+    if batch_status in ("Completed", "Cancelled"):
+        raise HTTPException(status_code=400, detail=f"Cannot enroll: Batch is {batch_status}")
+
+    if workshop_status == "Active" and batch_status == "Active":
+        return "Active"
+    if workshop_status == "Upcoming" and batch_status == "Upcoming":
+        return "Upcoming"
+    raise HTTPException(
+        status_code=400,
+        detail=f"Cannot enroll: Workshop is {workshop_status} and Batch is {batch_status}"
+    )
+
+
 # ---------------------------
 # Enroll in Workshop + Batch
 # ---------------------------
 
+ENROLL_LOCK_SQL = """
+    SELECT w.name, w.status AS workshop_status, w.fee,
+           b.id AS batch_id, b.batch_name, b.status AS batch_status
+    FROM workshops w
+    LEFT JOIN batches b ON b.id = %s AND b.workshop_id = w.workshop_id
+    WHERE w.workshop_id = %s
+    FOR UPDATE OF b
+"""
+
+# The whole enrollment is one transaction on one connection:
+#   1. read workshop + batch together, locking the batch row so status and
+#      seat checks cannot interleave with another enrollment in that batch;
+#      a batch of another workshop is "Batch not found"
+#   2. insert; the unique (student_id, workshop_id, batch_id) key rejects
+#      duplicates, so there is no separate "already enrolled" query
+#   3. take a seat with a conditional UPDATE (fails once the batch is full)
+def _enroll(conn, student_id, workshop_id, batch_id):
+    with conn.cursor() as cursor:
+        cursor.execute(ENROLL_LOCK_SQL, (batch_id, workshop_id))
+        row = cursor.fetchone()
+
+        try:
+            if not row:
+                raise HTTPException(status_code=404, detail="Workshop not found")
+            if row["batch_id"] is None:
+                raise HTTPException(status_code=404, detail="Batch not found")
+
+            enrollment_status = get_enrollment_status(row["workshop_status"], row["batch_status"])
+
+            try:
+                cursor.execute(
+                    """
+                    INSERT INTO student_enrollments
+                    (student_id, workshop_id, batch_id, status, enrollment_date)
+                    VALUES (%s, %s, %s, %s, NOW())
+                    """,
+                    (student_id, workshop_id, batch_id, enrollment_status)
+                )
+            except pymysql.err.IntegrityError as e:
+                if e.args[0] == ER_DUP_ENTRY:
+                    raise HTTPException(status_code=400, detail="Already enrolled in this workshop/batch")
+                raise
+
+            if not record_enrollment(conn, batch_id, row["fee"]):
+                raise HTTPException(status_code=409, detail="Batch is full")
+        except Exception:
+            conn.rollback()
+            raise
+
+    conn.commit()
+    return row, enrollment_status
+
+
 @enrollments_router.post("/enroll/{workshop_id}/{batch_id}")
 async def enroll_student(
     workshop_id: int,
     batch_id: int,
     user=Depends(require_student),
-    conn=Depends(get_db_connection)
+    db=Depends(get_async_db)
 ):
-    student_id = user["student_id"]
+    try:
+        row, enrollment_status = await db.run(_enroll, user["student_id"], workshop_id, batch_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Enrollment failed: {str(e)}")
 
-    with conn.cursor() as cursor:
-        # Check student
-        cursor.execute("SELECT first_name FROM students WHERE student_id=%s", (student_id,))
-        student = cursor.fetchone()
-        if not student:
-            raise HTTPException(status_code=404, detail="Student not found")
-
-        # Workshop check
-        cursor.execute("SELECT name, status FROM workshops WHERE workshop_id=%s", (workshop_id,))
-        workshop = cursor.fetchone()
-        if not workshop:
-            raise HTTPException(status_code=404, detail="Workshop not found")
-
-        # Batch check
-        cursor.execute("SELECT batch_name, status FROM batches WHERE id=%s", (batch_id,))
-        batch = cursor.fetchone()
-        if not batch:
-            raise HTTPException(status_code=404, detail="Batch not found")
-
-        # Enrollment rules
-        if workshop["status"] in ("Completed", "Cancelled"):
-            raise HTTPException(status_code=400, detail=f"Cannot enroll: Workshop is {workshop['status']}")
-        if batch["status"] in ("Completed", "Cancelled"):
-            raise HTTPException(status_code=400, detail=f"Cannot enroll: Batch is {batch['status']}")
-
-        if workshop["status"] == "Active" and batch["status"] == "Active":
-            enrollment_status = "Active"
-        elif workshop["status"] == "Upcoming" and batch["status"] == "Upcoming":
-            enrollment_status = "Upcoming"
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cannot enroll: Workshop is {workshop['status']} and Batch is {batch['status']}"
-            )
-
-        # Check if already enrolled
-        cursor.execute(
-            """
-            SELECT id FROM student_enrollments
-            WHERE student_id=%s AND workshop_id=%s AND batch_id=%s
-            """,
-            (student_id, workshop_id, batch_id)
-        )
-        if cursor.fetchone():
-            raise HTTPException(status_code=400, detail="Already enrolled in this workshop/batch")
-
-        # Insert new enrollment
-        try:
-            cursor.execute(
-                """
-                INSERT INTO student_enrollments 
-                (student_id, workshop_id, batch_id, status, enrollment_date)
-                VALUES (%s, %s, %s, %s, NOW())
-                """,
-                (student_id, workshop_id, batch_id, enrollment_status)
-            )
-            conn.commit()
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Enrollment failed: {str(e)}")
+    invalidate_student_dashboard(user["student_id"])
 
     return {
-        "message": f"Student {student['first_name']} enrolled in {workshop['name']} ({batch['batch_name']})",
+        "message": f"Student {user['first_name']} enrolled in {row['name']} ({row['batch_name']})",
         "status": enrollment_status
     }
 
@@ -86,26 +110,25 @@ async def enroll_student(
 # ---------------------------
 # View My Enrollments
 # ---------------------------
+MY_ENROLLMENTS_SQL = """
+    SELECT
+        w.name AS workshop_name,
+        b.batch_name,
+        se.status,
+        se.enrollment_date
+    FROM student_enrollments se
+    JOIN workshops w ON se.workshop_id = w.workshop_id
+    JOIN batches b ON se.batch_id = b.id
+    WHERE se.student_id = %s
+    ORDER BY se.enrollment_date DESC
+"""
+
+
 @enrollments_router.get("/my-enrollments")
-async def my_enrollments(user=Depends(require_student), conn=Depends(get_db_connection)):
+async def my_enrollments(user=Depends(require_student_claims), db=Depends(get_async_db)):
     student_id = user["student_id"]
 
-    query = """
-        SELECT 
-            w.name AS workshop_name,
-            b.batch_name,
-            se.status,
-            se.enrollment_date
-        FROM student_enrollments se
-        JOIN workshops w ON se.workshop_id = w.workshop_id
-        JOIN batches b ON se.batch_id = b.id
-        WHERE se.student_id = %s
-        ORDER BY se.enrollment_date DESC
-    """
-
-    with conn.cursor(dictionary=True) as cursor:
-        cursor.execute(query, (student_id,))
-        rows = cursor.fetchall()
+    rows = await db.fetchall(MY_ENROLLMENTS_SQL, (student_id,))
 
     if not rows:
         return {"message": "No enrollments found"}
@@ -0,0 +1,85 @@
+# Profile completion
+# -----------------------------------------
+# Completion is stored on the students row and kept current on every write
+# that touches profile fields:
+#   profile_missing_mask    bit i set = REQUIRED_FIELDS[i] is empty
+#   profile_completion_pct  share of required fields filled, 0-100
+#   profile_completed       1 when nothing is missing
+# Readers (completion/progress endpoints, the resources gate, the admin list)
+# only read these columns.
+
+REQUIRED_FIELDS = [
+    "first_name", "last_name", "email", "phone",
+    "address", "profession", "designation", "gender"
+]
+
+FULL_MASK = (1 << len(REQUIRED_FIELDS)) - 1
+
+
+def _is_filled(value) -> bool:
+    return value not in (None, False) and str(value).strip() != ""
+
+
+def missing_mask(student: dict) -> int:
+    mask = 0
+    for bit, field in enumerate(REQUIRED_FIELDS):
+        if not _is_filled(student.get(field)):
+            mask |= 1 << bit
+    return mask
+
+
+def completion_pct(mask: int) -> float:
+    filled = len(REQUIRED_FIELDS) - bin(mask).count("1")
+    return round(filled / len(REQUIRED_FIELDS) * 100, 2)
+
+
+def completion_columns(student: dict) -> dict:
+    """Values of the three stored columns, for INSERTs built in Python."""
+    mask = missing_mask(student)
+    return {
+        "profile_missing_mask": mask,
+        "profile_completion_pct": completion_pct(mask),
+        "profile_completed": mask == 0,
+    }
+
+
+def describe_mask(mask: int) -> dict:
+    """field -> filled? for every required field."""
+    return {field: not mask & (1 << bit) for bit, field in enumerate(REQUIRED_FIELDS)}
+
+
+# SET clause recomputing the stored columns from the row itself. MySQL
+# applies single-table UPDATE assignments left to right, so appended after
+# other assignments it sees their new values, and the later columns see the
+# new mask. Profile edits therefore stay a single statement.
+COMPLETION_SET_SQL = (
+    "profile_missing_mask = "
+    + " | ".join(
+        f"(CASE WHEN COALESCE(TRIM({field}), '') = '' THEN {1 << bit} ELSE 0 END)"
+        for bit, field in enumerate(REQUIRED_FIELDS)
+    )
+    + f", profile_completion_pct = ROUND(100 * ({len(REQUIRED_FIELDS)} - BIT_COUNT(profile_missing_mask))"
+      f" / {len(REQUIRED_FIELDS)}, 2)"
+    + ", profile_completed = (profile_missing_mask = 0)"
+)
+
+
+def refresh_profile_completion(conn, student_id):
+    """Recompute the stored completion of one student. Caller commits."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE students SET {COMPLETION_SET_SQL} WHERE student_id=%s",
+            (student_id,)
+        )
+
+
+def read_profile_completion(conn, student_id):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT profile_missing_mask, profile_completion_pct, profile_completed
+            FROM students WHERE student_id=%s
+            """,
+            (student_id,)
+        )
+        return cursor.fetchone()
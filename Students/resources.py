@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from database.db import get_db_connection
-from auth.jwt.jwt_auth import require_student
+from auth.jwt.jwt_auth import require_student_claims
+from Students.profile_completion import read_profile_completion
 
 resource_router = APIRouter(prefix="/auth/resources", tags=["Resources"])
 
@@ -9,20 +10,15 @@ resource_router = APIRouter(prefix="/auth/resources", tags=["Resources"])
 #  -----------------------------------------
 @resource_router.get("/")
 def get_resources(
-    student=Depends(require_student),
+    student=Depends(require_student_claims),
     conn=Depends(get_db_connection)
 ):
-    student_id = student["student_id"]
-
-    # Verify profile completion
-    with conn.cursor() as cursor:
-        cursor.execute(
-            "SELECT profile_completed FROM students WHERE student_id=%s",
-            (student_id,)
-        )
-        result = cursor.fetchone()
-
-    if not result or not result["profile_completed"]:
+    # Stored completion flag, read from the row (primary-key lookup): the
+    # cached principal may predate a profile update made on another worker
+    completion = read_profile_completion(conn, student["student_id"])
+    if not completion:
+        raise HTTPException(status_code=404, detail="Student not found")
+    if not completion["profile_completed"]:
         raise HTTPException(
             status_code=403,
             detail="Profile must be 100% completed to access resources"
@@ -45,7 +41,7 @@ def get_resources(
 # GET → Fetch Resource Categories
 #  -----------------------------------------
 @resource_router.get("/categories")
-def get_resource_categories(student=Depends(require_student), conn=Depends(get_db_connection)):
+def get_resource_categories(student=Depends(require_student_claims), conn=Depends(get_db_connection)):
     query = "SELECT name FROM resource_categories ORDER BY name"
 
     with conn.cursor() as cursor:
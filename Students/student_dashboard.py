@@ -1,37 +1,79 @@
+import os
+import threading
 from fastapi import APIRouter, Depends, HTTPException
 from database.db import get_db_connection
-from auth.jwt.jwt_auth import require_student
+from database.cache import TTLCache
+from Students.profile_completion import read_profile_completion, describe_mask
+from auth.jwt.jwt_auth import require_student_claims
 
 student_dashboard_router = APIRouter(prefix="/student/dashboard", tags=["Student Dashboard"])
 
-@student_dashboard_router.get("/profile")
-def get_student_dashboard(student=Depends(require_student), conn=Depends(get_db_connection)):
-    
-    if not student:
-        raise HTTPException(status_code=401, detail="Unauthorized access")
-
-    student_id = student["student_id"]
-
-    query = """
-        SELECT 
-            s.student_id, s.first_name, s.last_name, s.email, s.phone, s.address,
-            s.profession, s.designation, s.gender, s.status,
-            se.status AS enrollment_status, se.enrollment_date,
-            b.batch_name, b.status AS batch_status,
-            w.name AS workshop_name
-        FROM students s
-        LEFT JOIN student_enrollments se ON s.student_id = se.student_id
-        LEFT JOIN batches b ON se.batch_id = b.id
-        LEFT JOIN workshops w ON se.workshop_id = w.workshop_id
-        WHERE s.student_id = %s
-    """
-
+# Dashboard read model
+# -----------------------------
+# The whole dashboard (profile, enrollments and latest clarity-call status)
+# is built with one query and cached per student. Writes that change it call
+# invalidate_student_dashboard(); the TTL bounds staleness on other workers.
+# A build records the student's generation before it reads and is only
+# cached if no invalidate (or clear) happened while it ran.
+STUDENT_DASHBOARD_TTL = float(os.getenv("STUDENT_DASHBOARD_TTL", "60"))
+STUDENT_DASHBOARD_CACHE_SIZE = int(os.getenv("STUDENT_DASHBOARD_CACHE_SIZE", "10000"))
+
+_dashboard_cache = TTLCache(max_size=STUDENT_DASHBOARD_CACHE_SIZE, ttl=STUDENT_DASHBOARD_TTL)
+
+
+# student_id -> generation, plus one epoch bumped by clear_student_dashboards()
+_generations = {}
+_epoch = 0
+_generations_lock = threading.Lock()
+
+
+def _generation(student_id):
+    return _epoch, _generations.get(student_id, 0)
+
+
+def invalidate_student_dashboard(student_id):
+    with _generations_lock:
+        _generations[student_id] = _generations.get(student_id, 0) + 1
+    _dashboard_cache.pop(student_id)
+
+
+# Batch / workshop edits change names and statuses shown on every dashboard
+def clear_student_dashboards():
+    global _epoch
+    with _generations_lock:
+        _epoch += 1
+    _dashboard_cache.clear()
+
+
+DASHBOARD_SQL = """
+    SELECT
+        s.student_id, s.first_name, s.last_name, s.email, s.phone, s.address,
+        s.profession, s.designation, s.gender, s.status,
+        (
+            SELECT cc.call_status FROM clarity_calls cc
+            WHERE cc.student_id = s.student_id
+            ORDER BY cc.scheduled_date DESC
+            LIMIT 1
+        ) AS clarity_call_status,
+        se.status AS enrollment_status, se.enrollment_date,
+        b.batch_name, b.status AS batch_status,
+        w.name AS workshop_name
+    FROM students s
+    LEFT JOIN student_enrollments se ON s.student_id = se.student_id
+    LEFT JOIN batches b ON se.batch_id = b.id
+    LEFT JOIN workshops w ON se.workshop_id = w.workshop_id
+    WHERE s.student_id = %s
+    ORDER BY se.enrollment_date DESC
+"""
+
+
+def build_student_dashboard(conn, student_id):
     with conn.cursor() as cursor:
-        cursor.execute(query, (student_id,))
+        cursor.execute(DASHBOARD_SQL, (student_id,))
         rows = cursor.fetchall()
 
     if not rows:
-        raise HTTPException(status_code=404, detail="Student not found")
+        return None
 
     # Build base student info
     student_info = {
@@ -45,6 +87,7 @@ def get_student_dashboard(student=Depends(require_student), conn=Depends(get_db_
         "designation": rows[0]["designation"],
         "gender": rows[0]["gender"],
         "status": rows[0]["status"],
+        "clarity_call_status": rows[0]["clarity_call_status"] or "Not Scheduled",
         "enrollments": []
     }
 
@@ -63,12 +106,32 @@ def get_student_dashboard(student=Depends(require_student), conn=Depends(get_db_
                 }
             })
 
-    full_response = {
+    return {
         "message": f"Welcome {student_info['first_name']} {student_info['last_name']}!",
         "student": student_info
     }
 
-    return full_response
+
+@student_dashboard_router.get("/profile")
+def get_student_dashboard(student=Depends(require_student_claims), conn=Depends(get_db_connection)):
+    
+    if not student:
+        raise HTTPException(status_code=401, detail="Unauthorized access")
+
+    student_id = student["student_id"]
+
+    dashboard = _dashboard_cache.get(student_id)
+    if dashboard is None:
+        generation = _generation(student_id)
+        dashboard = build_student_dashboard(conn, student_id)
+        if dashboard is None:
+            raise HTTPException(status_code=404, detail="Student not found")
+        with _generations_lock:
+            # skip the fill if the dashboard was invalidated during the build
+            if _generation(student_id) == generation:
+                _dashboard_cache.set(student_id, dashboard)
+
+    return dashboard
 
 
 
@@ -77,37 +140,20 @@ def get_student_dashboard(student=Depends(require_student), conn=Depends(get_db_
 #  Profile Completion Status
 # -----------------------------
 @student_dashboard_router.get("/profile_completion")
-def get_profile_completion(student=Depends(require_student), conn=Depends(get_db_connection)):
+def get_profile_completion(student=Depends(require_student_claims), conn=Depends(get_db_connection)):
     if not student:
         raise HTTPException(status_code=401, detail="Unauthorized access")
 
     student_id = student["student_id"]
 
-    query = """
-        SELECT first_name, last_name, email, phone, address, profession, designation, gender
-        FROM students WHERE student_id = %s
-    """
-
-    with conn.cursor() as cursor:
-        cursor.execute(query, (student_id,))
-        data = cursor.fetchone()
-
+    data = read_profile_completion(conn, student_id)
     if not data:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    required_fields = ["first_name", "last_name", "email", "phone", "address", "profession", "designation", "gender"]
-    filled_fields = [f for f in required_fields if data.get(f)]
-    missing_fields = [f for f in required_fields if not data.get(f)]
-
-    completion_percent = round((len(filled_fields) / len(required_fields)) * 100, 2)
+    progress = describe_mask(data["profile_missing_mask"])
 
     return {
-        "profile_completion": f"{completion_percent}%",
-        "filled_fields": filled_fields,
-        "missing_fields": missing_fields
+        "profile_completion": f"{float(data['profile_completion_pct'])}%",
+        "filled_fields": [f for f, filled in progress.items() if filled],
+        "missing_fields": [f for f, filled in progress.items() if not filled]
     }
-
-
-
-
-
@@ -3,6 +3,9 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional, Literal
 from database.db import get_db_connection
 from auth.jwt.jwt_auth import require_student
+from auth.jwt.principal_cache import invalidate_student
+from Students.profile_completion import COMPLETION_SET_SQL
+from Students.student_dashboard import invalidate_student_dashboard
 
 update_student_router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -22,17 +25,6 @@ class StudentUpdate(BaseModel):
     gender: Optional[Literal["male", "female", "other"]] = None
 
 
-# Helper — check profile completion
-# -------------------------
-
-def is_profile_complete(s: dict):
-    required_fields = [
-        "first_name", "last_name", "email", "phone",
-        "address", "profession", "designation", "gender"
-    ]
-    return all(s.get(f) not in (None, "", False) for f in required_fields)
-
-
 # Update endpoint
 # -------------------------
 @update_student_router.put("/student/update")
@@ -57,12 +49,13 @@ def update_student_profile(
             if existing and existing["student_id"] != student_id:
                 raise HTTPException(status_code=400, detail="Email already in use")
 
-    # Build update SQL dynamically
+    # Build update SQL dynamically; the stored completion is recomputed in
+    # the same statement
     set_parts = [f"{field}=%s" for field in data.keys()]
     values = list(data.values())
     values.append(student_id)
 
-    update_query = f"UPDATE students SET {', '.join(set_parts)} WHERE student_id=%s"
+    update_query = f"UPDATE students SET {', '.join(set_parts)}, {COMPLETION_SET_SQL} WHERE student_id=%s"
 
     with conn.cursor() as cursor:
         cursor.execute(update_query, tuple(values))
@@ -72,7 +65,7 @@ def update_student_profile(
         cursor.execute(
             """
             SELECT first_name, last_name, email, phone, address,
-                   profession, designation, gender
+                   profession, designation, gender, profile_completed
             FROM students WHERE student_id=%s
             """,
             (student_id,)
@@ -82,16 +75,10 @@ def update_student_profile(
     if not updated:
         raise HTTPException(status_code=404, detail="Student not found after update")
 
-    # Determine profile completion
-    profile_done = is_profile_complete(updated)
+    profile_done = updated.pop("profile_completed")
 
-    # Update DB
-    with conn.cursor() as cursor:
-        cursor.execute(
-            "UPDATE students SET profile_completed=%s WHERE student_id=%s",
-            (profile_done, student_id)
-        )
-        conn.commit()
+    invalidate_student(student_id)
+    invalidate_student_dashboard(student_id)
 
     return {
         "message": "Profile updated successfully",
@@ -0,0 +1,124 @@
+import os
+import re
+import threading
+import time
+
+import requests
+from google.auth import jwt as google_jwt
+
+from database.jobs import run_periodically
+
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+GOOGLE_CERTS_DEFAULT_MAX_AGE = int(os.getenv("GOOGLE_CERTS_DEFAULT_MAX_AGE", "3600"))   # when no max-age is sent
+GOOGLE_CERTS_REFRESH_AHEAD = int(os.getenv("GOOGLE_CERTS_REFRESH_AHEAD", "300"))        # seconds before expiry
+GOOGLE_CERTS_CHECK_INTERVAL = int(os.getenv("GOOGLE_CERTS_CHECK_INTERVAL", "60"))
+GOOGLE_CERTS_TIMEOUT = float(os.getenv("GOOGLE_CERTS_TIMEOUT", "5"))
+UNKNOWN_KID_REFETCH_INTERVAL = 60   # a forged kid must not turn every request into a fetch
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+# Google signing certificates
+# -----------------------------------------
+# id_tokens are verified locally against Google's public certificates, kept
+# in memory for the max-age Google sends in Cache-Control. A background job
+# refetches them GOOGLE_CERTS_REFRESH_AHEAD seconds before they expire, so
+# logins normally never wait on the network. If a refresh fails the old
+# certificates stay in use and the job tries again. A token signed with a key
+# we don't know yet (Google rotated early) triggers one refetch, at most
+# every UNKNOWN_KID_REFETCH_INTERVAL seconds.
+
+
+class GoogleCertsUnavailable(Exception):
+    pass
+
+
+class GoogleCertCache:
+    def __init__(self, url):
+        self.url = url
+        self._certs = None
+        self._expires_at = 0.0
+        self._last_forced = 0.0
+        self._lock = threading.Lock()
+        self._session = requests.Session()   # keep-alive between refreshes
+        self.fetches = 0
+
+    def _fetch(self):
+        resp = self._session.get(self.url, timeout=GOOGLE_CERTS_TIMEOUT)
+        resp.raise_for_status()
+        certs = resp.json()
+        match = _MAX_AGE.search(resp.headers.get("Cache-Control", ""))
+        max_age = int(match.group(1)) if match else GOOGLE_CERTS_DEFAULT_MAX_AGE
+        self._certs = certs
+        self._expires_at = time.monotonic() + max_age
+        self.fetches += 1
+        return certs
+
+    def refresh(self):
+        with self._lock:
+            return self._fetch()
+
+    def refresh_if_due(self):
+        # called by the background job; refresh early instead of on a login
+        if self._certs is not None and self._expires_at - time.monotonic() > GOOGLE_CERTS_REFRESH_AHEAD:
+            return
+        try:
+            self.refresh()
+        except (requests.RequestException, ValueError) as e:
+            print(f"[GOOGLE CERTS] refresh failed, keeping the cached certificates: {e}")
+
+    def get(self):
+        if self._certs is not None and time.monotonic() < self._expires_at:
+            return self._certs
+        with self._lock:
+            if self._certs is not None and time.monotonic() < self._expires_at:
+                return self._certs
+            try:
+                return self._fetch()
+            except (requests.RequestException, ValueError) as e:
+                if self._certs is None:
+                    raise GoogleCertsUnavailable(str(e))
+                print(f"[GOOGLE CERTS] fetch failed, using expired certificates: {e}")
+                return self._certs
+
+    def get_for_kid(self, kid):
+        """Certificates that include `kid`, refetching once if Google rotated keys."""
+        certs = self.get()
+        if kid is None or kid in certs:
+            return certs
+        with self._lock:
+            now = time.monotonic()
+            if kid not in self._certs and now - self._last_forced >= UNKNOWN_KID_REFETCH_INTERVAL:
+                self._last_forced = now
+                try:
+                    self._fetch()
+                except (requests.RequestException, ValueError) as e:
+                    print(f"[GOOGLE CERTS] refetch for unknown key id failed: {e}")
+            return self._certs
+
+
+certs_cache = GoogleCertCache(GOOGLE_CERTS_URL)
+
+
+def start_certs_refresh():
+    run_periodically("google-certs-refresh", GOOGLE_CERTS_CHECK_INTERVAL, certs_cache.refresh_if_due)
+
+
+def verify_google_id_token(token, audience):
+    """
+    Claims of a Google id_token, checked like id_token.verify_oauth2_token
+    (signature, expiry, audience, issuer) against the cached certificates.
+    Raises ValueError for an invalid token, GoogleCertsUnavailable when no
+    certificates could be loaded.
+    """
+    start_certs_refresh()
+    try:
+        kid = google_jwt.decode_header(token).get("kid")
+    except Exception:
+        raise ValueError("Malformed token")
+    claims = google_jwt.decode(token, certs=certs_cache.get_for_kid(kid), audience=audience)
+    if claims.get("iss") not in GOOGLE_ISSUERS:
+        raise ValueError(f"Wrong issuer: {claims.get('iss')}")
+    return claims
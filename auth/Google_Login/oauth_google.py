@@ -2,10 +2,10 @@
 import os
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+from auth.Google_Login.google_certs import verify_google_id_token, GoogleCertsUnavailable
 from database.db import get_db_connection
 from auth.jwt.jwt_auth import create_access_token
+from auth.social_accounts import link_social_account
 
 router = APIRouter(prefix="/auth", tags=["Google"])
 
@@ -18,12 +18,14 @@ class GoogleLoginRequest(BaseModel):
 
 @router.post("/google/login")
 def google_login(payload: GoogleLoginRequest, conn=Depends(get_db_connection)):
-    # 1) Verify token with Google
+    # 1) Verify token against Google's cached signing certificates
     try:
         # This will raise ValueError on invalid token
-        ticket = id_token.verify_oauth2_token(payload.id_token, google_requests.Request(), GOOGLE_CLIENT_ID)
+        ticket = verify_google_id_token(payload.id_token, GOOGLE_CLIENT_ID)
     except ValueError:
         raise HTTPException(status_code=401, detail="Invalid Google ID token")
+    except GoogleCertsUnavailable:
+        raise HTTPException(status_code=503, detail="Google sign-in is temporarily unavailable")
 
     # 2) Extract profile info
     email = ticket.get("email")
@@ -34,29 +36,8 @@ def google_login(payload: GoogleLoginRequest, conn=Depends(get_db_connection)):
     if not email:
         raise HTTPException(status_code=400, detail="Google token did not contain an email")
 
-    # 3) Upsert into students table (students only)
-    with conn.cursor() as cursor:
-        cursor.execute("SELECT * FROM students WHERE email = %s", (email,))
-        student = cursor.fetchone()
-
-        if not student:
-            # Insert new student. Password left empty (or you can generate random).
-            cursor.execute(
-                """INSERT INTO students
-                   (first_name, last_name, email, password, google_id)
-                   VALUES (%s, %s, %s, %s, %s)""",
-                (first_name, last_name, email, "", sub)
-            )
-            conn.commit()
-            # fetch inserted student
-            cursor.execute("SELECT * FROM students WHERE email = %s", (email,))
-            student = cursor.fetchone()
-        else:
-            # If student exists but google_id not set, update it
-            if not student.get("google_id"):
-                cursor.execute("UPDATE students SET google_id=%s WHERE student_id=%s", (sub, student["student_id"]))
-                conn.commit()
-                student["google_id"] = sub
+    # 3) Create or link the student (students only)
+    student = link_social_account(conn, email, first_name, last_name, google_id=sub)
 
     # 4) Issue JWT token for student
     token_payload = {"student_id": student["student_id"], "role": "student"}
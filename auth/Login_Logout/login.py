@@ -1,13 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, EmailStr
 from database.db import get_db_connection
-from auth.jwt.password_auth import verify_password, hash_password
+from auth.jwt.password_auth import verify_password, hash_password, needs_rehash
 
 from auth.jwt.jwt_auth import create_access_token, require_admin, require_student
 
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+STUDENT_BY_PHONE_SQL = "SELECT * FROM students WHERE phone=%s"
+ADMIN_BY_EMAIL_SQL = "SELECT * FROM admins WHERE email=%s"
+
 
 class LoginRequest(BaseModel):
     phone: str
@@ -19,31 +22,42 @@ class AdminLoginRequest(BaseModel):
     password: str
 
 
+# Check a login password and keep the stored hash current: plain-text
+# passwords are upgraded to bcrypt and hashes made with an older cost factor
+# (BCRYPT_ROUNDS) are rehashed while the plain password is at hand.
+def check_password(conn, table, id_field, row, password):
+    stored_password = row["password"]
+
+    # If hashed with bcrypt
+    if stored_password.startswith("$2b$"):
+        valid = verify_password(password, stored_password)
+        upgrade = valid and needs_rehash(stored_password)
+    else:
+        valid = password == stored_password
+        upgrade = valid
+
+    if upgrade:
+        new_hash = hash_password(password)
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET password=%s WHERE {id_field}=%s",
+                (new_hash, row[id_field])
+            )
+            conn.commit()
+
+    return valid
+
+
 @router.post("/student/login")
 def student_login(payload: LoginRequest, conn=Depends(get_db_connection)):
     with conn.cursor() as cursor:
-        cursor.execute("SELECT * FROM students WHERE phone=%s", (payload.phone,))
+        cursor.execute(STUDENT_BY_PHONE_SQL, (payload.phone,))
         student = cursor.fetchone()
 
     if not student:
         raise HTTPException(status_code=401, detail="Invalid phone or password")
 
-    stored_password = student["password"]
-
-    # If hashed with bcrypt
-    if stored_password.startswith("$2b$"):
-        valid = verify_password(payload.password, stored_password)
-    else:
-        valid = payload.password == stored_password
-        if valid:
-            # Auto-upgrade plain password to bcrypt
-            new_hash = hash_password(payload.password)
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "UPDATE students SET password=%s WHERE student_id=%s",
-                    (new_hash, student["student_id"])
-                )
-                conn.commit()
+    valid = check_password(conn, "students", "student_id", student, payload.password)
 
     if not valid:
         raise HTTPException(status_code=401, detail="Invalid phone or password")
@@ -53,36 +67,26 @@ def student_login(payload: LoginRequest, conn=Depends(get_db_connection)):
 
     return {"message": "Student login successful", "token": token}
 
+# require_student already loaded (or cached) the row
 @router.get("/student/profile")
-def student_profile(user=Depends(require_student), conn=Depends(get_db_connection)):
-    with conn.cursor() as cursor:
-        cursor.execute(
-            "SELECT student_id, first_name, last_name FROM students WHERE student_id=%s",
-            (user["student_id"],)
-        )
-        student = cursor.fetchone()
-
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
-
-    return student
+def student_profile(user=Depends(require_student)):
+    return {
+        "student_id": user["student_id"],
+        "first_name": user["first_name"],
+        "last_name": user["last_name"]
+    }
 
 
 @router.post("/admin/login")
 def admin_login(payload: AdminLoginRequest, conn=Depends(get_db_connection)):
     with conn.cursor() as cursor:
-        cursor.execute("SELECT * FROM admins WHERE email=%s", (payload.email,))
+        cursor.execute(ADMIN_BY_EMAIL_SQL, (payload.email,))
         admin = cursor.fetchone()
 
     if not admin:
         raise HTTPException(status_code=401, detail="Invalid admin credentials")
 
-    stored_password = admin["password"]
-
-    if stored_password.startswith("$2b$"):
-        valid = verify_password(payload.password, stored_password)
-    else:
-        valid = payload.password == stored_password
+    valid = check_password(conn, "admins", "admin_id", admin, payload.password)
 
     if not valid:
         raise HTTPException(status_code=401, detail="Invalid admin credentials")
@@ -93,19 +97,14 @@ def admin_login(payload: AdminLoginRequest, conn=Depends(get_db_connection)):
     return {"message": "Admin login successful", "token": token}
 
 
+# require_admin already loaded (or cached) the row
 @router.get("/admin/profile")
-def admin_profile(user=Depends(require_admin), conn=Depends(get_db_connection)):
-    with conn.cursor() as cursor:
-        cursor.execute(
-            "SELECT admin_id, first_name, last_name FROM admins WHERE admin_id=%s",
-            (user["admin_id"],)
-        )
-        admin = cursor.fetchone()
-
-    if not admin:
-        raise HTTPException(status_code=404, detail="Admin not found")
-
-    return admin
+def admin_profile(user=Depends(require_admin)):
+    return {
+        "admin_id": user["admin_id"],
+        "first_name": user["first_name"],
+        "last_name": user["last_name"]
+    }
 
 
 
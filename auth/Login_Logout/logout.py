@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, Header, HTTPException
 from database.db import get_db_connection
-from auth.jwt.jwt_auth import require_student, require_admin, extract_token
-from auth.jwt.jwt_auth import SECRET_KEY, ALGORITHM  
+from auth.jwt.jwt_auth import require_student, require_admin, extract_token, decode_token
+from auth.jwt.token_revocation import revoke_token
+from auth.jwt.principal_cache import invalidate_token
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -16,12 +17,12 @@ def student_logout(
     token = extract_token(Authorization)
 
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("INSERT INTO blacklisted_tokens (token) VALUES (%s)", (token,))
-            conn.commit()
+        revoke_token(conn, token, decode_token(token)["exp"])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+    invalidate_token(token)
+
     return {"message": f"Student ID {user['student_id']} logged out successfully"}
 
 
@@ -35,10 +36,10 @@ def admin_logout(
     token = extract_token(Authorization)
 
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("INSERT INTO blacklisted_tokens (token) VALUES (%s)", (token,))
-            conn.commit()
+        revoke_token(conn, token, decode_token(token)["exp"])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+    invalidate_token(token)
+
     return {"message": f"Admin ID {user['admin_id']} logged out successfully"}
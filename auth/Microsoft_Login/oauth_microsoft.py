@@ -1,9 +1,11 @@
 import os
-import requests
-from fastapi import APIRouter, Depends, HTTPException, Query
+import httpx
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import RedirectResponse
-from database.db import get_db_connection
+from auth import http_client
+from database.async_db import run_with_connection
 from auth.jwt.jwt_auth import create_access_token
+from auth.social_accounts import link_social_account
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,6 +14,9 @@ MICROSOFT_CLIENT_ID = os.getenv("MICROSOFT_CLIENT_ID")
 MICROSOFT_CLIENT_SECRET = os.getenv("MICROSOFT_CLIENT_SECRET")
 MICROSOFT_TENANT_ID = os.getenv("MICROSOFT_TENANT_ID", "common")
 MICROSOFT_REDIRECT_URI = os.getenv("MICROSOFT_REDIRECT_URI", "http://localhost:8000/auth/microsoft/callback")
+# Overridable so the flow can run against a local stub of the identity endpoints
+MICROSOFT_AUTHORITY_URL = os.getenv("MICROSOFT_AUTHORITY_URL", "https://login.microsoftonline.com").rstrip("/")
+MICROSOFT_GRAPH_URL = os.getenv("MICROSOFT_GRAPH_URL", "https://graph.microsoft.com/v1.0").rstrip("/")
 
 if not MICROSOFT_CLIENT_ID or not MICROSOFT_CLIENT_SECRET:
     raise RuntimeError("MICROSOFT_CLIENT_ID and MICROSOFT_CLIENT_SECRET must be set in your environment")
@@ -23,7 +28,7 @@ router = APIRouter(prefix="/auth", tags=["Microsoft"])
 @router.get("/microsoft/login")
 def microsoft_login():
     authorize_url = (
-        f"https://login.microsoftonline.com/{MICROSOFT_TENANT_ID}/oauth2/v2.0/authorize"
+        f"{MICROSOFT_AUTHORITY_URL}/{MICROSOFT_TENANT_ID}/oauth2/v2.0/authorize"
         f"?client_id={MICROSOFT_CLIENT_ID}"
         f"&response_type=code"
         f"&redirect_uri={MICROSOFT_REDIRECT_URI}"
@@ -36,7 +41,7 @@ def microsoft_login():
 
 # Step 2: Callback endpoint that Microsoft redirects to with ?code=...
 @router.get("/microsoft/callback")
-def microsoft_callback(code: str = Query(None), error: str = Query(None), conn=Depends(get_db_connection)):
+async def microsoft_callback(code: str = Query(None), error: str = Query(None)):
     if error:
         raise HTTPException(status_code=400, detail=f"Microsoft OAuth error: {error}")
 
@@ -44,7 +49,7 @@ def microsoft_callback(code: str = Query(None), error: str = Query(None), conn=D
         raise HTTPException(status_code=400, detail="Authorization code not provided by Microsoft")
 
     # Exchange authorization code for tokens
-    token_url = f"https://login.microsoftonline.com/{MICROSOFT_TENANT_ID}/oauth2/v2.0/token"
+    token_url = f"{MICROSOFT_AUTHORITY_URL}/{MICROSOFT_TENANT_ID}/oauth2/v2.0/token"
     data = {
         "client_id": MICROSOFT_CLIENT_ID,
         "scope": "openid profile email User.Read",
@@ -55,10 +60,10 @@ def microsoft_callback(code: str = Query(None), error: str = Query(None), conn=D
     }
 
     try:
-        token_resp = requests.post(token_url, data=data, timeout=10)
+        token_resp = await http_client.request("POST", token_url, data=data)
         token_resp.raise_for_status()
         token_json = token_resp.json()
-    except requests.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
         raise HTTPException(status_code=502, detail=f"Token exchange failed: {str(e)}")
 
     access_token = token_json.get("access_token")
@@ -67,13 +72,13 @@ def microsoft_callback(code: str = Query(None), error: str = Query(None), conn=D
 
     # Fetch user profile from Microsoft Graph
     try:
-        graph_resp = requests.get(
-            "https://graph.microsoft.com/v1.0/me",
-            headers={"Authorization": f"Bearer {access_token}"}, timeout=10
+        graph_resp = await http_client.request(
+            "GET", f"{MICROSOFT_GRAPH_URL}/me",
+            headers={"Authorization": f"Bearer {access_token}"}
         )
         graph_resp.raise_for_status()
         profile = graph_resp.json()
-    except requests.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
         raise HTTPException(status_code=502, detail=f"Failed to fetch user profile: {str(e)}")
 
     # Extract best email value (mail or userPrincipalName)
@@ -85,40 +90,8 @@ def microsoft_callback(code: str = Query(None), error: str = Query(None), conn=D
     if not email:
         raise HTTPException(status_code=400, detail="Microsoft profile did not include an email")
 
-    # Upsert into students table (student-only flow)
-    with conn.cursor() as cursor:
-        # try find existing by email
-        cursor.execute("SELECT student_id, first_name, last_name FROM students WHERE email=%s", (email,))
-        student = cursor.fetchone()
-
-        if not student:
-            # Insert new student. password empty (or random), google_id/ms_id stored
-            cursor.execute(
-                """INSERT INTO students
-                   (first_name, last_name, email, password, designation)
-                   VALUES (%s, %s, %s, %s, %s)""",
-                (first_name, last_name, email, "", None)
-            )
-            conn.commit()
-            # fetch inserted student
-            cursor.execute("SELECT student_id, first_name, last_name FROM students WHERE email=%s", (email,))
-            student = cursor.fetchone()
-        else:
-            # Optionally update name columns if blank or changed
-            update_needed = False
-            if (not student.get("first_name")) and first_name:
-                update_needed = True
-            if (not student.get("last_name")) and last_name:
-                update_needed = True
-
-            if update_needed:
-                cursor.execute(
-                    "UPDATE students SET first_name=%s, last_name=%s WHERE student_id=%s",
-                    (first_name or student.get("first_name"), last_name or student.get("last_name"), student["student_id"])
-                )
-                conn.commit()
-                cursor.execute("SELECT student_id, first_name, last_name FROM students WHERE student_id=%s", (student["student_id"],))
-                student = cursor.fetchone()
+    # Only now borrow a DB connection: the remote calls above may take seconds
+    student = await run_with_connection(link_social_account, email, first_name, last_name)
 
     # Create JWT token
     token_payload = {"student_id": student["student_id"], "role": "student"}
@@ -0,0 +1,257 @@
+import heapq
+import itertools
+import os
+import queue
+import smtplib
+import threading
+import time
+from email.mime.text import MIMEText
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EMAIL_HOST = os.getenv("EMAIL_HOST")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT") or 587)
+EMAIL_USER = os.getenv("EMAIL_USER")
+EMAIL_PASS = os.getenv("EMAIL_PASS")
+EMAIL_FROM = os.getenv("EMAIL_FROM") or EMAIL_USER
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "1") not in ("0", "false", "False")   # off for a local aiosmtpd stand-in
+EMAIL_TIMEOUT = float(os.getenv("EMAIL_TIMEOUT", "10"))
+
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+EMAIL_MAX_RETRIES = int(os.getenv("EMAIL_MAX_RETRIES", "5"))
+EMAIL_RETRY_BACKOFF = float(os.getenv("EMAIL_RETRY_BACKOFF", "2"))      # seconds, doubled per attempt
+EMAIL_SESSION_IDLE = float(os.getenv("EMAIL_SESSION_IDLE", "60"))       # close the SMTP session after this much idle time
+EMAIL_NOOP_AFTER = float(os.getenv("EMAIL_NOOP_AFTER", "15"))           # NOOP-check a session idle this long before reuse
+
+
+def smtp_connect():
+    server = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT, timeout=EMAIL_TIMEOUT)
+    if EMAIL_USE_TLS:
+        server.starttls()
+    if EMAIL_USER and EMAIL_PASS:
+        server.login(EMAIL_USER, EMAIL_PASS)
+    return server
+
+
+class EmailOutbox:
+    """
+    In-process outbox. Requests enqueue and return immediately; one
+    background thread sends messages in batches over a persistent,
+    authenticated SMTP session and retries failures with exponential backoff.
+    """
+
+    def __init__(self, connect=smtp_connect, sender=None, batch_size=EMAIL_BATCH_SIZE,
+                 max_retries=EMAIL_MAX_RETRIES, backoff=EMAIL_RETRY_BACKOFF,
+                 session_idle=EMAIL_SESSION_IDLE, noop_after=EMAIL_NOOP_AFTER):
+        self._connect = connect
+        self.sender = sender if sender is not None else EMAIL_FROM
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session_idle = session_idle
+        self.noop_after = noop_after
+
+        self._queue = queue.Queue()
+        self._retries = []                 # heap of (ready_at, seq, message)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._server = None
+        self._server_used_at = 0.0
+
+        self._stats = {
+            "enqueued": 0, "sent": 0, "failed": 0, "retried": 0, "batches": 0, "reconnects": 0,
+            "send_latency_total": 0.0, "send_latency_max": 0.0, "delivery_delay_total": 0.0,
+        }
+
+    # Producer side
+    # -------------------------
+
+    def enqueue(self, to_email, subject, body):
+        message = {
+            "to": to_email,
+            "subject": subject,
+            "body": body,
+            "attempts": 0,
+            "enqueued_at": time.monotonic(),
+        }
+        with self._lock:
+            self._stats["enqueued"] += 1
+        self._queue.put(message)
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+                self._thread.start()
+
+    # Worker side
+    # -------------------------
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if not batch:
+                self._close_if_idle()
+                continue
+            with self._lock:
+                self._stats["batches"] += 1
+            for message in batch:
+                try:
+                    self._deliver(message)
+                except Exception as e:
+                    # a bad message or an unexpected error must not kill the worker
+                    self._close_session()
+                    self._record_failure(message, e)
+                finally:
+                    with self._lock:
+                        self._in_flight -= 1
+        self._close_session()
+
+    def _next_batch(self):
+        now = time.monotonic()
+        with self._lock:
+            wait = 1.0
+            if self._retries:
+                wait = max(0.0, min(wait, self._retries[0][0] - now))
+
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=wait) if wait > 0 else self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        now = time.monotonic()
+        with self._lock:
+            while self._retries and self._retries[0][0] <= now and len(batch) < self.batch_size:
+                batch.append(heapq.heappop(self._retries)[2])
+            self._in_flight += len(batch)
+        return batch
+
+    def _session(self):
+        now = time.monotonic()
+        if self._server is not None and now - self._server_used_at >= self.noop_after:
+            try:
+                if self._server.noop()[0] != 250:
+                    self._close_session()
+            except (smtplib.SMTPException, OSError):
+                self._close_session()
+        if self._server is None:
+            self._server = self._connect()
+            with self._lock:
+                self._stats["reconnects"] += 1
+        self._server_used_at = now
+        return self._server
+
+    def _close_session(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+    def _close_if_idle(self):
+        if self._server is not None and time.monotonic() - self._server_used_at >= self.session_idle:
+            self._close_session()
+
+    def _deliver(self, message):
+        msg = MIMEText(message["body"])
+        msg["Subject"] = message["subject"]
+        msg["From"] = self.sender
+        msg["To"] = message["to"]
+
+        started = time.monotonic()
+        try:
+            self._session().sendmail(self.sender, message["to"], msg.as_string())
+        except smtplib.SMTPRecipientsRefused as e:
+            # Permanent for this address, retrying will not help
+            self._record_failure(message, e)
+            return
+        except (smtplib.SMTPException, OSError) as e:
+            self._close_session()
+            self._schedule_retry(message, e)
+            return
+
+        finished = time.monotonic()
+        self._server_used_at = finished
+        with self._lock:
+            latency = finished - started
+            self._stats["sent"] += 1
+            self._stats["send_latency_total"] += latency
+            self._stats["send_latency_max"] = max(self._stats["send_latency_max"], latency)
+            self._stats["delivery_delay_total"] += finished - message["enqueued_at"]
+        print(f"[EMAIL SENT] to {message['to']}")
+
+    def _schedule_retry(self, message, error):
+        message["attempts"] += 1
+        if message["attempts"] > self.max_retries:
+            self._record_failure(message, error)
+            return
+        delay = self.backoff * (2 ** (message["attempts"] - 1))
+        with self._lock:
+            self._stats["retried"] += 1
+            heapq.heappush(self._retries, (time.monotonic() + delay, next(self._seq), message))
+        print(f"[EMAIL RETRY] to {message['to']} in {delay:g}s: {error}")
+
+    def _record_failure(self, message, error):
+        with self._lock:
+            self._stats["failed"] += 1
+        print(f"[EMAIL ERROR] to {message['to']}: {error}")
+
+    # Lifecycle + metrics
+    # -------------------------
+
+    def flush(self, timeout=10.0):
+        """Wait until everything queued so far has been sent or given up on."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.queue_depth() == 0:
+                return True
+            time.sleep(0.05)
+        return False
+
+    def stop(self, timeout=5.0):
+        if self._thread is not None and self._thread.is_alive():
+            self.flush(timeout)
+            self._stop.set()
+            self._thread.join(timeout)
+
+    def queue_depth(self):
+        with self._lock:
+            return self._queue.qsize() + len(self._retries) + self._in_flight
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+            retry_depth = len(self._retries)
+        sent = stats["sent"]
+        return {
+            "queue_depth": self.queue_depth(),
+            "retry_depth": retry_depth,
+            "enqueued": stats["enqueued"],
+            "sent": sent,
+            "failed": stats["failed"],
+            "retried": stats["retried"],
+            "batches": stats["batches"],
+            "reconnects": stats["reconnects"],
+            "send_latency_avg_ms": round(stats["send_latency_total"] / sent * 1000, 3) if sent else 0.0,
+            "send_latency_max_ms": round(stats["send_latency_max"] * 1000, 3),
+            "delivery_delay_avg_ms": round(stats["delivery_delay_total"] / sent * 1000, 3) if sent else 0.0,
+        }
+
+
+outbox = EmailOutbox()
@@ -1,17 +1,18 @@
 import random
 import re
-import time
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from database.db import get_db_connection
 from auth.jwt.jwt_auth import create_access_token
 from auth.OTP.send_email import send_email
+from auth.OTP.otp_store import (
+    otp_store, OTP_OK, OTP_MISSING, OTP_EXPIRED, OTP_LOCKED
+)
 
 router = APIRouter(prefix="/auth", tags=["OTP Auth"])
 
-# In-memory OTP store
-otp_store = {}
-OTP_EXPIRY_SECONDS = 600  # 10 minutes
+STUDENT_ID_BY_EMAIL_SQL = "SELECT student_id FROM students WHERE email=%s"
+STUDENT_ID_BY_PHONE_SQL = "SELECT student_id FROM students WHERE phone=%s"
 
 
 class SendOtpRequest(BaseModel):
@@ -30,7 +31,6 @@ class VerifyOtpRequest(BaseModel):
 def send_otp(payload: SendOtpRequest, conn=Depends(get_db_connection)):
     identifier = payload.identifier.strip()
     otp = str(random.randint(100000, 999999))
-    timestamp = time.time()
 
     # Detect email vs phone
     is_email = re.match(r"[^@]+@[^@]+\.[^@]+", identifier)
@@ -41,15 +41,15 @@ def send_otp(payload: SendOtpRequest, conn=Depends(get_db_connection)):
 
     with conn.cursor() as cursor:
         if is_email:
-            cursor.execute("SELECT student_id FROM students WHERE email=%s", (identifier,))
+            cursor.execute(STUDENT_ID_BY_EMAIL_SQL, (identifier,))
         else:
-            cursor.execute("SELECT student_id FROM students WHERE phone=%s", (identifier,))
+            cursor.execute(STUDENT_ID_BY_PHONE_SQL, (identifier,))
         student = cursor.fetchone()
 
     if not student:
         raise HTTPException(status_code=404, detail="Student not found with provided identifier.")
 
-    otp_store[identifier] = {"otp": otp, "timestamp": timestamp}
+    otp_store.save(conn, identifier, otp)
 
     if is_email:
         send_email(
@@ -70,20 +70,15 @@ def send_otp(payload: SendOtpRequest, conn=Depends(get_db_connection)):
 def verify_otp(payload: VerifyOtpRequest, conn=Depends(get_db_connection)):
     identifier = payload.identifier.strip()
 
-    if identifier not in otp_store:
-        raise HTTPException(status_code=400, detail="OTP not found or expired")
-
-    record = otp_store[identifier]
-    otp = record["otp"]
-    timestamp = record["timestamp"]
+    result = otp_store.verify(conn, identifier, payload.otp)
 
-    # Check expiration
-    if time.time() - timestamp > OTP_EXPIRY_SECONDS:
-        del otp_store[identifier]
+    if result == OTP_MISSING:
+        raise HTTPException(status_code=400, detail="OTP not found or expired")
+    if result == OTP_EXPIRED:
         raise HTTPException(status_code=400, detail="OTP expired. Please request a new one.")
-
-    # Check match
-    if payload.otp != otp:
+    if result == OTP_LOCKED:
+        raise HTTPException(status_code=429, detail="Too many invalid attempts. Please request a new OTP.")
+    if result != OTP_OK:
         raise HTTPException(status_code=400, detail="Invalid OTP")
 
     # Determine if email or phone
@@ -91,12 +86,10 @@ def verify_otp(payload: VerifyOtpRequest, conn=Depends(get_db_connection)):
 
     with conn.cursor() as cursor:
         if is_email:
-            cursor.execute("SELECT student_id FROM students WHERE email=%s", (identifier,))
+            cursor.execute(STUDENT_ID_BY_EMAIL_SQL, (identifier,))
         else:
-            cursor.execute("SELECT student_id FROM students WHERE phone=%s", (identifier,))
+            cursor.execute(STUDENT_ID_BY_PHONE_SQL, (identifier,))
         student = cursor.fetchone()
 
-    del otp_store[identifier]
-
     token = create_access_token({"student_id": student["student_id"], "role": "student"})
     return {"message": "OTP verified successfully and Student Login Successful..!", "token": token}
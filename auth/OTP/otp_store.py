@@ -0,0 +1,167 @@
+import hashlib
+import heapq
+import hmac
+import os
+import threading
+import time
+
+from database.db import pooled_connection
+from database.jobs import run_periodically
+
+OTP_EXPIRY_SECONDS = int(os.getenv("OTP_EXPIRY_SECONDS", "600"))  # 10 minutes
+OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", "5"))
+OTP_STORE_BACKEND = os.getenv("OTP_STORE", "mysql")                # "mysql" (shared) or "memory"
+OTP_PURGE_INTERVAL = float(os.getenv("OTP_PURGE_INTERVAL", "300"))
+
+# verify() results
+OTP_OK = "ok"
+OTP_MISSING = "missing"
+OTP_EXPIRED = "expired"
+OTP_INVALID = "invalid"
+OTP_LOCKED = "locked"
+
+
+OTP_LOOKUP_SQL = """
+    SELECT otp_hash, attempts, expires_at <= UTC_TIMESTAMP() AS expired
+    FROM otp_codes WHERE identifier=%s FOR UPDATE
+"""
+OTP_PURGE_SQL = "DELETE FROM otp_codes WHERE expires_at < UTC_TIMESTAMP()"
+
+
+# OTPs are never stored in clear text
+def _hash_otp(identifier: str, otp: str) -> str:
+    return hashlib.sha256(f"{identifier}:{otp}".encode("utf-8")).hexdigest()
+
+
+class MemoryOTPStore:
+    """
+    Per-process store for single-worker setups. An expiry heap drops
+    expired codes on every call, so unverified codes never pile up.
+    """
+
+    def __init__(self, ttl=OTP_EXPIRY_SECONDS, max_attempts=OTP_MAX_ATTEMPTS):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self._entries = {}   # identifier -> [otp_hash, expires_at, attempts]
+        self._expiry = []    # heap of (expires_at, identifier)
+        self._lock = threading.Lock()
+
+    def _evict_expired(self, now):
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, identifier = heapq.heappop(self._expiry)
+            entry = self._entries.get(identifier)
+            # A re-sent OTP leaves its old heap item behind; only drop the live one
+            if entry is not None and entry[1] == expires_at:
+                del self._entries[identifier]
+
+    def save(self, conn, identifier, otp):
+        now = time.monotonic()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._evict_expired(now)
+            self._entries[identifier] = [_hash_otp(identifier, otp), expires_at, 0]
+            heapq.heappush(self._expiry, (expires_at, identifier))
+
+    def verify(self, conn, identifier, otp):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(identifier)
+            try:
+                if entry is None:
+                    return OTP_MISSING
+                otp_hash, expires_at, attempts = entry
+                if expires_at <= now:
+                    del self._entries[identifier]
+                    return OTP_EXPIRED
+                if hmac.compare_digest(otp_hash, _hash_otp(identifier, otp)):
+                    del self._entries[identifier]
+                    return OTP_OK
+                entry[2] = attempts + 1
+                if entry[2] >= self.max_attempts:
+                    del self._entries[identifier]
+                    return OTP_LOCKED
+                return OTP_INVALID
+            finally:
+                self._evict_expired(now)
+
+    def purge(self, conn=None):
+        with self._lock:
+            self._evict_expired(time.monotonic())
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class MySQLOTPStore:
+    """
+    Store shared by every worker through the otp_codes table. Verification
+    locks the row so concurrent attempts are counted correctly.
+    """
+
+    def __init__(self, ttl=OTP_EXPIRY_SECONDS, max_attempts=OTP_MAX_ATTEMPTS):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+
+    def save(self, conn, identifier, otp):
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO otp_codes (identifier, otp_hash, expires_at, attempts)
+                VALUES (%s, %s, UTC_TIMESTAMP() + INTERVAL %s SECOND, 0)
+                ON DUPLICATE KEY UPDATE
+                    otp_hash = VALUES(otp_hash),
+                    expires_at = VALUES(expires_at),
+                    attempts = 0
+                """,
+                (identifier, _hash_otp(identifier, otp), self.ttl)
+            )
+        conn.commit()
+
+    def verify(self, conn, identifier, otp):
+        with conn.cursor() as cursor:
+            cursor.execute(OTP_LOOKUP_SQL, (identifier,))
+            row = cursor.fetchone()
+
+            if not row:
+                result = OTP_MISSING
+            elif row["expired"]:
+                result = OTP_EXPIRED
+            elif hmac.compare_digest(row["otp_hash"], _hash_otp(identifier, otp)):
+                result = OTP_OK
+            elif row["attempts"] + 1 >= self.max_attempts:
+                result = OTP_LOCKED
+            else:
+                result = OTP_INVALID
+
+            if result == OTP_INVALID:
+                cursor.execute("UPDATE otp_codes SET attempts = attempts + 1 WHERE identifier=%s", (identifier,))
+            elif result != OTP_MISSING:
+                cursor.execute("DELETE FROM otp_codes WHERE identifier=%s", (identifier,))
+        conn.commit()
+        return result
+
+    def purge(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute(OTP_PURGE_SQL)
+        conn.commit()
+
+
+def _create_store():
+    if OTP_STORE_BACKEND == "memory":
+        return MemoryOTPStore()
+    if OTP_STORE_BACKEND == "mysql":
+        return MySQLOTPStore()
+    raise RuntimeError(f"Unknown OTP_STORE backend: {OTP_STORE_BACKEND}")
+
+
+otp_store = _create_store()
+
+
+def _purge_job():
+    with pooled_connection() as conn:
+        otp_store.purge(conn)
+
+
+def start_otp_purge():
+    if isinstance(otp_store, MySQLOTPStore):
+        run_periodically("otp-purge", OTP_PURGE_INTERVAL, _purge_job)
@@ -1,28 +1,7 @@
-import os
-import smtplib
-from email.mime.text import MIMEText
-from dotenv import load_dotenv
+from auth.OTP.email_outbox import outbox
 
-load_dotenv()
-
-EMAIL_HOST = os.getenv("EMAIL_HOST")
-EMAIL_PORT = os.getenv("EMAIL_PORT")
-EMAIL_USER = os.getenv("EMAIL_USER")
-EMAIL_PASS = os.getenv("EMAIL_PASS")
 
+# Queue the message and return right away; the outbox worker delivers it
+# over a persistent SMTP session (see email_outbox.py).
 def send_email(to_email, subject, message):
-    
-    try:
-        msg = MIMEText(message)
-        msg['Subject'] = subject
-        msg['From'] = EMAIL_USER
-        msg['To'] = to_email
-
-        with smtplib.SMTP(EMAIL_HOST, EMAIL_PORT) as server:
-            server.starttls()
-            server.login(EMAIL_USER, EMAIL_PASS)
-            server.sendmail(EMAIL_USER, to_email, msg.as_string())
-        print(f"[EMAIL SENT] to {to_email}")
-    except Exception as e:
-        print(f"[EMAIL ERROR] {str(e)}")
-
+    outbox.enqueue(to_email, subject, message)
@@ -0,0 +1,67 @@
+import asyncio
+import os
+
+import httpx
+from fastapi import HTTPException
+
+OUTBOUND_HTTP_MAX_CONNECTIONS = int(os.getenv("OUTBOUND_HTTP_MAX_CONNECTIONS", "20"))     # per host pool, per worker
+OUTBOUND_HTTP_MAX_KEEPALIVE = int(os.getenv("OUTBOUND_HTTP_MAX_KEEPALIVE", "10"))
+OUTBOUND_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("OUTBOUND_HTTP_KEEPALIVE_EXPIRY", "60"))
+OUTBOUND_HTTP_CONNECT_TIMEOUT = float(os.getenv("OUTBOUND_HTTP_CONNECT_TIMEOUT", "3"))
+OUTBOUND_HTTP_TIMEOUT = float(os.getenv("OUTBOUND_HTTP_TIMEOUT", "10"))                   # read / write / pool wait
+OUTBOUND_HTTP_MAX_CONCURRENCY = int(os.getenv("OUTBOUND_HTTP_MAX_CONCURRENCY", "50"))     # calls in flight at once
+OUTBOUND_HTTP_QUEUE_TIMEOUT = float(os.getenv("OUTBOUND_HTTP_QUEUE_TIMEOUT", "5"))        # seconds to wait for a slot, then 503
+
+
+# Shared outbound HTTP client
+# -----------------------------------------
+# One httpx.AsyncClient per worker keeps TLS connections to the identity
+# providers alive between logins instead of handshaking on every callback.
+# A semaphore caps the calls in flight; callers that cannot get a slot within
+# OUTBOUND_HTTP_QUEUE_TIMEOUT get a 503 instead of piling up behind a slow
+# provider. The client is created on first use and bound to the running
+# event loop (a new loop, e.g. in tests, gets a new client).
+
+_client = None
+_slots = None
+_loop = None
+
+
+def get_client():
+    global _client, _slots, _loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _loop is not loop:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OUTBOUND_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=OUTBOUND_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=OUTBOUND_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(OUTBOUND_HTTP_TIMEOUT, connect=OUTBOUND_HTTP_CONNECT_TIMEOUT),
+        )
+        _slots = asyncio.Semaphore(OUTBOUND_HTTP_MAX_CONCURRENCY)
+        _loop = loop
+    return _client
+
+
+async def request(method, url, **kwargs):
+    """client.request() within the concurrency cap. Raises httpx.HTTPError like httpx does."""
+    client = get_client()
+    slots = _slots
+    try:
+        await asyncio.wait_for(slots.acquire(), OUTBOUND_HTTP_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Server busy, please try again")
+    try:
+        return await client.request(method, url, **kwargs)
+    finally:
+        slots.release()
+
+
+async def close_client():
+    global _client, _slots, _loop
+    client, loop = _client, _loop
+    _client, _slots, _loop = None, None, None
+    # a client left over from another (closed) loop can only be dropped
+    if client is not None and loop is asyncio.get_running_loop():
+        await client.aclose()
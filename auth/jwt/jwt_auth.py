@@ -2,6 +2,8 @@ from fastapi import Depends, HTTPException, Header
 import jwt
 from datetime import datetime, timedelta
 from database.db import get_db_connection
+from auth.jwt.token_revocation import is_token_revoked
+from auth.jwt.principal_cache import get_cached, cache_principal, principal_generation
 
 SECRET_KEY = "SUPER-SECRET-KEY"
 ALGORITHM = "HS256"
@@ -23,23 +25,8 @@ def decode_token(token: str):
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
-def cleanup_blacklist(conn):
-    with conn.cursor() as cursor:
-        cursor.execute("SELECT id, token FROM blacklisted_tokens")
-        tokens = cursor.fetchall()
-        for row in tokens:
-            try:
-                jwt.decode(row["token"], SECRET_KEY, algorithms=[ALGORITHM])
-            except jwt.ExpiredSignatureError:
-                cursor.execute("DELETE FROM blacklisted_tokens WHERE id=%s", (row["id"],))
-                conn.commit()
-
-
 def is_token_blacklisted(token: str, conn):
-    cleanup_blacklist(conn)
-    with conn.cursor() as cursor:
-        cursor.execute("SELECT id FROM blacklisted_tokens WHERE token=%s", (token,))
-        return cursor.fetchone() is not None
+    return is_token_revoked(conn, token)
 
 
 def extract_token(auth_header: str):
@@ -53,39 +40,67 @@ def extract_token(auth_header: str):
 
 
 
-#  Student Token Validation + Profile Return
-def require_student(Authorization: str = Header(None), conn=Depends(get_db_connection)):
+# Shared token check: signature, role and revocation. The revocation
+# lookup is a primary-key read and runs on every request, so a logout on
+# any worker takes effect immediately.
+def _verify_token(Authorization, role, conn):
     token = extract_token(Authorization)
+    decoded = decode_token(token)
+    if decoded.get("role") != role:
+        raise HTTPException(status_code=403, detail=f"Only {role}s allowed")
+
     if is_token_blacklisted(token, conn):
         raise HTTPException(status_code=401, detail="Token has been logged out. Please login again.")
+    return token, decoded
 
-    decoded = decode_token(token)
-    if decoded.get("role") != "student":
-        raise HTTPException(status_code=403, detail="Only students allowed")
 
+# The profile row is cached per token for PRINCIPAL_CACHE_TTL
+def _require_principal(Authorization, conn, role, query, id_field, not_found):
+    token, decoded = _verify_token(Authorization, role, conn)
+    principal_id = decoded[id_field]
+    principal = get_cached(token, role, principal_id)
+    if principal is not None:
+        return principal
+
+    generation = principal_generation(role, principal_id)
     with conn.cursor() as cursor:
-        cursor.execute("SELECT student_id, first_name, last_name, phone, email FROM students WHERE student_id=%s",
-                       (decoded["student_id"],))
-        student = cursor.fetchone()
-        if not student:
-            raise HTTPException(status_code=404, detail="Student not found")
-        return student
+        cursor.execute(query, (principal_id,))
+        principal = cursor.fetchone()
+    if not principal:
+        raise HTTPException(status_code=404, detail=not_found)
+
+    cache_principal(token, role, principal_id, principal, generation)
+    return principal
+
+
+def _require_claims(Authorization, conn, role, id_field):
+    token, decoded = _verify_token(Authorization, role, conn)
+    return {id_field: decoded[id_field], "role": role}
+
+
+#  Student Token Validation + Profile Return
+def require_student(Authorization: str = Header(None), conn=Depends(get_db_connection)):
+    return _require_principal(
+        Authorization, conn, "student",
+        "SELECT student_id, first_name, last_name, phone, email, profile_completed FROM students WHERE student_id=%s",
+        "student_id", "Student not found"
+    )
 
 
 #  Admin Token Validation + Profile Return
 def require_admin(Authorization: str = Header(None), conn=Depends(get_db_connection)):
-    token = extract_token(Authorization)
-    if is_token_blacklisted(token, conn):
-        raise HTTPException(status_code=401, detail="Token has been logged out. Please login again.")
+    return _require_principal(
+        Authorization, conn, "admin",
+        "SELECT admin_id, first_name, last_name, email FROM admins WHERE admin_id=%s",
+        "admin_id", "Admin not found"
+    )
 
-    decoded = decode_token(token)
-    if decoded.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Only admins allowed")
 
-    with conn.cursor() as cursor:
-        cursor.execute("SELECT admin_id, first_name, last_name, email FROM admins WHERE admin_id=%s",
-                       (decoded["admin_id"],))
-        admin = cursor.fetchone()
-        if not admin:
-            raise HTTPException(status_code=404, detail="Admin not found")
-        return admin
+#  Claims-only variants: token + revocation check, no profile lookup.
+#  For read routes that only need the id and role.
+def require_student_claims(Authorization: str = Header(None), conn=Depends(get_db_connection)):
+    return _require_claims(Authorization, conn, "student", "student_id")
+
+
+def require_admin_claims(Authorization: str = Header(None), conn=Depends(get_db_connection)):
+    return _require_claims(Authorization, conn, "admin", "admin_id")
@@ -1,12 +1,129 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
 from passlib.context import CryptContext
 
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))                                 # cost factor; changing it rehashes on next login
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(os.cpu_count() or 1)))        # 0 = hash inline
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", str(max(PASSWORD_WORKERS, 1) * 4)))
+PASSWORD_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_QUEUE_TIMEOUT", "5"))               # seconds to wait for a slot, then 503
+PASSWORD_BULK_CHUNK = int(os.getenv("PASSWORD_BULK_CHUNK", "4"))                       # hashes per bulk task
+PASSWORD_BULK_WORKERS = int(os.getenv("PASSWORD_BULK_WORKERS", str(max(1, PASSWORD_WORKERS // 2))))  # bulk tasks in flight
+
 # Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+# Password hashing pool
+# -----------------------------------------
+# bcrypt is pure CPU work and holds the GIL, so it runs in a process pool
+# sized to the cores. A bounded semaphore caps how many hashes may be queued
+# or running; callers that cannot get a slot within PASSWORD_QUEUE_TIMEOUT
+# get a 503 instead of piling up behind a login spike. If the platform
+# cannot start worker processes, hashing falls back to the calling thread.
+
+_slots = threading.BoundedSemaphore(PASSWORD_MAX_PENDING)
+_executor = None
+_executor_lock = threading.Lock()
+_inline = PASSWORD_WORKERS <= 0
+
+
+# Run inside the worker processes
+def _hash(password):
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password, hashed_password):
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _hash_batch(passwords):
+    return [pwd_context.hash(password) for password in passwords]
+
+
+def _get_executor():
+    global _executor, _inline
+    if _inline:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None and not _inline:
+                try:
+                    # spawn, not fork: the server process already runs pool and job threads
+                    _executor = ProcessPoolExecutor(
+                        max_workers=PASSWORD_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                except (OSError, NotImplementedError) as e:
+                    print(f"[PASSWORD POOL] unavailable, hashing inline: {e}")
+                    _inline = True
+    return _executor
+
+
+def _reset_executor(broken):
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False)
+
+
+def _run(fn, *args, timeout=PASSWORD_QUEUE_TIMEOUT):
+    if not _slots.acquire(timeout=timeout):
+        raise HTTPException(status_code=503, detail="Server busy, please try again")
+    try:
+        executor = _get_executor()
+        if executor is None:
+            return fn(*args)
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool next time and finish this one here
+            _reset_executor(executor)
+            return fn(*args)
+    finally:
+        _slots.release()
+
 
 # Hash a plain password
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return _run(_hash, password)
 
 # Verify password
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run(_verify, plain_password, hashed_password)
+
+# True when the hash was made with another cost factor (or scheme) than configured
+def needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+
+# Hash many passwords (bulk imports) in small tasks of PASSWORD_BULK_CHUNK,
+# each holding its own slot like a login does. At most PASSWORD_BULK_WORKERS
+# of them are in flight across all imports, so the other workers stay free
+# and a login never queues behind more than a few small bulk tasks. Bulk
+# tasks wait for a slot without a timeout: imports yield to logins.
+_bulk_submitters = ThreadPoolExecutor(max_workers=PASSWORD_BULK_WORKERS, thread_name_prefix="password-bulk")
+
+
+def _hash_chunk(chunk):
+    return _run(_hash_batch, chunk, timeout=None)
+
+
+def hash_many(passwords):
+    passwords = list(passwords)
+    chunks = [passwords[i:i + PASSWORD_BULK_CHUNK] for i in range(0, len(passwords), PASSWORD_BULK_CHUNK)]
+    return [h for hashes in _bulk_submitters.map(_hash_chunk, chunks) for h in hashes]
+
+
+def shutdown_password_pool():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+    _bulk_submitters.shutdown(wait=False, cancel_futures=True)
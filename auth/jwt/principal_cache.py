@@ -0,0 +1,59 @@
+import os
+import threading
+
+from database.cache import TTLCache
+from auth.jwt.token_revocation import token_hash
+
+# Caches the profile row behind a token, not the token check: revocation is
+# looked up on every request. Short TTL: a profile change made on another
+# worker is picked up here at the latest after this many seconds.
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+# token hash -> {"role", "id", "generation", "principal"}
+_cache = TTLCache(max_size=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+# (role, id) -> generation; bumping it invalidates every cached token of that principal
+_generations = {}
+_generations_lock = threading.Lock()
+
+
+def principal_generation(role, principal_id):
+    return _generations.get((role, principal_id), 0)
+
+
+def get_cached(token: str, role: str, principal_id):
+    """Cached profile row for this token, or None."""
+    entry = _cache.get(token_hash(token))
+    if entry is None or entry["role"] != role or entry["id"] != principal_id:
+        return None
+    if entry["generation"] != principal_generation(role, principal_id):
+        return None
+    return dict(entry["principal"])
+
+
+def cache_principal(token: str, role: str, principal_id, principal, generation):
+    """
+    `generation` is principal_generation() taken before the row was read: an
+    invalidate that lands during the read leaves the entry already stale.
+    """
+    _cache.set(token_hash(token), {
+        "role": role,
+        "id": principal_id,
+        "generation": generation,
+        "principal": dict(principal),
+    })
+
+
+def invalidate_token(token: str):
+    _cache.pop(token_hash(token))
+
+
+def invalidate_principal(role: str, principal_id):
+    with _generations_lock:
+        key = (role, principal_id)
+        _generations[key] = _generations.get(key, 0) + 1
+
+
+def invalidate_student(student_id):
+    invalidate_principal("student", student_id)
@@ -0,0 +1,56 @@
+import hashlib
+import os
+from datetime import datetime
+
+from database.db import pooled_connection
+from database.jobs import run_periodically
+
+REVOCATION_PURGE_INTERVAL = float(os.getenv("REVOCATION_PURGE_INTERVAL", "600"))  # seconds
+
+
+def token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+# Revoke a token until its own expiry (exp is the JWT "exp" claim, epoch seconds)
+def revoke_token(conn, token: str, exp: int):
+    expires_at = datetime.utcfromtimestamp(exp)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO revoked_tokens (token_hash, expires_at)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE expires_at = VALUES(expires_at)
+            """,
+            (token_hash(token), expires_at)
+        )
+    conn.commit()
+
+
+REVOKED_LOOKUP_SQL = "SELECT 1 FROM revoked_tokens WHERE token_hash=%s AND expires_at > UTC_TIMESTAMP()"
+REVOKED_PURGE_SQL = "DELETE FROM revoked_tokens WHERE expires_at < UTC_TIMESTAMP()"
+
+
+# Primary-key lookup, independent of how many tokens were ever revoked
+def is_token_revoked(conn, token: str) -> bool:
+    with conn.cursor() as cursor:
+        cursor.execute(REVOKED_LOOKUP_SQL, (token_hash(token),))
+        return cursor.fetchone() is not None
+
+
+# Bulk purge of entries whose token has expired anyway
+def purge_expired_tokens(conn) -> int:
+    with conn.cursor() as cursor:
+        cursor.execute(REVOKED_PURGE_SQL)
+        purged = cursor.rowcount
+    conn.commit()
+    return purged
+
+
+def _purge_job():
+    with pooled_connection() as conn:
+        purge_expired_tokens(conn)
+
+
+def start_revocation_purge():
+    run_periodically("revoked-token-purge", REVOCATION_PURGE_INTERVAL, _purge_job)
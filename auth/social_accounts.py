@@ -0,0 +1,96 @@
+import pymysql
+from pymysql.constants.ER import DUP_ENTRY as ER_DUP_ENTRY
+
+from Students.profile_completion import completion_columns, COMPLETION_SET_SQL
+from auth.jwt.principal_cache import invalidate_student
+from Students.student_dashboard import invalidate_student_dashboard
+
+
+# Social login account linking
+# -----------------------------------------
+# Google and Microsoft logins create the student on first sight and link the
+# provider to an existing account (matched by email) afterwards:
+#   * the email is looked up first, so a repeat login (the common case) is
+#     one unique-key read and writes nothing;
+#   * a known email with a missing google_id or blank names gets them filled
+#     in and its completion recomputed, leaving everything else untouched;
+#   * an unknown email inserts the student with its completion columns.
+# Only a real new account reaches the INSERT, so repeat logins no longer use
+# up AUTO_INCREMENT values the way INSERT ... ON DUPLICATE KEY UPDATE did. If
+# two first logins race, the loser's INSERT hits the unique key and it links
+# to the winner's row instead.
+
+_SELECT_SQL = "SELECT student_id, first_name, last_name, email, google_id FROM students WHERE {} = %s"
+
+_INSERT_SQL = """
+    INSERT INTO students
+        (first_name, last_name, email, password, google_id,
+         profile_missing_mask, profile_completion_pct, profile_completed)
+    VALUES (%s, %s, %s, '', %s, %s, %s, %s)
+"""
+
+_LINK_SQL = f"""
+    UPDATE students SET
+        google_id = COALESCE(google_id, %s),
+        first_name = IF(COALESCE(TRIM(first_name), '') = '', %s, first_name),
+        last_name = IF(COALESCE(TRIM(last_name), '') = '', %s, last_name),
+        {COMPLETION_SET_SQL}
+    WHERE student_id = %s
+"""
+
+
+def _is_blank(value):
+    return not (value or "").strip()
+
+
+def _needs_link(student, first_name, last_name, google_id):
+    return ((google_id is not None and student["google_id"] is None)
+            or (_is_blank(student["first_name"]) and not _is_blank(first_name))
+            or (_is_blank(student["last_name"]) and not _is_blank(last_name)))
+
+
+def _create(cursor, email, first_name, last_name, google_id):
+    """Insert the student and return its row, or None if another login just created it."""
+    completion = completion_columns({"first_name": first_name, "last_name": last_name, "email": email})
+    try:
+        cursor.execute(
+            _INSERT_SQL,
+            (first_name, last_name, email, google_id,
+             completion["profile_missing_mask"], completion["profile_completion_pct"], completion["profile_completed"])
+        )
+    except pymysql.err.IntegrityError as e:
+        if e.args[0] == ER_DUP_ENTRY:
+            return None
+        raise
+    cursor.execute(_SELECT_SQL.format("student_id"), (cursor.lastrowid,))
+    return cursor.fetchone()
+
+
+def link_social_account(conn, email, first_name, last_name, google_id=None):
+    """Create or link the student for a verified social login email. Commits; returns the student row."""
+    changed = False
+    with conn.cursor() as cursor:
+        cursor.execute(_SELECT_SQL.format("email"), (email,))
+        student = cursor.fetchone()
+
+        if student is None:
+            created = _create(cursor, email, first_name, last_name, google_id)
+            if created is not None:
+                conn.commit()
+                return created
+            # end the read snapshot, or the row the other login committed stays invisible
+            conn.rollback()
+            cursor.execute(_SELECT_SQL.format("email"), (email,))
+            student = cursor.fetchone()
+
+        if _needs_link(student, first_name, last_name, google_id):
+            cursor.execute(_LINK_SQL, (google_id, first_name, last_name, student["student_id"]))
+            changed = cursor.rowcount > 0
+            cursor.execute(_SELECT_SQL.format("student_id"), (student["student_id"],))
+            student = cursor.fetchone()
+    conn.commit()
+
+    if changed:
+        invalidate_student(student["student_id"])
+        invalidate_student_dashboard(student["student_id"])
+    return student
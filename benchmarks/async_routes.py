@@ -0,0 +1,97 @@
+"""
+Concurrent-request throughput of `async def` routes: blocking pymysql calls
+on the event loop (before) vs. the database.async_db facade (after).
+
+A stand-in connection whose queries sleep for --query-ms replaces MySQL, so
+the numbers isolate the event-loop effect. Requires httpx.
+
+    python -m benchmarks.async_routes --requests 400 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from database.db import get_db_connection
+from database.async_db import get_async_db
+
+
+class _SlowCursor:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, args=None):
+        time.sleep(self.delay)   # simulated network + query time, blocks like pymysql
+
+    def fetchall(self):
+        return [{"id": 1}]
+
+
+class _SlowConnection:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def cursor(self):
+        return _SlowCursor(self.delay)
+
+
+def build_app(query_ms):
+    app = FastAPI()
+
+    def fake_connection():
+        yield _SlowConnection(query_ms / 1000)
+
+    app.dependency_overrides[get_db_connection] = fake_connection
+
+    @app.get("/before")
+    async def before(conn=Depends(get_db_connection)):
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            return cursor.fetchall()
+
+    @app.get("/after")
+    async def after(db=Depends(get_async_db)):
+        return await db.fetchall("SELECT 1")
+
+    return app
+
+
+async def drive(app, path, total, concurrency):
+    limiter = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with limiter:
+                resp = await client.get(path)
+                resp.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return time.perf_counter() - started
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--query-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    app = build_app(args.query_ms)
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {args.query_ms} ms per query")
+    for label, path in (("before (blocking on loop)", "/before"), ("after (async_db)", "/after")):
+        elapsed = await drive(app, path, args.requests, args.concurrency)
+        print(f"{label:28s} {elapsed:7.2f} s   {args.requests / elapsed:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
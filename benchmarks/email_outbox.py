@@ -0,0 +1,125 @@
+"""
+Email outbox delivery check against a local aiosmtpd server.
+
+Starts aiosmtpd on loopback, points an EmailOutbox at it and enqueues
+--messages OTP-sized emails. Some of them are made to fail on purpose:
+  * --transient: the server answers 451 to the first attempt, so the message
+    must be retried and then delivered;
+  * --refused:   the server rejects the recipient with 550, which is
+    permanent and must be counted as failed without a retry;
+  * --broken:    the message body is not a string, so building it raises
+    inside the worker; it must be counted as failed and the worker must
+    keep running.
+When the outbox has flushed, the script compares what the server received
+with what was expected, checks that queue_depth is back to 0 and prints the
+enqueue cost and the outbox metrics. Requires aiosmtpd.
+
+    python -m benchmarks.email_outbox --messages 500 --transient 20 --refused 5 --broken 2
+
+The exit code is 1 when a message was lost, duplicated or miscounted.
+"""
+import argparse
+import smtplib
+import socket
+import sys
+import time
+
+from aiosmtpd.controller import Controller
+
+from auth.OTP.email_outbox import EmailOutbox
+
+SENDER = "bench@example.com"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Handler:
+    def __init__(self, transient, refused):
+        self.transient = set(transient)     # answered 451 once
+        self.refused = set(refused)         # answered 550 every time
+        self.received = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refused:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        to = envelope.rcpt_tos[0]
+        if to in self.transient:
+            self.transient.discard(to)
+            return "451 Try again later"
+        self.received.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--transient", type=int, default=20, help="messages answered 451 on the first attempt")
+    parser.add_argument("--refused", type=int, default=5, help="recipients rejected with 550")
+    parser.add_argument("--broken", type=int, default=2, help="messages that raise while being built")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    addresses = [f"student{i}@example.com" for i in range(args.messages)]
+    refused = addresses[:args.refused]
+    transient = addresses[args.refused:args.refused + args.transient]
+    handler = Handler(transient, refused)
+    port = free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+
+    outbox = EmailOutbox(
+        connect=lambda: smtplib.SMTP("127.0.0.1", port, timeout=5), sender=SENDER,
+        backoff=0.05, noop_after=5,
+    )
+    started = time.perf_counter()
+    for i in range(args.broken):
+        outbox.enqueue(f"broken{i}@example.com", "Your OTP", None)
+    for address in addresses:
+        outbox.enqueue(address, "Your OTP", "Your OTP is 123456")
+    enqueue_ms = (time.perf_counter() - started) * 1000
+
+    flushed = outbox.flush(args.timeout)
+    elapsed = time.perf_counter() - started
+    worker_alive = outbox._thread is not None and outbox._thread.is_alive()
+    metrics = outbox.metrics()
+    outbox.stop()
+    controller.stop()
+
+    expected = sorted(addresses[args.refused:])
+    problems = []
+    if not flushed:
+        problems.append(f"not flushed after {args.timeout:g}s")
+    if sorted(handler.received) != expected:
+        missing = set(expected) - set(handler.received)
+        extra = len(handler.received) - len(set(handler.received))
+        problems.append(f"{len(missing)} messages missing, {extra} delivered twice")
+    if metrics["failed"] != args.refused + args.broken:
+        problems.append(f"failed={metrics['failed']}, expected {args.refused + args.broken}")
+    if metrics["retried"] != args.transient:
+        problems.append(f"retried={metrics['retried']}, expected {args.transient}")
+    if metrics["queue_depth"] != 0:
+        problems.append(f"queue_depth={metrics['queue_depth']} after flush")
+    if not worker_alive:
+        problems.append("worker thread died")
+
+    total = args.messages + args.broken
+    print(f"\nenqueued {total} messages in {enqueue_ms:.1f} ms ({enqueue_ms * 1000 / total:.1f} us each)")
+    print(f"delivered {len(handler.received)} in {elapsed:.2f}s")
+    for key, value in metrics.items():
+        print(f"  {key:<24} {value}")
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    print("OK" if not problems else "")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Google id_token verification latency: cached certificates vs a fetch per login.
+
+Generates an RSA key and a self-signed certificate, serves them on a local
+stand-in for Google's cert endpoint (with Cache-Control: max-age) and signs
+id_tokens with the key. Then it times
+  * uncached: id_token.verify_token with a fresh transport, which downloads
+    the certificates on every call (what google_login used to do), and
+  * cached: verify_google_id_token with the in-memory certificate cache.
+The stand-in is on loopback, so the uncached numbers leave out the real
+round trip to Google (typically 50-300 ms); --latency-ms adds it back.
+
+    python -m benchmarks.google_verify --tokens 2000
+    python -m benchmarks.google_verify --latency-ms 80
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+AUDIENCE = "bench-client.apps.googleusercontent.com"
+KEY_ID = "bench-key-1"
+
+
+def make_key_set():
+    """(signer PEM, {kid: certificate PEM}) for a fresh 2048-bit RSA key."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "bench")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    return private_pem, {KEY_ID: cert.public_bytes(serialization.Encoding.PEM).decode()}
+
+
+def serve_certs(certs, latency_ms):
+    body = json.dumps(certs).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        hits = 0
+
+        def do_GET(self):
+            Handler.hits += 1
+            time.sleep(latency_ms / 1000)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Cache-Control", "public, max-age=3600, must-revalidate, no-transform")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, Handler, f"http://127.0.0.1:{server.server_port}/oauth2/v1/certs"
+
+
+def make_tokens(private_pem, count):
+    from google.auth import crypt, jwt
+
+    signer = crypt.RSASigner.from_string(private_pem, key_id=KEY_ID)
+    now = int(time.time())
+    return [
+        jwt.encode(signer, {
+            "iss": "https://accounts.google.com", "aud": AUDIENCE, "sub": str(100000 + i),
+            "email": f"bench{i}@example.com", "iat": now, "exp": now + 3600,
+        }).decode()
+        for i in range(count)
+    ]
+
+
+def timed(fn, tokens):
+    latencies = []
+    for token in tokens:
+        started = time.perf_counter()
+        fn(token)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return latencies
+
+
+def report(label, latencies, fetches):
+    def pct(p):
+        return latencies[max(0, int(round(p / 100 * len(latencies))) - 1)]
+    total_s = sum(latencies) / 1000
+    print(f"{label:<10} {len(latencies):>6} {len(latencies) / total_s:>9.0f} {pct(50):>8.3f} {pct(95):>8.3f} "
+          f"{pct(99):>8.3f} {fetches:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=1000, help="verifications per mode")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated round trip to the cert endpoint")
+    args = parser.parse_args()
+
+    private_pem, certs = make_key_set()
+    server, handler, url = serve_certs(certs, args.latency_ms)
+    os.environ["GOOGLE_CERTS_URL"] = url
+    tokens = make_tokens(private_pem, args.tokens)
+
+    import google.auth.transport.requests as google_requests
+    from google.oauth2 import id_token
+    from auth.Google_Login.google_certs import verify_google_id_token
+
+    def uncached(token):
+        return id_token.verify_token(token, google_requests.Request(), AUDIENCE, certs_url=url)
+
+    def cached(token):
+        return verify_google_id_token(token, AUDIENCE)
+
+    # both must accept the same tokens
+    assert uncached(tokens[0])["sub"] == cached(tokens[0])["sub"]
+
+    print(f"\n{'mode':<10} {'tokens':>6} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'fetches':>8}")
+    handler.hits = 0
+    report("uncached", timed(uncached, tokens), handler.hits)
+    handler.hits = 0
+    report("cached", timed(cached, tokens), handler.hits)
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Import-time profile of `main` and a startup budget check.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter (eager
+and/or LAZY_IMPORTS=1) and lists the slowest modules by cumulative import
+time. The lazy startup is checked, and the exit code is 1 when
+  * importing main takes longer than --budget-ms (STARTUP_BUDGET_MS, 900 ms
+    by default: about 550 ms today on a developer machine, plus headroom), or
+  * it imports a module that LAZY_IMPORTS exists to defer (LAZY_DEFERRED),
+    which catches a new eager import on any machine, however fast.
+`make check-startup` runs the check; CI should call it.
+
+    python -m benchmarks.import_profile --mode both --top 20
+    python -m benchmarks.import_profile --mode lazy --runs 5
+    python -m benchmarks.import_profile --budget-ms 0     # report only
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "900"))
+
+# the OAuth / OTP routers and the client libraries only they use
+LAZY_DEFERRED = (
+    "auth.Google_Login", "auth.Microsoft_Login", "auth.OTP.otp_auth",
+    "google.auth", "google.oauth2", "requests",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def profile(lazy):
+    """One cold import of main: [(module, self_ms, cumulative_ms, depth)] in import order."""
+    env = dict(os.environ, LAZY_IMPORTS="1" if lazy else "0")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import main failed:\n{proc.stderr[-2000:]}")
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2))
+    return modules
+
+
+def main_import_ms(modules):
+    return next(cumulative for name, _, cumulative, _ in modules if name == "main")
+
+
+def report(label, runs, top):
+    # keep the fastest run: least disturbed by the rest of the machine
+    modules = min(runs, key=main_import_ms)
+    total = main_import_ms(modules)
+    print(f"\n{label}: import main {total:.1f} ms (best of {len(runs)}), {len(modules)} modules")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_ms, cumulative, _ in sorted(modules, key=lambda m: m[2], reverse=True)[:top]:
+        print(f"{cumulative:>14.1f} {self_ms:>9.1f}  {name}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["eager", "lazy", "both"], default="both")
+    parser.add_argument("--runs", type=int, default=3, help="cold imports per mode (best is reported)")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                        help="fail when the lazy import of main takes longer (0: no check)")
+    args = parser.parse_args()
+
+    modes = {"eager": [False], "lazy": [True], "both": [False, True]}[args.mode]
+    totals = {}
+    lazy_modules = []
+    for lazy in modes:
+        label = "lazy (LAZY_IMPORTS=1)" if lazy else "eager"
+        runs = [profile(lazy) for _ in range(args.runs)]
+        totals[label] = report(label, runs, args.top)
+        if lazy:
+            lazy_modules = runs[0]
+
+    if len(totals) == 2:
+        eager, lazy = totals.values()
+        print(f"\nlazy saves {eager - lazy:.1f} ms ({(eager - lazy) / eager:.0%})")
+
+    if not lazy_modules:
+        return 0
+    failed = False
+    loaded = sorted({name for name, _, _, _ in lazy_modules
+                     if any(name == d or name.startswith(d + ".") for d in LAZY_DEFERRED)})
+    if loaded:
+        failed = True
+        print(f"FAIL lazy startup imports deferred modules: {', '.join(loaded[:10])}")
+    lazy_ms = totals["lazy (LAZY_IMPORTS=1)"]
+    if args.budget_ms and lazy_ms > args.budget_ms:
+        failed = True
+        print(f"FAIL lazy startup: {lazy_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+    if failed:
+        return 1
+    print(f"ok: lazy startup {lazy_ms:.1f} ms, within the {args.budget_ms:.0f} ms budget" if args.budget_ms
+          else "ok: lazy startup imports no deferred modules")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
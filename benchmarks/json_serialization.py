@@ -0,0 +1,105 @@
+"""
+Response serialization time per 10k rows: FastAPI's default path vs FastJSONResponse.
+
+Builds rows shaped like pymysql results for the large list routes (batches
+with DATE / TIME / TIMESTAMP columns, workshops with DECIMAL fees, students
+with completion percentages) and times, per row shape,
+  * default: jsonable_encoder + the stdlib JSONResponse (plus the old
+    per-row str() loop for batches), what the routes used to do, and
+  * fast:    FastJSONResponse(rows) (StrDatetimeJSONResponse for batches,
+    as the batch routes use), one orjson pass.
+No database is needed.
+
+    python -m benchmarks.json_serialization --rows 10000 --runs 7
+"""
+import argparse
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from fast_json import FastJSONResponse, StrDatetimeJSONResponse
+
+CREATED = datetime(2024, 1, 15, 9, 30, 12)
+
+
+def batch_rows(count):
+    return [{
+        "id": i, "workshop_id": i % 50 + 1, "category_id": i % 8 + 1,
+        "workshop_name": f"Workshop {i % 50}", "batch_name": f"Batch {i}", "instructor": "A. Instructor",
+        "start_date": date(2024, 3, 1) + timedelta(days=i % 200),
+        "start_time": timedelta(hours=10), "end_time": timedelta(hours=13, minutes=30),
+        "location": "Pune", "status": "Upcoming", "zoom_link": None, "zoom_meeting_id": None,
+        "zoom_password": None, "capacity": 40, "enrolled_count": i % 40,
+        "created_at": CREATED, "updated_at": CREATED + timedelta(minutes=i),
+    } for i in range(count)]
+
+
+def workshop_rows(count):
+    return [{
+        "workshop_id": i, "name": f"Workshop {i}", "category_id": i % 8 + 1,
+        "description": "Hands-on workshop " * 4, "fee": Decimal("1499.00") + i % 10,
+        "duration": "3 days", "mode": "Offline", "created_at": CREATED, "updated_at": CREATED,
+    } for i in range(count)]
+
+
+def student_rows(count):
+    return [{
+        "student_id": i, "first_name": "Student", "last_name": f"No{i}", "email": f"s{i}@example.com",
+        "phone": f"9{i:09d}", "status": "Active", "profession": "Engineer", "designation": None,
+        "profile_completion_pct": Decimal("87.50"), "profile_completed": 0,
+        "created_at": CREATED + timedelta(seconds=i),
+    } for i in range(count)]
+
+
+def default_path(rows, str_columns=()):
+    for row in rows:
+        for key in str_columns:
+            if row.get(key) is not None:
+                row[key] = str(row[key])
+    return JSONResponse(jsonable_encoder(rows)).body
+
+
+def fast_path(rows, str_columns=()):
+    response_class = StrDatetimeJSONResponse if str_columns else FastJSONResponse
+    return response_class(rows).body
+
+
+SHAPES = [
+    ("batches", batch_rows, ("start_time", "end_time", "created_at", "updated_at")),
+    ("workshops", workshop_rows, ()),
+    ("students", student_rows, ()),
+]
+
+
+def best_ms(fn, make_rows, count, str_columns, runs):
+    timings = []
+    for _ in range(runs):
+        rows = make_rows(count)     # fresh rows: the str() loop mutates them
+        started = time.perf_counter()
+        body = fn(rows, str_columns)
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=7, help="best run is reported")
+    args = parser.parse_args()
+
+    per_10k = 10000 / args.rows
+    print(f"{'rows':<10} {'default ms/10k':>15} {'fast ms/10k':>12} {'speedup':>8} {'body KB':>8}")
+    for name, make_rows, str_columns in SHAPES:
+        default_ms, _ = best_ms(default_path, make_rows, args.rows, str_columns, args.runs)
+        fast_ms, size = best_ms(fast_path, make_rows, args.rows, str_columns, args.runs)
+        print(f"{name:<10} {default_ms * per_10k:>15.1f} {fast_ms * per_10k:>12.1f} "
+              f"{default_ms / fast_ms:>7.1f}x {size / 1024:>8.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
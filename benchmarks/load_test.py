@@ -0,0 +1,302 @@
+"""
+Mixed-traffic load test of the whole API with per-route latency percentiles.
+
+Boots `main:app` under uvicorn (or targets --url), logs the virtual users in
+and drives a weighted mix of login, dashboard, enroll, catalog lists and
+admin lists against a database seeded by benchmarks.seed. Each route gets
+p50 / p95 / p99 latency, throughput and error rate; the run is saved as JSON
+and compared with a stored baseline. Requires httpx.
+
+    python -m benchmarks.seed --students 20000 --reset
+    python -m benchmarks.load_test --duration 60 --concurrency 50 --save-baseline
+    python -m benchmarks.load_test --duration 60 --concurrency 50   # later: compare
+
+The exit code is 1 when a route regressed against the baseline.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.seed import ADMIN_EMAIL, BENCH_PASSWORD, student_phone
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_BASELINE = RESULTS_DIR / "baseline.json"
+
+# route label, weight, statuses that count as success.
+# Enrolling twice (400) or into a full batch (409) is a normal answer, and
+# incomplete profiles are refused resources (403).
+ROUTES = [
+    ("POST /auth/student/login", 1, {200}),
+    ("GET /student/dashboard/profile", 6, {200}),
+    ("GET /enrollments/my-enrollments", 3, {200}),
+    ("POST /enrollments/enroll/{workshop_id}/{batch_id}", 1, {200, 400, 409}),
+    ("GET /workshops/", 3, {200}),
+    ("GET /batches/", 2, {200}),
+    ("GET /categories/", 1, {200}),
+    ("GET /quotes/", 2, {200}),
+    ("GET /auth/resources/", 1, {200, 403}),
+    ("GET /admin/students/", 1, {200}),
+    ("GET /admin-dashboard/", 1, {200}),
+]
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = []      # ms, every measured request
+        self.errors = 0
+        self.statuses = {}
+
+    def record(self, ms, status, ok):
+        self.latencies.append(ms)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(stats, elapsed):
+    routes = {}
+    for label, route in stats.items():
+        ordered = sorted(route.latencies)
+        count = len(ordered)
+        routes[label] = {
+            "requests": count,
+            "errors": route.errors,
+            "error_rate": round(route.errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / elapsed, 2),
+            "p50_ms": round(percentile(ordered, 50), 2) if count else None,
+            "p95_ms": round(percentile(ordered, 95), 2) if count else None,
+            "p99_ms": round(percentile(ordered, 99), 2) if count else None,
+            "mean_ms": round(sum(ordered) / count, 2) if count else None,
+            "statuses": {str(k): v for k, v in sorted(route.statuses.items())},
+        }
+
+    everything = sorted(ms for route in stats.values() for ms in route.latencies)
+    errors = sum(route.errors for route in stats.values())
+    overall = {
+        "requests": len(everything),
+        "errors": errors,
+        "error_rate": round(errors / len(everything), 4) if everything else 0.0,
+        "throughput_rps": round(len(everything) / elapsed, 2),
+        "p50_ms": round(percentile(everything, 50), 2) if everything else None,
+        "p95_ms": round(percentile(everything, 95), 2) if everything else None,
+        "p99_ms": round(percentile(everything, 99), 2) if everything else None,
+    }
+    return routes, overall
+
+
+class LoadTest:
+    def __init__(self, client, students, rng):
+        self.client = client
+        self.students = students
+        self.rng = rng
+        self.stats = {label: RouteStats() for label, _, _ in ROUTES}
+        self.measuring = False
+        self.admin_headers = None
+        self.batches = []
+
+    async def _call(self, label, expected, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            resp = await self.client.request(method, path, **kwargs)
+            status = resp.status_code
+        except httpx.HTTPError:
+            resp, status = None, "exception"
+        if self.measuring:
+            self.stats[label].record((time.perf_counter() - started) * 1000, status, status in expected)
+        return resp
+
+    async def _login(self):
+        phone = student_phone(self.rng.randrange(self.students))
+        resp = await self._call("POST /auth/student/login", {200}, "POST", "/auth/student/login",
+                                json={"phone": phone, "password": BENCH_PASSWORD})
+        if resp is None or resp.status_code != 200:
+            return None
+        return {"Authorization": f"Bearer {resp.json()['token']}"}
+
+    async def setup(self):
+        resp = await self.client.post("/auth/admin/login", json={"email": ADMIN_EMAIL, "password": BENCH_PASSWORD})
+        resp.raise_for_status()
+        self.admin_headers = {"Authorization": f"Bearer {resp.json()['token']}"}
+
+        resp = await self.client.get("/batches/")
+        resp.raise_for_status()
+        rows = resp.json()
+        rows = rows if isinstance(rows, list) else []   # {"message": ...} when empty
+        self.batches = [(row["workshop_id"], row["id"]) for row in rows
+                        if row.get("status") in ("Upcoming", "Active")]
+        if not self.batches:
+            raise RuntimeError("No batches found; seed the database with benchmarks.seed first")
+
+    async def user(self, deadline):
+        headers = await self._login()
+        labels = [label for label, _, _ in ROUTES]
+        weights = [weight for _, weight, _ in ROUTES]
+        expected = {label: ok for label, _, ok in ROUTES}
+
+        while time.monotonic() < deadline:
+            label = self.rng.choices(labels, weights)[0]
+            method, path = label.split(" ", 1)
+            if label == "POST /auth/student/login":
+                headers = await self._login() or headers
+                continue
+            if headers is None:
+                headers = await self._login()
+                continue
+            if path.startswith("/admin"):
+                request_headers = self.admin_headers
+            else:
+                request_headers = headers
+            params = None
+            if label.startswith("POST /enrollments/enroll"):
+                workshop_id, batch_id = self.rng.choice(self.batches)
+                path = f"/enrollments/enroll/{workshop_id}/{batch_id}"
+            elif path == "/admin/students/":
+                params = {"limit": 50, "sort": self.rng.choice(["student_id", "created_at"])}
+            await self._call(label, expected[label], method, path, headers=request_headers, params=params)
+
+
+async def run(url, duration, warmup, concurrency, students, seed):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        test = LoadTest(client, students, random.Random(seed))
+        await test.setup()
+
+        started = time.monotonic()
+        deadline = started + warmup + duration
+        users = [asyncio.create_task(test.user(deadline)) for _ in range(concurrency)]
+
+        await asyncio.sleep(warmup)
+        test.measuring = True
+        measure_started = time.perf_counter()
+        await asyncio.gather(*users)
+        elapsed = time.perf_counter() - measure_started
+    return summarize(test.stats, elapsed)
+
+
+def start_server(port, workers):
+    env = dict(os.environ)
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    server = subprocess.Popen(cmd, env=env)
+    url = f"http://127.0.0.1:{port}"
+
+    for _ in range(150):
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            httpx.get(f"{url}/docs", timeout=1.0)
+            return server, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start within 30 s")
+
+
+def compare(result, baseline, tolerance):
+    """Print per-route deltas against the baseline. Returns the regressed routes."""
+    regressions = []
+    print(f"\nvs baseline from {baseline['meta'].get('finished_at', '?')} (tolerance {tolerance:.0%})")
+    for label, now in result["routes"].items():
+        before = baseline["routes"].get(label)
+        if not before or not now["requests"] or not before["requests"]:
+            continue
+        reasons = []
+        for key in ("p95_ms", "p99_ms"):
+            if before[key] and now[key] > before[key] * (1 + tolerance):
+                reasons.append(f"{key} {before[key]:.1f} -> {now[key]:.1f}")
+        if now["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            reasons.append(f"rps {before['throughput_rps']:.1f} -> {now['throughput_rps']:.1f}")
+        if now["error_rate"] > before["error_rate"] + 0.01:
+            reasons.append(f"errors {before['error_rate']:.2%} -> {now['error_rate']:.2%}")
+
+        p95_delta = (now["p95_ms"] / before["p95_ms"] - 1) if before["p95_ms"] else 0.0
+        print(f"{'REGRESSED' if reasons else 'ok':<10} {label:<52} p95 {p95_delta:+7.1%}  {'; '.join(reasons)}")
+        if reasons:
+            regressions.append(label)
+    return regressions
+
+
+def print_report(routes, overall):
+    print(f"\n{'route':<52} {'req':>7} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for label, r in list(routes.items()) + [("overall", overall)]:
+        if not r["requests"]:
+            continue
+        print(f"{label:<52} {r['requests']:>7} {r['throughput_rps']:>8.1f} {r['error_rate'] * 100:>6.2f} "
+              f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="test a running server instead of starting uvicorn")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=60.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds first")
+    parser.add_argument("--concurrency", type=int, default=50, help="virtual users")
+    parser.add_argument("--students", type=int, default=20000, help="students seeded by benchmarks.seed")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", type=Path, help="result file (default results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown before a route regresses")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_server(args.port, args.workers)
+    try:
+        started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        routes, overall = asyncio.run(run(url, args.duration, args.warmup, args.concurrency,
+                                          args.students, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    result = {
+        "meta": {
+            "started_at": started_at,
+            "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "url": url, "workers": args.workers, "duration_s": args.duration,
+            "warmup_s": args.warmup, "concurrency": args.concurrency, "students": args.students,
+        },
+        "overall": overall,
+        "routes": routes,
+    }
+    print_report(routes, overall)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = args.out or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    out.write_text(json.dumps(result, indent=2))
+    print(f"\nResults written to {out}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(result, indent=2))
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if args.baseline.exists():
+        regressions = compare(result, json.loads(args.baseline.read_text()), args.tolerance)
+        return 1 if regressions else 0
+    print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
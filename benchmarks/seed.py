@@ -0,0 +1,211 @@
+"""
+Seed a benchmark database with realistic volumes for benchmarks.load_test.
+
+Point config.py (MYSQL_CONFIG) at a dedicated, empty database first: the
+schema is created with the migration runner, and --reset empties every
+seeded table.
+
+    python -m benchmarks.seed --students 20000 --reset
+
+Every student logs in with phone student_phone(i) and BENCH_PASSWORD; the
+admin with ADMIN_EMAIL and BENCH_PASSWORD.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from database.db import _connect
+from database.migrate import migrate_up
+from auth.jwt.password_auth import hash_password, shutdown_password_pool
+from Students.profile_completion import completion_columns
+from Students.enrollments import get_enrollment_status
+from Admin.dashboard_stats import reconcile_stats
+
+BENCH_PASSWORD = "BenchPass#2024"
+ADMIN_EMAIL = "admin@bench.local"
+CHUNK_SIZE = 1000
+
+SEEDED_TABLES = [
+    "student_enrollments", "clarity_responses", "clarity_calls", "clarity_questions",
+    "student_assignments", "resources", "resource_categories", "quotes",
+    "batches", "workshops", "categories", "students", "admins", "admin_dashboard_stats",
+]
+
+CATEGORIES = ["Data Science", "Web Development", "Cloud", "Design", "Leadership",
+              "Marketing", "Finance", "Cyber Security"]
+PROFESSIONS = ["student", "employee", "other"]
+GENDERS = ["male", "female", "other"]
+
+
+def student_phone(i):
+    return f"9{i:09d}"
+
+
+def _insert(cursor, table, columns, rows):
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    for start in range(0, len(rows), CHUNK_SIZE):
+        cursor.executemany(query, rows[start:start + CHUNK_SIZE])
+
+
+def _ids(cursor, table, id_field):
+    cursor.execute(f"SELECT {id_field} FROM {table} ORDER BY {id_field}")
+    return [row[id_field] for row in cursor.fetchall()]
+
+
+def seed(conn, students, workshops, batches_per_workshop, enrollments_per_student, rng):
+    now = datetime.now().replace(microsecond=0)
+    password = hash_password(BENCH_PASSWORD)   # one hash shared by every account
+
+    def past(days):
+        return now - timedelta(days=rng.uniform(0, days))
+
+    with conn.cursor() as cursor:
+        _insert(cursor, "admins", ["first_name", "last_name", "email", "password"],
+                [("Bench", "Admin", ADMIN_EMAIL, password)])
+
+        _insert(cursor, "categories", ["name"], [(name,) for name in CATEGORIES])
+        category_ids = _ids(cursor, "categories", "category_id")
+
+        workshop_rows = []
+        for i in range(workshops):
+            category = rng.randrange(len(CATEGORIES))
+            status = rng.choices(["Upcoming", "Active", "Completed"], weights=[5, 4, 1])[0]
+            workshop_rows.append((
+                category_ids[category], CATEGORIES[category], f"Workshop {i + 1}",
+                "Hands-on sessions with weekly assignments. " * 4,
+                rng.choice([2, 3, 5, 10]), 60, rng.choice([1, 2]), 100,
+                rng.choice([0, 499, 999, 1999, 4999]), f"Instructor {i % 25 + 1}",
+                status, (now + timedelta(days=rng.randint(-60, 60))).date(), past(365),
+            ))
+        _insert(cursor, "workshops", [
+            "category_id", "category_name", "name", "description", "duration_days",
+            "minutes_per_session", "sessions_per_day", "capacity", "fee", "instructor",
+            "status", "start_date", "created_at",
+        ], workshop_rows)
+        cursor.execute("SELECT workshop_id, category_id, name, status, fee FROM workshops ORDER BY workshop_id")
+        workshop_list = cursor.fetchall()
+
+        batch_rows = []
+        for workshop in workshop_list:
+            for b in range(batches_per_workshop):
+                batch_rows.append((
+                    workshop["workshop_id"], workshop["category_id"], workshop["name"],
+                    f"{workshop['name']} - Batch {b + 1}", workshop["status"],
+                    (now + timedelta(days=rng.randint(-30, 90))).date(), "10:00:00", "12:00:00",
+                    rng.choice(["Online", "Pune", "Mumbai"]),
+                ))
+        _insert(cursor, "batches", [
+            "workshop_id", "category_id", "workshop_name", "batch_name", "status",
+            "start_date", "start_time", "end_time", "location",
+        ], batch_rows)
+        cursor.execute("SELECT id, workshop_id, status FROM batches ORDER BY id")
+        batch_list = cursor.fetchall()
+        workshop_status = {w["workshop_id"]: w["status"] for w in workshop_list}
+        open_batches = [b for b in batch_list if b["status"] in ("Upcoming", "Active")]
+
+        for start in range(0, students, CHUNK_SIZE):
+            student_rows = []
+            for i in range(start, min(start + CHUNK_SIZE, students)):
+                student = {
+                    "first_name": f"Student{i}", "last_name": "Bench",
+                    "email": f"student{i}@bench.local", "phone": student_phone(i),
+                    "address": f"{i} Bench Street, Pune", "profession": rng.choice(PROFESSIONS),
+                    "designation": "Learner", "gender": rng.choice(GENDERS),
+                }
+                # about one in five profiles is left incomplete
+                if rng.random() < 0.2:
+                    student["address"] = None
+                    student["designation"] = None
+                completion = completion_columns(student)
+                student_rows.append((
+                    student["first_name"], student["last_name"], student["email"], student["phone"],
+                    student["address"], password, rng.random() < 0.5, student["profession"],
+                    student["designation"], student["gender"], "Active",
+                    completion["profile_missing_mask"], completion["profile_completion_pct"],
+                    completion["profile_completed"], past(365),
+                ))
+            _insert(cursor, "students", [
+                "first_name", "last_name", "email", "phone", "address", "password",
+                "email_consent", "profession", "designation", "gender", "status",
+                "profile_missing_mask", "profile_completion_pct", "profile_completed", "created_at",
+            ], student_rows)
+        student_ids = _ids(cursor, "students", "student_id")
+
+        enrollment_rows = []
+        call_rows = []
+        for student_id in student_ids:
+            count = min(len(open_batches), rng.randint(0, 2 * enrollments_per_student))
+            for batch in rng.sample(open_batches, count):
+                status = get_enrollment_status(workshop_status[batch["workshop_id"]], batch["status"])
+                enrollment_rows.append((student_id, batch["workshop_id"], batch["id"], status, past(180)))
+            if rng.random() < 0.3:
+                call_rows.append((student_id, f"Mentor {rng.randint(1, 20)}",
+                                  rng.choice(["Scheduled", "Completed", "Cancelled"]),
+                                  now + timedelta(days=rng.randint(-30, 30)), "Discuss goals"))
+        _insert(cursor, "student_enrollments",
+                ["student_id", "workshop_id", "batch_id", "status", "enrollment_date"], enrollment_rows)
+        _insert(cursor, "clarity_calls",
+                ["student_id", "mentor_name", "call_status", "scheduled_date", "notes"], call_rows)
+
+        _insert(cursor, "clarity_questions", ["question", "options"], [
+            (f"Question {q + 1}?", '{"A": "Yes", "B": "No", "C": "Maybe", "D": "Not sure"}')
+            for q in range(10)
+        ])
+        _insert(cursor, "quotes", ["quote", "author", "category", "color", "featured", "created_at"], [
+            (f"Quote number {q + 1} about learning.", f"Author {q % 40}", rng.choice(["Motivation", "Learning"]),
+             "#4a90e2", q < 5, past(365))
+            for q in range(200)
+        ])
+        _insert(cursor, "resource_categories", ["name"], [(name,) for name in CATEGORIES[:6]])
+        resource_category_ids = _ids(cursor, "resource_categories", "id")
+        _insert(cursor, "resources", ["name", "category_id", "url", "description", "created_at"], [
+            (f"Resource {r + 1}", rng.choice(resource_category_ids), f"https://example.com/r/{r + 1}",
+             "Slides and notes", past(365))
+            for r in range(300)
+        ])
+
+        reconcile_stats(conn)
+    conn.commit()
+    return {
+        "students": len(student_ids), "workshops": len(workshop_list), "batches": len(batch_list),
+        "enrollments": len(enrollment_rows), "clarity_calls": len(call_rows),
+    }
+
+
+def reset(conn):
+    with conn.cursor() as cursor:
+        for table in SEEDED_TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--workshops", type=int, default=60)
+    parser.add_argument("--batches-per-workshop", type=int, default=4)
+    parser.add_argument("--enrollments-per-student", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="empty the seeded tables first")
+    args = parser.parse_args()
+
+    conn = _connect()
+    try:
+        migrate_up(conn)
+        conn.autocommit(False)
+        if args.reset:
+            reset(conn)
+        started = time.perf_counter()
+        counts = seed(conn, args.students, args.workshops, args.batches_per_workshop,
+                      args.enrollments_per_student, random.Random(args.seed))
+    finally:
+        conn.close()
+        shutdown_password_pool()
+
+    print(", ".join(f"{count} {name}" for name, count in counts.items())
+          + f" seeded in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
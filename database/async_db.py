@@ -0,0 +1,119 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import Depends, HTTPException
+from database.db import get_db_connection, get_pool, PoolTimeout, DB_POOL_MAX_SIZE
+
+
+# Async data access for `async def` routes
+# -----------------------------------------
+# pymysql is blocking, so every call is handed to a bounded executor and the
+# event loop keeps serving other requests while the query runs. The DB
+# executor is sized to the connection pool: more threads could never hold a
+# connection at the same time anyway.
+
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_MAX_SIZE)))
+BLOCKING_EXECUTOR_WORKERS = int(os.getenv("BLOCKING_EXECUTOR_WORKERS", "8"))
+
+_db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+_blocking_executor = ThreadPoolExecutor(max_workers=BLOCKING_EXECUTOR_WORKERS, thread_name_prefix="blocking")
+
+
+async def _in_executor(executor, fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    # run_in_executor does not carry contextvars over; the per-request query
+    # stats live in one
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, context.run, functools.partial(fn, *args, **kwargs))
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run any other blocking call (hashing, file IO, ...) off the event loop."""
+    return await _in_executor(_blocking_executor, fn, *args, **kwargs)
+
+
+def _fetchone(conn, query, args):
+    with conn.cursor() as cursor:
+        cursor.execute(query, args)
+        return cursor.fetchone()
+
+
+def _fetchall(conn, query, args):
+    with conn.cursor() as cursor:
+        cursor.execute(query, args)
+        return cursor.fetchall()
+
+
+def _execute(conn, query, args):
+    with conn.cursor() as cursor:
+        cursor.execute(query, args)
+        return cursor.rowcount
+
+
+def _executemany(conn, query, seq_args):
+    with conn.cursor() as cursor:
+        cursor.executemany(query, seq_args)
+        return cursor.rowcount
+
+
+class AsyncConnection:
+    """Awaitable wrapper around the request's pooled pymysql connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(conn, *args) in the DB executor, e.g. a whole transaction in one hop."""
+        return await _in_executor(_db_executor, fn, self.conn, *args, **kwargs)
+
+    async def fetchone(self, query, args=None):
+        return await self.run(_fetchone, query, args)
+
+    async def fetchall(self, query, args=None):
+        return await self.run(_fetchall, query, args)
+
+    async def execute(self, query, args=None):
+        return await self.run(_execute, query, args)
+
+    async def executemany(self, query, seq_args):
+        return await self.run(_executemany, query, seq_args)
+
+    async def commit(self):
+        await self.run(lambda conn: conn.commit())
+
+    async def rollback(self):
+        await self.run(lambda conn: conn.rollback())
+
+
+def _with_connection(fn, *args, **kwargs):
+    pool = get_pool()
+    try:
+        conn = pool.acquire()
+    except PoolTimeout:
+        raise HTTPException(status_code=503, detail="Database is busy. Please retry shortly.")
+    try:
+        return fn(conn, *args, **kwargs)
+    finally:
+        pool.release(conn)
+
+
+async def run_with_connection(fn, *args, **kwargs):
+    """
+    Borrow a pooled connection just for fn(conn, *args) in the DB executor.
+    For routes that do slow non-DB work first (remote calls) and should not
+    hold a connection while they wait.
+    """
+    return await _in_executor(_db_executor, _with_connection, fn, *args, **kwargs)
+
+
+# FastAPI dependency. Shares the request's connection with require_* dependencies.
+async def get_async_db(conn=Depends(get_db_connection)):
+    return AsyncConnection(conn)
+
+
+def shutdown_executors():
+    _db_executor.shutdown(wait=False)
+    _blocking_executor.shutdown(wait=False)
@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after `ttl` seconds.
+    Once `max_size` is reached the least recently used entry is evicted.
+    """
+
+    def __init__(self, max_size=1024, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class VersionedCache:
+    """
+    TTLCache split into namespaces. invalidate(namespace) bumps that
+    namespace's version, so its existing entries are never read again and
+    simply age out of the LRU.
+
+    Read-through callers take version() before reading the database and
+    pass it to set(): a fill whose read started before an invalidate is
+    stored under the old version, where no reader will ever look.
+    """
+
+    def __init__(self, max_size=1024, ttl=60.0):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def version(self, namespace):
+        return self._versions.get(namespace, 0)
+
+    def get(self, namespace, key=None):
+        return self._cache.get((namespace, self.version(namespace), key))
+
+    def set(self, namespace, key, value, version):
+        if version != self.version(namespace):
+            return   # invalidated while the caller was reading; don't keep it
+        self._cache.set((namespace, version, key), value)
+
+    def invalidate(self, *namespaces):
+        with self._lock:
+            for namespace in namespaces:
+                self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+    def stats(self):
+        return {"entries": len(self._cache), "hits": self._cache.hits, "misses": self._cache.misses}
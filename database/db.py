@@ -1,17 +1,332 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import pymysql
 from config import MYSQL_CONFIG
-from fastapi import Depends
+from fastapi import Depends, HTTPException
 
-def get_db_connection():
-    conn = pymysql.connect(
+from database.query_stats import CURSOR_CLASS
+
+
+# Pool settings (override through environment variables)
+# -----------------------------------------
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+DB_POOL_MIN_IDLE = int(os.getenv("DB_POOL_MIN_IDLE", "2"))
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))   # seconds before a connection is recycled
+DB_POOL_WAIT_TIMEOUT = float(os.getenv("DB_POOL_WAIT_TIMEOUT", "10"))     # seconds a request waits for a free connection
+DB_POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", "5"))          # idle seconds after which a borrow pings first
+DB_POOL_MAINTENANCE_INTERVAL = float(os.getenv("DB_POOL_MAINTENANCE_INTERVAL", "30"))
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def _connect():
+    return pymysql.connect(
         host=MYSQL_CONFIG["host"],
         user=MYSQL_CONFIG["user"],
         password=MYSQL_CONFIG["password"],
         database=MYSQL_CONFIG["database"],
-        cursorclass=pymysql.cursors.DictCursor
+        cursorclass=CURSOR_CLASS     # DictCursor that also records per-request query stats
     )
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """
+    Bounded pool of pymysql connections.
+
+    Idle connections are reused most-recently-used first, pinged before reuse
+    when they have been idle for a while, and recycled once they exceed
+    max_lifetime. Borrowers wait up to wait_timeout for a free slot.
+    """
+
+    def __init__(self, connect=_connect, max_size=DB_POOL_MAX_SIZE, min_idle=DB_POOL_MIN_IDLE,
+                 max_lifetime=DB_POOL_MAX_LIFETIME, wait_timeout=DB_POOL_WAIT_TIMEOUT,
+                 ping_after=DB_POOL_PING_AFTER):
+        self._connect = connect
+        self.max_size = max_size
+        self.min_idle = min(min_idle, max_size)
+        self.max_lifetime = max_lifetime
+        self.wait_timeout = wait_timeout
+        self.ping_after = ping_after
+
+        self._cond = threading.Condition()
+        self._idle = deque()      # (conn, created_at, returned_at)
+        self._in_use = {}         # id(conn) -> created_at
+        self._opening = 0
+        self._closed = False
+
+        self._borrows = 0
+        self._waits = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._broken = 0
+
+    def _size(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def acquire(self):
+        started = time.monotonic()
+        deadline = started + self.wait_timeout
+        waited = False
+
+        while True:
+            conn = None
+            with self._cond:
+                while not self._idle and self._size() >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"No database connection available within {self.wait_timeout}s")
+                    waited = True
+                    self._cond.wait(remaining)
+
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+
+                if self._idle:
+                    conn, created_at, returned_at = self._idle.pop()
+                    self._in_use[id(conn)] = created_at
+                else:
+                    self._opening += 1
+
+            if conn is None:
+                conn = self._open()
+            elif not self._usable(conn, created_at, returned_at):
+                self._discard(conn)
+                continue
+
+            self._record_borrow(time.monotonic() - started, waited)
+            return conn
+
+    def release(self, conn):
+        # Always end the transaction: pymysql runs with autocommit off, so even a
+        # plain SELECT leaves a snapshot open that the next borrower would see.
+        try:
+            conn.rollback()
+            healthy = conn.open
+        except Exception:
+            healthy = False
+
+        with self._cond:
+            created_at = self._in_use.pop(id(conn), None)
+            if created_at is None:
+                return
+            keep = (
+                healthy
+                and not self._closed
+                and time.monotonic() - created_at < self.max_lifetime
+            )
+            if keep:
+                self._idle.append((conn, created_at, time.monotonic()))
+            elif healthy:
+                self._recycled += 1
+            else:
+                self._broken += 1
+            self._cond.notify()
+
+        if not keep:
+            _close_quietly(conn)
+
+    def _open(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._opening -= 1
+            self._in_use[id(conn)] = time.monotonic()
+            self._created += 1
+        return conn
+
+    def _usable(self, conn, created_at, returned_at):
+        now = time.monotonic()
+        if now - created_at >= self.max_lifetime:
+            with self._cond:
+                self._recycled += 1
+            return False
+        if now - returned_at >= self.ping_after:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self._broken += 1
+                return False
+        return True
+
+    def discard(self, conn):
+        """
+        Close a borrowed connection instead of returning it, e.g. one left in
+        the middle of an unbuffered result (release would read it to the end).
+        """
+        with self._cond:
+            if id(conn) in self._in_use:
+                self._recycled += 1
+        self._discard(conn)
+
+    def _discard(self, conn):
+        with self._cond:
+            self._in_use.pop(id(conn), None)
+            self._cond.notify()
+        _close_quietly(conn)
+
+    def _record_borrow(self, wait_time, waited):
+        with self._cond:
+            self._borrows += 1
+            if waited:
+                self._waits += 1
+            self._wait_time_total += wait_time
+            self._wait_time_max = max(self._wait_time_max, wait_time)
+
+    def maintain(self):
+        """Retire expired idle connections and top the pool back up to min_idle."""
+        expired = []
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                return
+            keep = deque()
+            for conn, created_at, returned_at in self._idle:
+                if now - created_at >= self.max_lifetime:
+                    expired.append(conn)
+                else:
+                    keep.append((conn, created_at, returned_at))
+            self._idle = keep
+            self._recycled += len(expired)
+            missing = max(0, self.min_idle - len(self._idle) - self._opening)
+            missing = min(missing, self.max_size - self._size())
+            self._opening += missing
+
+        for conn in expired:
+            _close_quietly(conn)
+
+        for _ in range(missing):
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._opening -= 1
+                    self._cond.notify()
+                continue
+            with self._cond:
+                self._opening -= 1
+                self._created += 1
+                now = time.monotonic()
+                self._idle.appendleft((conn, now, now))
+                self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _, _ in self._idle]
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn in idle:
+            _close_quietly(conn)
+
+    def stats(self):
+        with self._cond:
+            borrows = self._borrows
+            return {
+                "max_size": self.max_size,
+                "min_idle": self.min_idle,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "opening": self._opening,
+                "total": self._size(),
+                "borrows": borrows,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_time_avg_ms": round(self._wait_time_total / borrows * 1000, 3) if borrows else 0.0,
+                "wait_time_max_ms": round(self._wait_time_max * 1000, 3),
+                "wait_time_total_ms": round(self._wait_time_total * 1000, 3),
+                "created": self._created,
+                "recycled": self._recycled,
+                "broken": self._broken,
+            }
+
+
+# Process-wide pool
+# -----------------------------------------
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _maintenance_loop(pool):
+    while not pool._closed:
+        time.sleep(DB_POOL_MAINTENANCE_INTERVAL)
+        try:
+            pool.maintain()
+        except Exception as e:
+            print(f"[DB POOL] maintenance failed: {e}")
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = ConnectionPool()
+                pool.maintain()   # warm up min_idle connections
+                threading.Thread(
+                    target=_maintenance_loop, args=(pool,), name="db-pool-maintenance", daemon=True
+                ).start()
+                _pool = pool
+    return _pool
+
+
+def pool_stats():
+    return _pool.stats() if _pool is not None else None
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+@contextmanager
+def pooled_connection():
+    """Borrow a pooled connection outside of a request (background jobs, scripts)."""
+    pool = get_pool()
+    conn = pool.acquire()
     try:
         yield conn
     finally:
-        conn.close()
+        pool.release(conn)
 
+
+# FastAPI dependency
+# -----------------------------------------
+
+def get_db_connection():
+    pool = get_pool()
+    try:
+        conn = pool.acquire()
+    except PoolTimeout:
+        raise HTTPException(status_code=503, detail="Database is busy. Please retry shortly.")
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
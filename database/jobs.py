@@ -0,0 +1,31 @@
+import threading
+
+
+# Background maintenance jobs
+# -----------------------------------------
+# Each job runs in its own daemon thread so it never sits on the request path.
+
+_jobs = {}
+_stop = threading.Event()
+
+
+def _run(name, interval, fn):
+    while not _stop.wait(interval):
+        try:
+            fn()
+        except Exception as e:
+            print(f"[JOB ERROR] {name}: {e}")
+
+
+def run_periodically(name, interval, fn):
+    """Start `fn` every `interval` seconds in a daemon thread (once per name)."""
+    if name in _jobs:
+        return _jobs[name]
+    thread = threading.Thread(target=_run, args=(name, interval, fn), name=f"job-{name}", daemon=True)
+    _jobs[name] = thread
+    thread.start()
+    return thread
+
+
+def stop_jobs():
+    _stop.set()
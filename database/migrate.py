@@ -0,0 +1,293 @@
+import argparse
+import hashlib
+import os
+import re
+import sys
+from pathlib import Path
+
+import pymysql
+
+from database.db import _connect
+
+
+# Schema migrations
+# -----------------------------------------
+# Versioned SQL files in database/migrations/ (NNNN_description.sql) are
+# applied in order and recorded in schema_migrations, so every database
+# ends up with the same schema and each file runs once.
+#
+#   python -m database.migrate up            apply pending migrations
+#   python -m database.migrate status        list applied / pending / changed
+#   python -m database.migrate check-plans   EXPLAIN the hot queries
+#
+# Databases set up by hand before this runner existed can run `up` as well:
+# errors meaning "this already exists" are treated as applied, so
+# statements that were run before are skipped and the rest go through.
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+MIGRATION_LOCK_TIMEOUT = int(os.getenv("MIGRATION_LOCK_TIMEOUT", "60"))
+LOCK_NAME = "stei_schema_migrations"
+
+# table exists, duplicate column, duplicate key name, multiple primary keys,
+# can't drop (already dropped)
+ALREADY_APPLIED_ERRORS = {1050, 1060, 1061, 1068, 1091}
+
+_FILE_PATTERN = re.compile(r"^(\d+)_(.+)\.sql$")
+
+PREFLIGHT_REPORT_LIMIT = 50
+
+
+class MigrationError(Exception):
+    pass
+
+
+def split_statements(sql: str):
+    """Split a SQL script on `;`, ignoring those in quotes and comments."""
+    statements = []
+    current = []
+    quote = None
+    i = 0
+    n = len(sql)
+
+    while i < n:
+        ch = sql[i]
+        if quote:
+            current.append(ch)
+            if ch == "\\" and quote != "`" and i + 1 < n:
+                current.append(sql[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+            current.append(ch)
+        elif ch == "#" or (sql.startswith("--", i) and sql[i + 2:i + 3] in ("", " ", "\t", "\r", "\n")):
+            end = sql.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            current.append(" ")
+            continue
+        elif ch == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+
+    if quote:
+        raise MigrationError("Unterminated quoted string")
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """Migration files in version order: [{version, name, path, checksum}]."""
+    migrations = []
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILE_PATTERN.match(path.name)
+        if not match:
+            continue
+        migrations.append({
+            "version": int(match.group(1)),
+            "name": match.group(2),
+            "path": path,
+            "checksum": hashlib.sha256(path.read_bytes()).hexdigest(),
+        })
+
+    versions = [m["version"] for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError("Two migration files share a version number")
+    return migrations
+
+
+def ensure_migrations_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT NOT NULL,
+                name VARCHAR(255) NOT NULL,
+                checksum CHAR(64) NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (version)
+            )
+            """
+        )
+
+
+def applied_migrations(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT version, name, checksum, applied_at FROM schema_migrations")
+        return {row["version"]: row for row in cursor.fetchall()}
+
+
+def apply_migration(conn, migration):
+    """Run every statement of one file, then record it. Returns skipped statement count."""
+    skipped = 0
+    with conn.cursor() as cursor:
+        for statement in split_statements(migration["path"].read_text(encoding="utf-8")):
+            try:
+                cursor.execute(statement)
+            except pymysql.MySQLError as e:
+                if e.args and e.args[0] in ALREADY_APPLIED_ERRORS:
+                    skipped += 1
+                    continue
+                raise MigrationError(f"{migration['path'].name}: {e}\n{statement}") from e
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+            (migration["version"], migration["name"], migration["checksum"])
+        )
+    return skipped
+
+
+# Preflight checks
+# -------------------------
+# Data a migration cannot handle on its own and that an operator has to
+# resolve (rather than the migration deleting or merging rows). A check
+# returns a list of problems; while there are any, its migration and those
+# after it are not applied.
+
+def _duplicate_emails(conn):
+    problems = []
+    with conn.cursor() as cursor:
+        for table, id_field in (("students", "student_id"), ("admins", "admin_id")):
+            cursor.execute(
+                f"""
+                SELECT email, GROUP_CONCAT({id_field} ORDER BY {id_field}) AS ids
+                FROM {table}
+                GROUP BY email
+                HAVING COUNT(*) > 1
+                LIMIT %s
+                """,
+                (PREFLIGHT_REPORT_LIMIT,)
+            )
+            problems += [f"{table}.email {row['email']!r} is shared by {id_field} {row['ids']}"
+                         for row in cursor.fetchall()]
+    return problems
+
+
+# version -> check
+PREFLIGHT_CHECKS = {
+    8: _duplicate_emails,   # unique indexes on students.email / admins.email
+}
+
+
+def preflight(conn, migration):
+    check = PREFLIGHT_CHECKS.get(migration["version"])
+    problems = check(conn) if check else []
+    if problems:
+        raise MigrationError(
+            f"{migration['path'].name} needs these resolved first"
+            f" (at most {PREFLIGHT_REPORT_LIMIT} per check shown):\n  " + "\n  ".join(problems)
+        )
+
+
+def _lock(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT GET_LOCK(%s, %s) AS locked", (LOCK_NAME, MIGRATION_LOCK_TIMEOUT))
+        if cursor.fetchone()["locked"] != 1:
+            raise MigrationError("Another migration run holds the lock")
+
+
+def _unlock(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+
+
+def migrate_up(conn):
+    # DDL commits implicitly anyway; autocommit keeps data statements in
+    # step with it
+    conn.autocommit(True)
+    _lock(conn)
+    try:
+        ensure_migrations_table(conn)
+        applied = applied_migrations(conn)
+        migrations = discover()
+        pending = [m for m in migrations if m["version"] not in applied]
+
+        for migration in migrations:
+            row = applied.get(migration["version"])
+            if row and row["checksum"] != migration["checksum"]:
+                print(f"warning: {migration['path'].name} changed after it was applied")
+
+        for migration in pending:
+            preflight(conn, migration)
+            skipped = apply_migration(conn, migration)
+            note = f" ({skipped} statement(s) already applied)" if skipped else ""
+            print(f"applied {migration['path'].name}{note}")
+
+        if not pending:
+            print("Schema is up to date")
+        return len(pending)
+    finally:
+        _unlock(conn)
+
+
+def migration_status(conn):
+    ensure_migrations_table(conn)
+    applied = applied_migrations(conn)
+    for migration in discover():
+        row = applied.get(migration["version"])
+        if row is None:
+            state = "pending"
+        elif row["checksum"] != migration["checksum"]:
+            state = f"changed (applied {row['applied_at']})"
+        else:
+            state = f"applied {row['applied_at']}"
+        print(f"{migration['path'].name:<45} {state}")
+
+
+def check_plans(conn):
+    """EXPLAIN every registered hot query. Returns the names that scan a whole table."""
+    from database.query_plans import HOT_QUERIES
+
+    failures = []
+    with conn.cursor() as cursor:
+        for name, sql, args in HOT_QUERIES:
+            cursor.execute(f"EXPLAIN {sql}", args)
+            plan = cursor.fetchall()
+            scans = [row["table"] for row in plan if row.get("type") == "ALL"]
+            steps = ", ".join(
+                f"{row['table']}:{row.get('type')}({row.get('key') or '-'})" for row in plan if row.get("table")
+            )
+            print(f"{'FAIL' if scans else 'ok':<5} {name:<40} {steps}")
+            if scans:
+                failures.append(name)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m database.migrate")
+    parser.add_argument("command", choices=["up", "status", "check-plans"])
+    args = parser.parse_args(argv)
+
+    conn = _connect()
+    try:
+        if args.command == "up":
+            migrate_up(conn)
+        elif args.command == "status":
+            migration_status(conn)
+        else:
+            failures = check_plans(conn)
+            if failures:
+                print(f"{len(failures)} quer{'y' if len(failures) == 1 else 'ies'} read a whole table: "
+                      + ", ".join(failures))
+                return 1
+    except MigrationError as e:
+        print(f"Migration failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
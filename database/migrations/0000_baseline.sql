@@ -0,0 +1,170 @@
+-- Baseline schema: the tables as the application used them before the
+-- numbered migrations. Reconstructed from the queries in the code and the
+-- schema diagram. Every statement is IF NOT EXISTS, so running it against
+-- an existing database changes nothing; later migrations evolve it.
+
+CREATE TABLE IF NOT EXISTS admins (
+    admin_id INT NOT NULL AUTO_INCREMENT,
+    first_name VARCHAR(100) NOT NULL,
+    last_name VARCHAR(100) NULL,
+    email VARCHAR(255) NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (admin_id),
+    UNIQUE KEY email (email)
+);
+
+CREATE TABLE IF NOT EXISTS students (
+    student_id INT NOT NULL AUTO_INCREMENT,
+    first_name VARCHAR(100) NOT NULL,
+    last_name VARCHAR(100) NULL,
+    email VARCHAR(255) NOT NULL,
+    phone VARCHAR(20) NULL,
+    address TEXT NULL,
+    password VARCHAR(255) NOT NULL,
+    email_consent BOOLEAN NULL DEFAULT FALSE,
+    profession ENUM('student', 'employee', 'other') NULL DEFAULT 'student',
+    designation VARCHAR(100) NULL,
+    gender ENUM('male', 'female', 'other') NULL,
+    status VARCHAR(20) NULL DEFAULT 'Active',
+    profile_completed BOOLEAN NOT NULL DEFAULT FALSE,
+    google_id VARCHAR(255) NULL,
+    created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (student_id),
+    UNIQUE KEY email (email)
+);
+
+CREATE TABLE IF NOT EXISTS categories (
+    category_id INT NOT NULL AUTO_INCREMENT,
+    name VARCHAR(100) NOT NULL,
+    created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (category_id),
+    UNIQUE KEY name (name)
+);
+
+CREATE TABLE IF NOT EXISTS workshops (
+    workshop_id INT NOT NULL AUTO_INCREMENT,
+    category_id INT NOT NULL,
+    category_name VARCHAR(100) NULL,
+    name VARCHAR(255) NOT NULL,
+    description TEXT NULL,
+    duration_days INT NOT NULL,
+    minutes_per_session INT NULL DEFAULT 60,
+    sessions_per_day INT NULL DEFAULT 1,
+    capacity INT NULL DEFAULT 0,
+    fee DECIMAL(10, 2) NULL DEFAULT 0,
+    instructor VARCHAR(255) NULL,
+    status VARCHAR(20) NULL DEFAULT 'Upcoming',
+    workshop_image VARCHAR(500) NULL,
+    start_date DATE NULL,
+    created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (workshop_id)
+);
+
+CREATE TABLE IF NOT EXISTS batches (
+    id INT NOT NULL AUTO_INCREMENT,
+    workshop_id INT NOT NULL,
+    category_id INT NULL,
+    workshop_name VARCHAR(255) NULL,
+    batch_name VARCHAR(255) NOT NULL,
+    instructor VARCHAR(255) NULL,
+    start_date DATE NULL,
+    start_time TIME NULL,
+    end_time TIME NULL,
+    location VARCHAR(255) NULL,
+    status VARCHAR(20) NULL DEFAULT 'Upcoming',
+    zoom_link VARCHAR(500) NULL,
+    zoom_meeting_id VARCHAR(100) NULL,
+    zoom_password VARCHAR(100) NULL,
+    created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS student_enrollments (
+    enrollment_id INT NOT NULL AUTO_INCREMENT,
+    student_id INT NOT NULL,
+    workshop_id INT NOT NULL,
+    batch_id INT NOT NULL,
+    enrollment_date TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    status VARCHAR(20) NULL,
+    PRIMARY KEY (enrollment_id)
+);
+
+CREATE TABLE IF NOT EXISTS quotes (
+    id INT NOT NULL AUTO_INCREMENT,
+    quote TEXT NOT NULL,
+    author VARCHAR(255) NULL,
+    category VARCHAR(100) NOT NULL,
+    color VARCHAR(20) NULL,
+    featured BOOLEAN NULL DEFAULT FALSE,
+    created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS clarity_calls (
+    id INT NOT NULL AUTO_INCREMENT,
+    student_id INT NOT NULL,
+    mentor_name VARCHAR(255) NULL,
+    call_status VARCHAR(50) NULL,
+    scheduled_date DATETIME NULL,
+    notes TEXT NULL,
+    created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS clarity_questions (
+    id INT NOT NULL AUTO_INCREMENT,
+    question TEXT NOT NULL,
+    options TEXT NULL,
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS clarity_responses (
+    id INT NOT NULL AUTO_INCREMENT,
+    student_id INT NOT NULL,
+    question_id INT NOT NULL,
+    answer CHAR(1) NOT NULL,
+    created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS resource_categories (
+    id INT NOT NULL AUTO_INCREMENT,
+    name VARCHAR(100) NOT NULL,
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS resources (
+    id INT NOT NULL AUTO_INCREMENT,
+    name VARCHAR(255) NOT NULL,
+    category_id INT NOT NULL,
+    session_id INT NULL,
+    session_name VARCHAR(255) NULL,
+    url VARCHAR(1000) NOT NULL,
+    description TEXT NULL,
+    created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS student_assignments (
+    id INT NOT NULL AUTO_INCREMENT,
+    student_id INT NOT NULL,
+    assignment_title VARCHAR(255) NOT NULL,
+    description TEXT NULL,
+    status VARCHAR(50) NULL DEFAULT 'Assigned',
+    created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id)
+);
+
+-- Legacy logout list, replaced by revoked_tokens in 0001
+CREATE TABLE IF NOT EXISTS blacklisted_tokens (
+    id INT NOT NULL AUTO_INCREMENT,
+    token TEXT NOT NULL,
+    created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id)
+);
@@ -0,0 +1,16 @@
+-- Token revocation store keyed by the SHA-256 of the JWT.
+-- Replaces the full-table scan over blacklisted_tokens on every request.
+
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    token_hash CHAR(64) NOT NULL,
+    expires_at DATETIME NOT NULL,
+    revoked_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (token_hash),
+    KEY idx_revoked_tokens_expires_at (expires_at)
+);
+
+-- Carry over existing logouts. Their real expiry is unknown here, so use the
+-- longest token lifetime we issue (12 hours) as an upper bound.
+INSERT IGNORE INTO revoked_tokens (token_hash, expires_at)
+SELECT SHA2(token, 256), UTC_TIMESTAMP() + INTERVAL 12 HOUR
+FROM blacklisted_tokens;
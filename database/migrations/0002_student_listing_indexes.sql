@@ -0,0 +1,13 @@
+-- Indexes behind GET /admin/students/ keyset pagination, filters and sorting.
+-- InnoDB secondary indexes already end with the primary key, but student_id
+-- is spelled out so the (sort column, student_id) keyset order is explicit.
+
+ALTER TABLE students
+    ADD INDEX idx_students_created_at (created_at, student_id),
+    ADD INDEX idx_students_status (status, student_id),
+    ADD INDEX idx_students_profession (profession, student_id);
+
+ALTER TABLE student_enrollments
+    ADD INDEX idx_enrollments_student (student_id, enrollment_date),
+    ADD INDEX idx_enrollments_batch_student (batch_id, student_id),
+    ADD INDEX idx_enrollments_workshop_student (workshop_id, student_id);
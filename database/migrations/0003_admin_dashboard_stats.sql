@@ -0,0 +1,29 @@
+-- Precomputed admin dashboard figures (see Admin/dashboard_stats.py).
+
+CREATE TABLE IF NOT EXISTS admin_dashboard_stats (
+    stat_key VARCHAR(64) NOT NULL,
+    stat_value DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (stat_key)
+);
+
+ALTER TABLE batches ADD COLUMN enrolled_count INT NOT NULL DEFAULT 0;
+
+-- Backfill both from the current data
+UPDATE batches b
+LEFT JOIN (
+    SELECT batch_id, COUNT(*) AS enrolled
+    FROM student_enrollments
+    GROUP BY batch_id
+) c ON c.batch_id = b.id
+SET b.enrolled_count = COALESCE(c.enrolled, 0);
+
+INSERT INTO admin_dashboard_stats (stat_key, stat_value)
+SELECT 'total_revenue', COALESCE(SUM(w.fee), 0)
+FROM student_enrollments se
+JOIN workshops w ON se.workshop_id = w.workshop_id
+UNION ALL
+SELECT 'total_workshops', COUNT(*) FROM workshops
+UNION ALL
+SELECT 'active_batches', COUNT(*) FROM batches WHERE status='Ongoing'
+ON DUPLICATE KEY UPDATE stat_value = VALUES(stat_value);
@@ -0,0 +1,11 @@
+-- OTP codes shared by all workers (see auth/OTP/otp_store.py).
+
+CREATE TABLE IF NOT EXISTS otp_codes (
+    identifier VARCHAR(255) NOT NULL,
+    otp_hash CHAR(64) NOT NULL,
+    expires_at DATETIME NOT NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (identifier),
+    KEY idx_otp_codes_expires_at (expires_at)
+);
@@ -0,0 +1,13 @@
+-- One answer per (student, question): submissions upsert instead of appending.
+-- Keep the most recent row (highest id) of every duplicated pair, then
+-- enforce uniqueness. The unique key also serves the per-student lookup.
+
+DELETE older
+FROM clarity_responses older
+JOIN clarity_responses newer
+    ON newer.student_id = older.student_id
+   AND newer.question_id = older.question_id
+   AND newer.id > older.id;
+
+ALTER TABLE clarity_responses
+    ADD UNIQUE KEY uq_clarity_responses_student_question (student_id, question_id);
@@ -0,0 +1,27 @@
+-- Race-free enrollment: one enrollment per (student, workshop, batch) and an
+-- optional seat limit per batch (NULL = unlimited), enforced against
+-- batches.enrolled_count.
+
+-- Keep the earliest enrollment of every duplicated triple
+DELETE later
+FROM student_enrollments later
+JOIN student_enrollments earlier
+    ON earlier.student_id = later.student_id
+   AND earlier.workshop_id = later.workshop_id
+   AND earlier.batch_id = later.batch_id
+   AND earlier.enrollment_id < later.enrollment_id;
+
+ALTER TABLE student_enrollments
+    ADD UNIQUE KEY uq_enrollments_student_workshop_batch (student_id, workshop_id, batch_id);
+
+ALTER TABLE batches
+    ADD COLUMN capacity INT NULL;
+
+-- The deletes above changed the counts
+UPDATE batches b
+LEFT JOIN (
+    SELECT batch_id, COUNT(*) AS enrolled
+    FROM student_enrollments
+    GROUP BY batch_id
+) c ON c.batch_id = b.id
+SET b.enrolled_count = COALESCE(c.enrolled, 0);
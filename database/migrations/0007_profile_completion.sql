@@ -0,0 +1,27 @@
+-- Stored profile completion (see Students/profile_completion.py).
+-- Bit i of profile_missing_mask is set when REQUIRED_FIELDS[i] is empty:
+--   0 first_name, 1 last_name, 2 email, 3 phone,
+--   4 address, 5 profession, 6 designation, 7 gender
+
+ALTER TABLE students
+    ADD COLUMN profile_missing_mask SMALLINT UNSIGNED NOT NULL DEFAULT 255,
+    ADD COLUMN profile_completion_pct DECIMAL(5,2) NOT NULL DEFAULT 0;
+
+-- Backfill; same expression as COMPLETION_SET_SQL
+UPDATE students SET
+    profile_missing_mask =
+          (CASE WHEN COALESCE(TRIM(first_name), '') = '' THEN 1 ELSE 0 END)
+        | (CASE WHEN COALESCE(TRIM(last_name), '') = '' THEN 2 ELSE 0 END)
+        | (CASE WHEN COALESCE(TRIM(email), '') = '' THEN 4 ELSE 0 END)
+        | (CASE WHEN COALESCE(TRIM(phone), '') = '' THEN 8 ELSE 0 END)
+        | (CASE WHEN COALESCE(TRIM(address), '') = '' THEN 16 ELSE 0 END)
+        | (CASE WHEN COALESCE(TRIM(profession), '') = '' THEN 32 ELSE 0 END)
+        | (CASE WHEN COALESCE(TRIM(designation), '') = '' THEN 64 ELSE 0 END)
+        | (CASE WHEN COALESCE(TRIM(gender), '') = '' THEN 128 ELSE 0 END),
+    profile_completion_pct = ROUND(100 * (8 - BIT_COUNT(profile_missing_mask)) / 8, 2),
+    profile_completed = (profile_missing_mask = 0);
+
+-- Admin list: filter / keyset-sort by completion
+ALTER TABLE students
+    ADD INDEX idx_students_completion (profile_completion_pct, student_id),
+    ADD INDEX idx_students_profile_completed (profile_completed, student_id);
@@ -0,0 +1,36 @@
+-- Indexes behind the per-request queries (see database/query_plans.py,
+-- checked with `python -m database.migrate check-plans`).
+-- One index per statement: the runner treats "duplicate key name" as
+-- already applied, so indexes that already exist are skipped one by one.
+--
+-- Already covered by earlier migrations:
+--   student_enrollments (student_id, ...), (batch_id, ...), (workshop_id, ...)   0002
+--   clarity_responses (student_id, question_id)                                  0005
+--   revoked_tokens / otp_codes primary keys                                      0001 / 0004
+
+-- Logins, OTP and OAuth look students / admins up by email or phone.
+-- "email" is the name MySQL gives a column-level UNIQUE, so databases
+-- that already have it keep theirs.
+--
+-- Databases without it may hold several accounts per email; the runner
+-- refuses to apply this file until they are resolved by hand (see
+-- PREFLIGHT_CHECKS in database/migrate.py).
+CREATE UNIQUE INDEX email ON students (email);
+CREATE INDEX idx_students_phone ON students (phone);
+CREATE UNIQUE INDEX email ON admins (email);
+
+-- Clarity-call status / history per student, latest first; admin list by date
+CREATE INDEX idx_clarity_calls_student_date ON clarity_calls (student_id, scheduled_date);
+CREATE INDEX idx_clarity_calls_scheduled_date ON clarity_calls (scheduled_date);
+
+-- Catalog lists and the admin dashboard ("latest N")
+CREATE INDEX idx_quotes_created_at ON quotes (created_at);
+CREATE INDEX idx_workshops_created_at ON workshops (created_at);
+CREATE INDEX idx_workshops_category ON workshops (category_id);
+CREATE INDEX idx_batches_workshop ON batches (workshop_id);
+CREATE INDEX idx_batches_status ON batches (status);
+CREATE INDEX idx_resources_created_at ON resources (created_at);
+CREATE INDEX idx_resources_category ON resources (category_id);
+
+-- /student/cleanup_Assignment
+CREATE INDEX idx_assignments_student_status ON student_assignments (student_id, status);
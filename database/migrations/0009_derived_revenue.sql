@@ -0,0 +1,4 @@
+-- Revenue is now derived from batches.enrolled_count * workshops.fee when the
+-- admin dashboard is read (see Admin/dashboard_stats.py); drop the stored total.
+
+DELETE FROM admin_dashboard_stats WHERE stat_key = 'total_revenue';
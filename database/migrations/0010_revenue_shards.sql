@@ -0,0 +1,11 @@
+-- Revenue is stored again, split over shard rows "total_revenue:<n>" (see
+-- Admin/dashboard_stats.py). Backfill them from the enrollments with the
+-- default 16 shards; reconcile_stats() re-splits for another
+-- DASHBOARD_REVENUE_SHARDS.
+
+INSERT INTO admin_dashboard_stats (stat_key, stat_value)
+SELECT CONCAT('total_revenue:', se.batch_id % 16), SUM(w.fee)
+FROM student_enrollments se
+JOIN workshops w ON se.workshop_id = w.workshop_id
+GROUP BY se.batch_id % 16
+ON DUPLICATE KEY UPDATE stat_value = VALUES(stat_value);
@@ -0,0 +1,76 @@
+# Query plan registry
+# -----------------------------------------
+# The queries that run on every request (logins, token checks, student
+# pages, admin list and dashboard), with sample arguments.
+# `python -m database.migrate check-plans` EXPLAINs each one and fails when
+# any table in a plan is read with a full table scan (type ALL).
+#
+# The SQL is imported from the modules that run it (module-level constants,
+# or the builders for queries assembled per request), so what is checked is
+# what is executed. A new hot query gets a constant there and an entry here.
+#
+# Run it against a database with representative data: on near-empty tables
+# MySQL may rightly prefer a scan, and the check then reports false alarms.
+#
+# Endpoints that return a whole table (workshop, batch, category, quote and
+# resource lists) scan by design and are not registered.
+
+from Admin.admin_dashboard import RECENT_WORKSHOPS_SQL, UPCOMING_BATCHES_SQL
+from Admin.dashboard_stats import TAKE_SEATS_SQL, WORKSHOP_ENROLLMENTS_SQL
+from Admin.students import student_list_query, page_enrollments_query
+from Students.clarity_call import CALL_STATUS_SQL, CALL_HISTORY_SQL, RESPONSES_SQL
+from Students.enrollments import ENROLL_LOCK_SQL, MY_ENROLLMENTS_SQL
+from Students.student import CLEANUP_ASSIGNMENTS_SQL
+from Students.student_dashboard import DASHBOARD_SQL
+from auth.Login_Logout.login import STUDENT_BY_PHONE_SQL, ADMIN_BY_EMAIL_SQL
+from auth.OTP.otp_auth import STUDENT_ID_BY_EMAIL_SQL
+from auth.OTP.otp_store import OTP_LOOKUP_SQL, OTP_PURGE_SQL
+from auth.jwt.token_revocation import REVOKED_LOOKUP_SQL, REVOKED_PURGE_SQL
+
+SAMPLE_STUDENT_ID = 1
+SAMPLE_EMAIL = "student@example.com"
+SAMPLE_PHONE = "9999999999"
+
+
+def _student_list(**filters):
+    sort = filters.pop("sort", "student_id")
+    order = filters.pop("order", "asc")
+    sql, values = student_list_query(filters, sort, order)
+    return sql, tuple(values)
+
+
+HOT_QUERIES = [
+    # name, sql, args
+
+    # Logins, OTP and OAuth
+    ("student login by phone", STUDENT_BY_PHONE_SQL, (SAMPLE_PHONE,)),
+    ("student lookup by email", STUDENT_ID_BY_EMAIL_SQL, (SAMPLE_EMAIL,)),
+    ("admin login by email", ADMIN_BY_EMAIL_SQL, ("admin@example.com",)),
+    ("token revocation check", REVOKED_LOOKUP_SQL, ("0" * 64,)),
+    ("revoked token purge", REVOKED_PURGE_SQL, ()),
+    ("otp lookup", OTP_LOOKUP_SQL, (SAMPLE_EMAIL,)),
+    ("otp purge", OTP_PURGE_SQL, ()),
+
+    # Student pages
+    ("student dashboard", DASHBOARD_SQL, (SAMPLE_STUDENT_ID,)),
+    ("my enrollments", MY_ENROLLMENTS_SQL, (SAMPLE_STUDENT_ID,)),
+    ("enroll: lock workshop and batch", ENROLL_LOCK_SQL, (1, 1)),
+    ("enroll: take a seat", TAKE_SEATS_SQL, (1, 1, 1)),
+    ("clarity call status", CALL_STATUS_SQL, (SAMPLE_STUDENT_ID,)),
+    ("clarity call history", CALL_HISTORY_SQL, (SAMPLE_STUDENT_ID,)),
+    ("clarity responses", RESPONSES_SQL, (SAMPLE_STUDENT_ID,)),
+    ("cleanup in-progress assignments", CLEANUP_ASSIGNMENTS_SQL, (SAMPLE_STUDENT_ID,)),
+
+    # Admin students list (first page, default sort and filtered variants)
+    ("admin students: first page", *_student_list()),
+    ("admin students: by status", *_student_list(status="Active")),
+    ("admin students: newest first", *_student_list(sort="created_at", order="desc")),
+    ("admin students: by completion", *_student_list(sort="profile_completion_pct", completion_min=50)),
+    ("admin students: in a batch", *_student_list(batch_id=1)),
+    ("admin students: page enrollments", page_enrollments_query(3), (1, 2, 3)),
+
+    # Admin dashboard and stat maintenance
+    ("dashboard: recent workshops", RECENT_WORKSHOPS_SQL, ()),
+    ("dashboard: upcoming batches", UPCOMING_BATCHES_SQL, ()),
+    ("fee change: enrollments per workshop", WORKSHOP_ENROLLMENTS_SQL, (1,)),
+]
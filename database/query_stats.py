@@ -0,0 +1,159 @@
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+
+from pymysql.cursors import DictCursor, SSDictCursor
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS", "1") not in ("0", "false", "False")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "10"))                  # statements per request before a warning
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))   # same statement this often = likely a loop
+DB_DEBUG_HEADERS = os.getenv("DB_DEBUG_HEADERS", "0") not in ("0", "false", "False")
+
+
+# Per-request SQL instrumentation
+# -----------------------------------------
+# Every pooled connection uses InstrumentedDictCursor, which times each
+# statement and adds it to the current request's stats (a ContextVar set by
+# QueryStatsMiddleware; it follows the request into threadpool and executor
+# threads). Statements are logged above SLOW_QUERY_MS; a request running more
+# than QUERY_BUDGET statements, or one statement N_PLUS_ONE_THRESHOLD times,
+# is logged when it ends. With DB_DEBUG_HEADERS=1 responses carry
+# X-DB-Queries and Server-Timing headers.
+
+_current = ContextVar("db_request_stats", default=None)
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql: str) -> str:
+    """Statement shape without literals: WHERE id=%s / id=5 -> WHERE id=?, IN (?, ?) -> IN (...)."""
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+class RequestQueryStats:
+    MAX_STATEMENTS = 200   # detail kept per request; counts stay exact
+
+    def __init__(self, label):
+        self.label = label
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements = []   # (normalized sql, ms, rows)
+
+    def record(self, sql, ms, rows):
+        self.count += 1
+        self.total_ms += ms
+        if len(self.statements) < self.MAX_STATEMENTS:
+            self.statements.append((sql, ms, rows))
+
+    def repeated(self):
+        """Statements run at least N_PLUS_ONE_THRESHOLD times: {sql: times}."""
+        counts = Counter(sql for sql, _, _ in self.statements)
+        return {sql: n for sql, n in counts.items() if n >= N_PLUS_ONE_THRESHOLD}
+
+
+def current_stats():
+    return _current.get()
+
+
+def begin_request(label):
+    stats = RequestQueryStats(label)
+    return stats, _current.set(stats)
+
+
+def end_request(stats, token):
+    _current.reset(token)
+    if stats.count > QUERY_BUDGET:
+        print(f"[QUERY BUDGET] {stats.label}: {stats.count} queries, {stats.total_ms:.1f} ms "
+              f"(budget {QUERY_BUDGET})")
+    for sql, times in stats.repeated().items():
+        print(f"[N+1] {stats.label}: {times}x {sql}")
+
+
+def _record(sql, started, rows):
+    ms = (time.perf_counter() - started) * 1000
+    normalized = normalize_sql(sql if isinstance(sql, str) else sql.decode(errors="replace"))
+    stats = _current.get()
+    if stats is not None:
+        stats.record(normalized, ms, rows)
+    if ms >= SLOW_QUERY_MS:
+        label = stats.label if stats is not None else "background"
+        print(f"[SLOW QUERY] {ms:.1f} ms, {rows if rows is not None else '?'} rows, {label}: {normalized}")
+
+
+class _InstrumentedCursorMixin:
+    _batched = False   # inside executemany, which calls execute() per chunk
+
+    def _rows(self):
+        return self.rowcount
+
+    def execute(self, query, args=None):
+        if self._batched:
+            return super().execute(query, args)
+        started = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            _record(query, started, self._rows())
+
+    def executemany(self, query, args):
+        started = time.perf_counter()
+        self._batched = True
+        try:
+            return super().executemany(query, args)
+        finally:
+            self._batched = False
+            _record(query, started, self._rows())
+
+
+class InstrumentedDictCursor(_InstrumentedCursorMixin, DictCursor):
+    pass
+
+
+class InstrumentedSSDictCursor(_InstrumentedCursorMixin, SSDictCursor):
+    """Unbuffered variant: the row count is unknown until the rows are read."""
+
+    def _rows(self):
+        return None
+
+
+CURSOR_CLASS = InstrumentedDictCursor if QUERY_STATS_ENABLED else DictCursor
+SS_CURSOR_CLASS = InstrumentedSSDictCursor if QUERY_STATS_ENABLED else SSDictCursor
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware opening a query-stats scope per HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not QUERY_STATS_ENABLED:
+            return await self.app(scope, receive, send)
+
+        stats, token = begin_request(f"{scope['method']} {scope['path']}")
+
+        async def send_wrapper(message):
+            if DB_DEBUG_HEADERS and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((b"server-timing", f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_request(stats, token)
@@ -0,0 +1,62 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# orjson handles datetime / date / time / UUID itself (ISO 8601, like
+# jsonable_encoder); int dict keys become strings like json.dumps does
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+# Fast JSON responses
+# -----------------------------------------
+# FastJSONResponse is the app's default response class. Routes returning
+# plain dicts still go through FastAPI's jsonable_encoder first; the large
+# list routes return FastJSONResponse(rows) themselves, so pymysql rows are
+# serialized in one orjson pass with no per-row Python conversion. The
+# output matches what jsonable_encoder produced: DATETIME / TIMESTAMP as
+# ISO 8601 ("2024-01-01T10:00:00"), MySQL TIME values (timedelta) as
+# "HH:MM:SS".
+#
+# The batch routes always sent str() of their values instead, so timestamps
+# there are "2024-01-01 10:00:00". They return StrDatetimeJSONResponse,
+# which keeps that format (orjson hands date/time values to _str_default).
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        # as jsonable_encoder does: 12 -> 12, 12.50 -> 12.5
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, timedelta):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode(errors="replace")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _str_default(value):
+    # str() of a date or time is already ISO 8601; a datetime gets a space
+    if isinstance(value, (datetime, date, time)):
+        return str(value)
+    return _default(value)
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default, option=OPTIONS)
+
+
+def dumps_str_datetimes(content) -> bytes:
+    return orjson.dumps(content, default=_str_default, option=OPTIONS | orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+class StrDatetimeJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps_str_datetimes(content)
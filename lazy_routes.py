@@ -0,0 +1,88 @@
+import importlib
+import os
+import threading
+
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import BaseRoute, Match
+
+LAZY_IMPORTS = os.getenv("LAZY_IMPORTS", "0") not in ("0", "false", "False")
+
+
+# Lazy routers
+# -----------------------------------------
+# With LAZY_IMPORTS=1 the OAuth / OTP routers (and google-auth, requests,
+# ...) are not imported at startup. A LazyRoute placeholder owns their paths;
+# the first request to one of them imports the module, mounts its router
+# with app.include_router and dispatches the request again through the app's
+# router, so it is served by the mounted copies (with the app's
+# default_response_class and dependency_overrides), never by the raw
+# APIRouter. From then on the placeholder matches nothing and the real
+# routes serve directly.
+# /openapi.json loads every pending router first, so the docs stay complete.
+
+
+class LazyRoute(BaseRoute):
+    def __init__(self, app, module, paths, attr="router"):
+        self.app = app
+        self.module = module
+        self.attr = attr
+        self.paths = tuple(paths)   # exact paths, or prefixes ending in "/"
+        self.router = None
+        self._lock = threading.Lock()
+
+    def _owns(self, path):
+        return any(path.startswith(p) if p.endswith("/") else path == p for p in self.paths)
+
+    def matches(self, scope):
+        if self.router is None and scope["type"] == "http" and self._owns(scope["path"]):
+            return Match.FULL, {}
+        return Match.NONE, {}
+
+    def url_path_for(self, name, /, **path_params):
+        self.load()
+        return self.router.url_path_for(name, **path_params)
+
+    def _import(self):
+        with self._lock:
+            if self.router is None:
+                router = getattr(importlib.import_module(self.module), self.attr)
+                self.app.include_router(router)
+                self.app.openapi_schema = None   # rebuild the docs with the new routes
+                self.router = router
+        return self.router
+
+    def load(self):
+        return self.router or self._import()
+
+    async def handle(self, scope, receive, send):
+        if self.router is None:
+            await run_in_threadpool(self._import)
+        # the placeholder no longer matches, so this reaches the mounted routes
+        await self.app.router(scope, receive, send)
+
+
+def add_lazy_router(app, module, paths, attr="router"):
+    """include_router(module.attr), deferred to the first request when LAZY_IMPORTS is on."""
+    if not LAZY_IMPORTS:
+        app.include_router(getattr(importlib.import_module(module), attr))
+        return None
+    route = LazyRoute(app, module, paths, attr)
+    app.router.routes.append(route)
+    return route
+
+
+def load_all(app):
+    for route in list(app.router.routes):
+        if isinstance(route, LazyRoute):
+            route.load()
+
+
+def install_openapi_loader(app):
+    """Make /openapi.json (and /docs) load every lazy router first."""
+    build = app.openapi
+
+    def openapi():
+        load_all(app)
+        return build()
+
+    app.openapi = openapi
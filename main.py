@@ -1,4 +1,16 @@
 from fastapi import FastAPI
+from database.db import close_pool
+from database.jobs import stop_jobs
+from database.async_db import shutdown_executors
+from auth.jwt.token_revocation import start_revocation_purge
+from Admin.dashboard_stats import start_dashboard_reconcile
+from auth.OTP.otp_store import start_otp_purge
+from auth.OTP.email_outbox import outbox
+from auth.jwt.password_auth import shutdown_password_pool
+from auth.http_client import close_client
+from monitoring.metrics import MetricsMiddleware, metrics_router
+from database.query_stats import QueryStatsMiddleware
+from fast_json import FastJSONResponse
 
 # AUTH Admin 
 
@@ -24,13 +36,14 @@ from Students.resources import resource_router
 from auth.Login_Logout.login import router as login_router
 from auth.Login_Logout.logout import router as logout_router
 
-from auth.Google_Login.oauth_google import router as google_oauth_router
+# Google / OTP / Microsoft routers are added through add_lazy_router below
+from lazy_routes import add_lazy_router, install_openapi_loader, LAZY_IMPORTS
 
-from auth.OTP.otp_auth import router as otp_auth_router
+app = FastAPI(title="STEI Workshop Management API", default_response_class=FastJSONResponse)
 
-from auth.Microsoft_Login.oauth_microsoft import router as microsoft_oauth_router
-
-app = FastAPI(title="STEI Workshop Management API")
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(QueryStatsMiddleware)   # per-request query count / DB time, slow-query log
+app.include_router(metrics_router) # /metrics (Prometheus, needs METRICS_TOKEN)
 
 
 
@@ -55,6 +68,30 @@ app.include_router(resource_router)
 
 app.include_router(login_router) # /login/student and /login/admin
 app.include_router(logout_router) # /logout/student and /logout/admin
-app.include_router(google_oauth_router) # /auth/google
-app.include_router(otp_auth_router) # /auth/student/send_otp    and    /auth/student/verify_otp
-app.include_router(microsoft_oauth_router) # /auth/microsoft/login  and  /auth/microsoft/callback
+# Imported on first use when LAZY_IMPORTS=1 (faster cold starts)
+add_lazy_router(app, "auth.Google_Login.oauth_google", ["/auth/google/"]) # /auth/google
+add_lazy_router(app, "auth.OTP.otp_auth", ["/auth/student/send_otp", "/auth/student/verify_otp"]) # /auth/student/send_otp    and    /auth/student/verify_otp
+add_lazy_router(app, "auth.Microsoft_Login.oauth_microsoft", ["/auth/microsoft/"]) # /auth/microsoft/login  and  /auth/microsoft/callback
+if LAZY_IMPORTS:
+    install_openapi_loader(app)
+
+
+@app.on_event("startup")
+def startup():
+    start_revocation_purge()
+    start_dashboard_reconcile()
+    start_otp_purge()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    stop_jobs()
+    outbox.stop()
+    shutdown_password_pool()
+    shutdown_executors()
+    close_pool()
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    await close_client()
@@ -0,0 +1,264 @@
+import hmac
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from database.db import pool_stats
+from auth.OTP.email_outbox import outbox
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")      # unset = /metrics disabled
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+SIZE_BUCKETS = [128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304]
+
+
+# Runtime metrics in Prometheus text format
+# -----------------------------------------
+# A small in-process registry (counters, gauges, histograms with labels),
+# filled by MetricsMiddleware for every HTTP request and, at scrape time, by
+# collectors reading the DB pool and email outbox stats. Served on /metrics
+# behind a bearer token. With several uvicorn workers each process has its
+# own registry, so scrape each worker or run one worker per port.
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = list(buckets)
+
+    def observe(self, *labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                # per-bucket counts (last = +Inf), sum, count
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self):
+        with self._lock:
+            items = [(k, list(v[0]), v[1], v[2]) for k, v in self._values.items()]
+        lines = self.header()
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + [float("inf")], counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.label_names, labels, ('le', _number(bound)))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []    # called at scrape time, return lines
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, fn):
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                print(f"[METRICS ERROR] {collector.__name__}: {e}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_requests = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status code", ["method", "route", "status"]))
+http_latency = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte", ["method", "route"]))
+http_in_progress = REGISTRY.register(Gauge(
+    "http_requests_in_progress", "Requests currently being served", ["method"]))
+http_response_size = REGISTRY.register(Histogram(
+    "http_response_size_bytes", "Response body size", ["method", "route"], buckets=SIZE_BUCKETS))
+
+
+def _gauges_and_counters(prefix, stats, gauges, counters):
+    lines = []
+    for key, help_text in gauges.items():
+        lines += [f"# HELP {prefix}_{key} {help_text}", f"# TYPE {prefix}_{key} gauge",
+                  f"{prefix}_{key} {_number(stats[key])}"]
+    for key, help_text in counters.items():
+        lines += [f"# HELP {prefix}_{key}_total {help_text}", f"# TYPE {prefix}_{key}_total counter",
+                  f"{prefix}_{key}_total {_number(stats[key])}"]
+    return lines
+
+
+@REGISTRY.add_collector
+def db_pool_metrics():
+    stats = pool_stats()
+    if stats is None:
+        return []
+    lines = _gauges_and_counters("db_pool", stats, {
+        "max_size": "Configured maximum connections",
+        "in_use": "Connections lent to requests",
+        "idle": "Open connections waiting in the pool",
+        "total": "Open connections, idle and in use",
+    }, {
+        "borrows": "Connections handed out",
+        "waits": "Borrows that had to wait for a free connection",
+        "timeouts": "Borrows that gave up waiting (503)",
+        "created": "Connections opened",
+        "recycled": "Connections closed for age",
+        "broken": "Connections dropped after an error",
+    })
+    lines += ["# HELP db_pool_wait_seconds_total Time requests spent waiting for a connection",
+              "# TYPE db_pool_wait_seconds_total counter",
+              f"db_pool_wait_seconds_total {_number(stats['wait_time_total_ms'] / 1000)}"]
+    return lines
+
+
+@REGISTRY.add_collector
+def email_outbox_metrics():
+    stats = outbox.metrics()
+    lines = _gauges_and_counters("email_outbox", stats, {
+        "queue_depth": "Messages waiting to be sent",
+        "retry_depth": "Messages waiting for a retry",
+    }, {
+        "enqueued": "Messages queued",
+        "sent": "Messages delivered to the SMTP server",
+        "failed": "Messages dropped after the last retry",
+        "retried": "Send attempts scheduled for retry",
+        "reconnects": "SMTP sessions opened",
+    })
+    lines += ["# HELP email_outbox_send_latency_avg_seconds Average SMTP send time per message",
+              "# TYPE email_outbox_send_latency_avg_seconds gauge",
+              f"email_outbox_send_latency_avg_seconds {_number(stats['send_latency_avg_ms'] / 1000)}"]
+    return lines
+
+
+def route_template(scope):
+    """Path template of the route that served the request, e.g. /batches/{batch_id}."""
+    # The router leaves the matched route in the scope; unknown paths share
+    # one label so scanners can't blow up cardinality
+    return getattr(scope.get("route"), "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: latency, status and size per route template, and
+    in-flight requests per method (the route is only known once routed).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status = 500
+        size = 0
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        http_in_progress.inc(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_progress.dec(method)
+            route = route_template(scope)
+            http_latency.observe(method, route, value=time.perf_counter() - started)
+            http_requests.inc(method, route, str(status))
+            http_response_size.observe(method, route, value=size)
+
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+def metrics(Authorization: str = Header(None)):
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (Authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")